@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Collision analysis for the 32-bit seeds runners hand to Ollama.
+
+Every runner truncates 64-bit seeds with seed % 2**32, so at large sample
+counts two samples can receive the same 32-bit seed; with the same model,
+prompt and temperature that is a duplicate generation. This tool finds
+every repeated 32-bit seed in one or more seed ledgers (seed_ledger.py):
+  - one sort of (seed32 << 32 | global index) keys, 8 bytes per seed,
+    finds all collision groups; only their members are mapped back to
+    ledger cells (experiment, stream, block, prompt, source, sample)
+  - colliding pairs are split into exclusive scopes: within a cell, across
+    cells of one source and stream, across streams of one source, across
+    sources of one experiment, and across experiments
+  - each scope is compared with its birthday expectation
+    E[pairs] = Σ_g C(n_g, 2) / 2^32 (Poisson tail p-value), where g runs
+    over the scope's groups of seeds
+  - pairs identical in all 64 bits are counted separately (a repeating
+    source, not truncation), and pairs sharing model, temperature, block
+    and prompt are flagged as duplicate generations
+
+Usage:
+    python analyze_seed_collisions.py results/qwen/v2_qwen3_8b_20260301_120000.json
+    python analyze_seed_collisions.py results/*/v2_*.json
+    python analyze_seed_collisions.py --simulate 1000000
+"""
+
+import sys
+sys.stdout.reconfigure(line_buffering=True)
+
+import argparse
+import json
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+
+from seed_ledger import load_seed_ledger
+
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "seed_collisions"
+SPACE = 2**32
+KEY_CHUNK = 1 << 22        # seeds per key-building chunk read from the ledger
+MAX_GROUPS = 1000          # collision groups listed in full
+MAX_CELLS = 1000           # affected cells listed in full
+
+# Nested scope keys; each exclusive scope is the difference of two neighbours
+SCOPE_KEYS = {
+    "cell": ("experiment", "cell"),
+    "source_stream": ("experiment", "stream", "source"),
+    "source": ("experiment", "source"),
+    "experiment": ("experiment",),
+    "all": (),
+}
+EXCLUSIVE_SCOPES = {
+    "within_cell": ("cell", None),
+    "across_cells_within_source_stream": ("source_stream", "cell"),
+    "across_streams_within_source": ("source", "source_stream"),
+    "across_sources_within_experiment": ("experiment", "source"),
+    "across_experiments": ("all", "experiment"),
+}
+GENERATION_KEY = ("model", "temperature", "block", "prompt")
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Birthday expectation
+# ─────────────────────────────────────────────────────────────────────
+
+def expected_pairs(sizes, space: int = SPACE) -> float:
+    """Σ C(n, 2) / space: expected colliding pairs over independent groups."""
+    return sum(n * (n - 1) / 2 for n in sizes) / space
+
+
+def birthday_expectation(n: int, space: int = SPACE) -> dict:
+    """Expected collisions among n uniform draws from `space` values."""
+    pairs = n * (n - 1) / 2 / space
+    # n - E[distinct], with E[distinct] = space·(1 - (1 - 1/space)^n)
+    repeated = n + space * math.expm1(n * math.log1p(-1 / space))
+    return {
+        "n": n,
+        "expected_pairs": _sig(pairs),
+        "expected_repeated_seeds": _sig(repeated),
+        "p_any_collision": round(-math.expm1(-pairs), 6),
+    }
+
+
+def _sig(x: float) -> float:
+    return float(f"{x:.6g}")
+
+
+def poisson_tail(observed: int, expected: float) -> float:
+    """P(X >= observed) for X ~ Poisson(expected)."""
+    if observed <= 0:
+        return 1.0
+    return float(stats.poisson.sf(observed - 1, expected))
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Ledger loading
+# ─────────────────────────────────────────────────────────────────────
+
+def load_experiment(result_path: str) -> dict:
+    """Ledger seeds (memory-mapped) and cells of one result file."""
+    with open(result_path) as f:
+        data = json.load(f)
+    if "seed_ledger" not in data:
+        raise SystemExit(f"{result_path} has no seed_ledger reference")
+    seeds, cells = load_seed_ledger(result_path, data["seed_ledger"])
+    return {
+        "file": str(result_path),
+        "model": data.get("model"),
+        "temperature": data.get("temperature"),
+        "seeds": seeds,
+        "cells": cells,
+    }
+
+
+def simulated_experiment(n: int, prng_seed: int = 42) -> dict:
+    """n seeds per source from the analysis generators, one cell per source.
+
+    The cells have no prompt: the seeds drive no generation, so their
+    collisions are never flagged as duplicate generations.
+    """
+    from analyze_seed_distributions import (generate_hmix_seeds64, generate_prng_seeds64,
+                                            generate_trng_seeds64)
+
+    parts = {
+        "PRNG": generate_prng_seeds64(n, stream_seed=prng_seed),
+        "TRNG": generate_trng_seeds64(n),
+        "HMIX": generate_hmix_seeds64(n),
+    }
+    cells = [{"stream": 0, "block": "simulated", "prompt": None, "source": source,
+              "offset": i * n, "count": n} for i, source in enumerate(parts)]
+    return {"file": f"simulated_n{n}", "model": None, "temperature": None,
+            "seeds": np.concatenate(list(parts.values())), "cells": cells}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Collision search
+# ─────────────────────────────────────────────────────────────────────
+
+def collision_groups(experiments: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """(seed32, global index) of every seed whose 32-bit value repeats.
+
+    Experiments are laid end to end in one global index; the returned
+    arrays are ordered by seed value, so each collision group is a run of
+    equal seed32 values.
+    """
+    total = sum(len(e["seeds"]) for e in experiments)
+    if total >= 2**32:
+        raise ValueError(f"{total} seeds exceed the 32-bit index packed into each sort key")
+    keys = np.empty(total, dtype=np.uint64)
+    base = 0
+    for e in experiments:
+        seeds = e["seeds"]
+        for lo in range(0, len(seeds), KEY_CHUNK):
+            chunk = np.asarray(seeds[lo:lo + KEY_CHUNK], dtype=np.uint64)
+            keys[base + lo:base + lo + len(chunk)] = (
+                (chunk << np.uint64(32))
+                | np.arange(base + lo, base + lo + len(chunk), dtype=np.uint64))
+        e["base"] = base
+        base += len(seeds)
+    keys.sort()
+
+    values = keys >> np.uint64(32)
+    same = values[1:] == values[:-1]
+    member = np.zeros(total, dtype=bool)
+    member[1:] |= same
+    member[:-1] |= same
+    hits = keys[member]
+    return hits >> np.uint64(32), hits & np.uint64(0xFFFFFFFF)
+
+
+def _cell_table(experiments: list[dict]) -> tuple[list[dict], np.ndarray]:
+    """All cells with global offsets and labels, sorted by global offset."""
+    cells = []
+    for i, e in enumerate(experiments):
+        for c in e["cells"]:
+            cells.append({**c, "experiment": i, "cell": len(cells),
+                          "model": e["model"], "temperature": e["temperature"],
+                          "global_offset": e["base"] + c["offset"]})
+    cells.sort(key=lambda c: c["global_offset"])
+    return cells, np.array([c["global_offset"] for c in cells], dtype=np.int64)
+
+
+def _pairs_by_key(members: list[dict], key: tuple) -> int:
+    counts = {}
+    for m in members:
+        k = tuple(m[f] for f in key)
+        counts[k] = counts.get(k, 0) + 1
+    return sum(c * (c - 1) // 2 for c in counts.values())
+
+
+def _group_sizes(cells: list[dict], key: tuple) -> dict:
+    """Seed count per value of key over all cells."""
+    sizes = {}
+    for c in cells:
+        k = tuple(c[f] for f in key)
+        sizes[k] = sizes.get(k, 0) + c["count"]
+    return sizes
+
+
+def analyze_collisions(experiments: list[dict]) -> dict:
+    """Collision groups, per-scope counts against the birthday bound, affected cells."""
+    t0 = time.perf_counter()
+    values, index = collision_groups(experiments)
+    cells, starts = _cell_table(experiments)
+    total = sum(len(e["seeds"]) for e in experiments)
+
+    # Map members back to cells; read their full 64-bit seeds
+    idx = index.astype(np.int64)
+    owner = np.searchsorted(starts, idx, side="right") - 1
+    members = []
+    for v, g, c in zip(values.tolist(), idx.tolist(), owner.tolist()):
+        cell = cells[c]
+        e = experiments[cell["experiment"]]
+        sample = g - cell["global_offset"]
+        if c < 0 or sample >= cell["count"]:
+            raise ValueError(f"seed {g} is not covered by any ledger cell")
+        members.append({
+            "seed_32": v,
+            "seed_64": int(e["seeds"][g - e["base"]]),
+            "sample": sample,
+            **{f: cell[f] for f in ("experiment", "cell", "stream", "block", "prompt",
+                                    "source", "model", "temperature")},
+        })
+
+    groups = []
+    lo = 0
+    while lo < len(members):
+        hi = lo + 1
+        while hi < len(members) and members[hi]["seed_32"] == members[lo]["seed_32"]:
+            hi += 1
+        groups.append(members[lo:hi])
+        lo = hi
+
+    # Cumulative pair counts per nested scope, then exclusive differences
+    observed = {s: 0 for s in SCOPE_KEYS}
+    identical = {s: 0 for s in SCOPE_KEYS}
+    duplicate_generation_pairs = 0
+    listed = []
+    for group in groups:
+        for scope, key in SCOPE_KEYS.items():
+            observed[scope] += _pairs_by_key(group, key)
+            identical[scope] += _pairs_by_key(group, key + ("seed_64",))
+        dup = _pairs_by_key([m for m in group if m["prompt"] is not None], GENERATION_KEY)
+        duplicate_generation_pairs += dup
+        listed.append({
+            "seed_32": group[0]["seed_32"],
+            "size": len(group),
+            "distinct_64bit": len({m["seed_64"] for m in group}),
+            "duplicate_generation": dup > 0,
+            "members": [{f: m[f] for f in ("experiment", "stream", "block", "prompt",
+                                           "source", "sample", "seed_64")} for m in group],
+        })
+    listed.sort(key=lambda g: (not g["duplicate_generation"], -g["size"]))
+
+    expected = {s: expected_pairs(_group_sizes(cells, key).values()) for s, key in SCOPE_KEYS.items()}
+    scopes = {}
+    for name, (outer, inner) in EXCLUSIVE_SCOPES.items():
+        obs = observed[outer] - (observed[inner] if inner else 0)
+        same64 = identical[outer] - (identical[inner] if inner else 0)
+        exp = expected[outer] - (expected[inner] if inner else 0)
+        # identical 64-bit pairs are source repeats, not truncation collisions
+        truncation = obs - same64
+        scopes[name] = {
+            "observed_pairs": obs,
+            "identical_64bit_pairs": same64,
+            "truncation_pairs": truncation,
+            "expected_pairs": _sig(exp),
+            "ratio": round(truncation / exp, 4) if exp > 0 else None,
+            "p_value": round(poisson_tail(truncation, exp), 6) if exp > 0 else None,
+        }
+
+    # Per experiment × source: repeated seeds against the birthday bound
+    per_source = {}
+    source_members = {}
+    for m in members:
+        source_members.setdefault((m["experiment"], m["source"]), []).append(m)
+    for (exp_i, source), n in _group_sizes(cells, SCOPE_KEYS["source"]).items():
+        ms = source_members.get((exp_i, source), [])
+        counts = {}
+        for m in ms:
+            counts[m["seed_32"]] = counts.get(m["seed_32"], 0) + 1
+        repeated = sum(c - 1 for c in counts.values() if c > 1)
+        pairs = sum(c * (c - 1) // 2 for c in counts.values())
+        row = birthday_expectation(n)
+        per_source[f"{exp_i}:{source}"] = {
+            "experiment": exp_i,
+            "source": source,
+            **row,
+            "observed_pairs": pairs,
+            "observed_repeated_seeds": repeated,
+            "distinct_32bit": n - repeated,
+            "p_value": round(poisson_tail(pairs, row["expected_pairs"]), 6),
+        }
+
+    # Affected cells: every cell holding a colliding sample
+    affected = {}
+    for m in members:
+        a = affected.setdefault(m["cell"], {
+            **{f: m[f] for f in ("experiment", "stream", "block", "prompt", "source")},
+            "samples": []})
+        a["samples"].append(m["sample"])
+    affected_cells = sorted(affected.values(), key=lambda a: -len(a["samples"]))
+
+    return {
+        "n_seeds": total,
+        "n_cells": len(cells),
+        "seed_space": SPACE,
+        "overall": {**birthday_expectation(total),
+                    "observed_pairs": observed["all"],
+                    "observed_repeated_seeds": sum(len(g) - 1 for g in groups),
+                    "identical_64bit_pairs": identical["all"]},
+        "n_collision_groups": len(groups),
+        "duplicate_generation_pairs": duplicate_generation_pairs,
+        "scopes": scopes,
+        "per_source": per_source,
+        "n_affected_cells": len(affected_cells),
+        "affected_cells": affected_cells[:MAX_CELLS],
+        "groups": listed[:MAX_GROUPS],
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def print_report(report: dict, experiments: list[dict]):
+    o = report["overall"]
+    print(f"\n{report['n_seeds']:,} seeds in {report['n_cells']} cells, "
+          f"{len(experiments)} experiment(s) ({report['seconds']:.2f}s)")
+    print(f"  collision groups: {report['n_collision_groups']}, pairs: {o['observed_pairs']} "
+          f"(birthday expectation {o['expected_pairs']:.4g}), "
+          f"identical 64-bit pairs: {o['identical_64bit_pairs']}, "
+          f"duplicate generations: {report['duplicate_generation_pairs']}")
+    print("\n  Scope                                  obs  same64    expected        p")
+    for name, s in report["scopes"].items():
+        p = "-" if s["p_value"] is None else f"{s['p_value']:.4f}"
+        print(f"  {name:<36} {s['observed_pairs']:>5} {s['identical_64bit_pairs']:>7} "
+              f"{s['expected_pairs']:>11.4g} {p:>8}")
+    print("\n  Per source:")
+    for row in report["per_source"].values():
+        name = Path(experiments[row["experiment"]]["file"]).stem
+        print(f"    {name} {row['source']}: n={row['n']:,} pairs={row['observed_pairs']} "
+              f"(expected {row['expected_pairs']:.4g}, P(any)={row['p_any_collision']:.4f}, "
+              f"p={row['p_value']:.4f})")
+    for g in report["groups"][:10]:
+        where = "; ".join(f"{m['source']}/{m['block']}/{m['prompt']}#{m['sample']} s{m['stream']}"
+                          for m in g["members"])
+        flag = "  <-- duplicate generation" if g["duplicate_generation"] else ""
+        print(f"    seed32={g['seed_32']}: {where}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="32-bit seed collision analysis")
+    parser.add_argument("results", nargs="*",
+                        help="Experiment result JSONs with seed_ledger references")
+    parser.add_argument("--simulate", type=int, default=None,
+                        help="Analyze N freshly generated seeds per source instead")
+    args = parser.parse_args()
+
+    if args.simulate:
+        experiments = [simulated_experiment(args.simulate)]
+        stem = f"simulated_n{args.simulate}"
+    elif args.results:
+        experiments = [load_experiment(p) for p in args.results]
+        stem = Path(args.results[0]).stem + (f"_plus{len(args.results) - 1}"
+                                             if len(args.results) > 1 else "")
+    else:
+        parser.error("give result JSONs or --simulate N")
+
+    report = analyze_collisions(experiments)
+    print_report(report, experiments)
+
+    results = {
+        "analysis_type": "seed_collisions",
+        "timestamp": datetime.now().isoformat(),
+        "experiments": [{"file": e["file"], "model": e["model"],
+                         "temperature": e["temperature"], "n_seeds": len(e["seeds"]),
+                         "n_cells": len(e["cells"])} for e in experiments],
+        **report,
+    }
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    filepath = OUTPUT_DIR / f"collisions_{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filepath, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved: {filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,23 +11,28 @@ Tests:
   - Chi-squared goodness-of-fit (256 bins)
   - Anderson-Darling test
   - Lag-1 through lag-5 autocorrelation
+  - Full-range FFT autocorrelation, Ljung-Box and periodogram (serial_correlation.py)
   - Runs test for randomness
   - Inter-source 2-sample KS test
   - Bit-level analysis (per-bit bias)
+  - 64-bit engine: per-bit bias over all 64 bits, pairwise bit correlations,
+    per-position byte histograms and adjacent byte-pair chi-squared
+  - NIST SP 800-22 style battery on the packed bitstream (nist_battery.py)
 
 Usage:
     python analyze_seed_distributions.py --n 10000
+    python analyze_seed_distributions.py --n 1000000 --workers 4
     python analyze_seed_distributions.py --n 10000 --from-experiment results/v2.json
+    python analyze_seed_distributions.py --n 100000000 --streaming
+    python analyze_seed_distributions.py --benchmark-bits --sizes 100000,1000000,10000000
 """
 
 import sys
 sys.stdout.reconfigure(line_buffering=True)
 
 import argparse
-import hashlib
 import json
 import random
-import secrets
 import time
 from collections import Counter
 from datetime import datetime
@@ -36,29 +41,64 @@ from pathlib import Path
 import numpy as np
 from scipy import stats
 
+from entropy_sources import PHILOX_ROOT, hmix_seeds, os_pool, philox_seeds
+from nist_battery import NistBattery, nist_battery, seeds_to_bytes
+from seed_ledger import iter_seeds_by_source, seeds_by_source
+from serial_correlation import (STREAM_MAX_LAG, WELCH_SEGMENT, SerialAccumulator,
+                                autocorrelation, serial_correlation_analysis)
+
 OUTPUT_DIR = Path(__file__).parent.parent / "results" / "seed_analysis"
+BIT_CHUNK = 1 << 18        # seeds per unpackbits chunk (16 MiB of bit matrix)
 
 
 # ─────────────────────────────────────────────────────────────────────
 # Seed generators (matching experiment v2)
 # ─────────────────────────────────────────────────────────────────────
 
-def generate_prng_seeds(n: int, stream_seed: int = 42) -> list[int]:
-    rng = random.Random(stream_seed)
-    return [rng.getrandbits(64) % (2**32) for _ in range(n)]
+def generate_prng_seeds64(n: int, stream_seed: int = 42, engine: str = "mt",
+                          root: int = PHILOX_ROOT) -> np.ndarray:
+    if engine == "philox":
+        return philox_seeds(n, stream=stream_seed, root=root)
+    # randbytes(8n) is the same MT output as n getrandbits(64) calls
+    return np.frombuffer(random.Random(stream_seed).randbytes(8 * n), dtype="<u8").astype(np.uint64)
+
+
+def generate_trng_seeds64(n: int) -> np.ndarray:
+    return os_pool().get_seeds64(n)
+
+
+def generate_hmix_seeds64(n: int) -> np.ndarray:
+    # counters 0..n-1, as the original per-seed loop
+    return hmix_seeds(n, start=0)
+
+
+def generate_prng_seeds(n: int, stream_seed: int = 42, engine: str = "mt",
+                        root: int = PHILOX_ROOT) -> list[int]:
+    return (generate_prng_seeds64(n, stream_seed, engine, root) % (2**32)).tolist()
 
 
 def generate_trng_seeds(n: int) -> list[int]:
-    return [int.from_bytes(secrets.token_bytes(8), 'big') % (2**32) for _ in range(n)]
+    return (generate_trng_seeds64(n) % (2**32)).tolist()
 
 
 def generate_hmix_seeds(n: int) -> list[int]:
-    seeds = []
-    for i in range(n):
-        data = f"{time.time_ns()}-{secrets.token_hex(16)}-{i}"
-        h = hashlib.sha256(data.encode()).digest()
-        seeds.append(int.from_bytes(h[:8], 'big') % (2**32))
-    return seeds
+    return (generate_hmix_seeds64(n) % (2**32)).tolist()
+
+
+def iter_seed_blocks(source: str, n: int, block: int, stream_seed: int = 42,
+                     engine: str = "mt", root: int = PHILOX_ROOT):
+    """The seeds generate_*_seeds64(n) would return, as uint64 blocks."""
+    rng = random.Random(stream_seed)
+    for start in range(0, n, block):
+        m = min(block, n - start)
+        if source == "TRNG":
+            yield os_pool().get_seeds64(m)
+        elif source == "HMIX":
+            yield hmix_seeds(m, start=start)
+        elif engine == "philox":
+            yield philox_seeds(m, stream=stream_seed, root=root, offset=start)
+        else:
+            yield np.frombuffer(rng.randbytes(8 * m), dtype="<u8").astype(np.uint64)
 
 
 # ─────────────────────────────────────────────────────────────────────
@@ -118,16 +158,18 @@ def test_uniformity(seeds: list[int], n_bins: int = 256) -> dict:
 def test_autocorrelation(seeds: list[int], max_lag: int = 10) -> dict:
     """Test serial correlation at multiple lags."""
     arr = np.array(seeds, dtype=np.float64)
-    n = len(arr)
-    mean = np.mean(arr)
-    var = np.var(arr, ddof=0)
+    # one FFT for all lags; same (n - lag) normalisation as per-lag sums
+    return _autocorrelation_report(autocorrelation(arr, max_lag, unbiased=True),
+                                   len(arr), max_lag)
+
 
-    if var == 0:
+def _autocorrelation_report(acf: np.ndarray, n: int, max_lag: int) -> dict:
+    if np.isnan(acf[0]):
         return {"error": "zero variance"}
 
     results = {}
     for lag in range(1, min(max_lag + 1, n)):
-        autocorr = np.sum((arr[:-lag] - mean) * (arr[lag:] - mean)) / ((n - lag) * var)
+        autocorr = acf[lag]
         # Under H0 (independence), autocorr ~ N(0, 1/n) for large n
         z = autocorr * np.sqrt(n)
         p_value = 2 * (1 - stats.norm.cdf(abs(z)))
@@ -148,13 +190,14 @@ def test_runs(seeds: list[int]) -> dict:
     binary = (arr > median).astype(int)
 
     # Count runs
-    runs = 1
-    for i in range(1, len(binary)):
-        if binary[i] != binary[i - 1]:
-            runs += 1
+    runs = 1 + int(np.count_nonzero(binary[1:] != binary[:-1]))
 
     n1 = int(np.sum(binary))
     n0 = len(binary) - n1
+    return _runs_report(runs, n0, n1)
+
+
+def _runs_report(runs: int, n0: int, n1: int) -> dict:
     n = n0 + n1
 
     if n0 == 0 or n1 == 0:
@@ -179,18 +222,25 @@ def test_runs(seeds: list[int]) -> dict:
     }
 
 
+def _bit_matrix(seeds: np.ndarray) -> np.ndarray:
+    """(n, 64) uint8 matrix; column k is bit k (LSB = column 0)."""
+    le = np.ascontiguousarray(seeds, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(le, axis=1, bitorder="little")
+
+
 def test_bit_bias(seeds: list[int], n_bits: int = 32) -> dict:
     """Test per-bit bias across all seeds."""
     n = len(seeds)
-    bit_counts = np.zeros(n_bits)
+    bit_counts = np.zeros(n_bits, dtype=np.int64)
+    arr = np.asarray(seeds, dtype=np.uint64)
+    for i in range(0, n, BIT_CHUNK):
+        bit_counts += _bit_matrix(arr[i:i + BIT_CHUNK])[:, :n_bits].sum(axis=0, dtype=np.int64)
+
+    return _bit_bias_report(bit_counts, n, n_bits)
 
-    for seed in seeds:
-        for bit in range(n_bits):
-            if seed & (1 << bit):
-                bit_counts[bit] += 1
 
+def _bit_bias_report(bit_counts: np.ndarray, n: int, n_bits: int) -> dict:
     # Each bit should be 1 approximately n/2 times
-    expected = n / 2
     results = {}
     biased_bits = 0
 
@@ -198,7 +248,7 @@ def test_bit_bias(seeds: list[int], n_bits: int = 32) -> dict:
         count = int(bit_counts[bit])
         proportion = count / n
         p_value = stats.binomtest(count, n, 0.5).pvalue
-        is_biased = p_value < 0.05 / n_bits  # Bonferroni-corrected
+        is_biased = bool(p_value < 0.05 / n_bits)  # Bonferroni-corrected
         if is_biased:
             biased_bits += 1
         results[f"bit_{bit}"] = {
@@ -212,11 +262,152 @@ def test_bit_bias(seeds: list[int], n_bits: int = 32) -> dict:
         "n_seeds": n,
         "n_bits_tested": n_bits,
         "n_biased_bits": biased_bits,
-        "overall_proportion_1": round(float(np.mean(bit_counts) / n), 6),
+        "overall_proportion_1": round(float(np.mean(bit_counts[:n_bits]) / n), 6),
         "per_bit": results,
     }
 
 
+def _test_bit_bias_loop(seeds: list[int], n_bits: int = 32) -> np.ndarray:
+    """Original per-seed, per-bit counting loop; kept for --benchmark-bits."""
+    bit_counts = np.zeros(n_bits)
+    for seed in seeds:
+        for bit in range(n_bits):
+            if seed & (1 << bit):
+                bit_counts[bit] += 1
+    return bit_counts
+
+
+class BitByteAccumulator:
+    """One-pass bit and byte statistics over chunks of 64-bit seeds.
+
+    Keeps per-bit one counts, the 64x64 matrix of joint one counts (for
+    pairwise bit correlations), per-position byte histograms (byte k =
+    bits 8k..8k+7) and a 65536-bin histogram of adjacent byte pairs
+    (k, k+1) inside each seed. All state is integer counts, so chunks
+    can be fed in any order.
+    """
+    def __init__(self, n_bits: int = 64):
+        if n_bits % 8:
+            raise ValueError(f"n_bits must be a multiple of 8, got {n_bits}")
+        self.n_bits = n_bits
+        self.n_bytes = n_bits // 8
+        self.n = 0
+        self.ones = np.zeros(n_bits, dtype=np.int64)
+        self.joint = np.zeros((n_bits, n_bits), dtype=np.int64)
+        self.byte_hist = np.zeros((self.n_bytes, 256), dtype=np.int64)
+        self.pair_hist = np.zeros(65536, dtype=np.int64)
+
+    def update(self, seeds: np.ndarray):
+        for i in range(0, len(seeds), BIT_CHUNK):
+            self._update_chunk(np.asarray(seeds[i:i + BIT_CHUNK], dtype=np.uint64))
+
+    def _update_chunk(self, chunk: np.ndarray):
+        m = len(chunk)
+        if not m:
+            return
+        by = np.ascontiguousarray(chunk, dtype="<u8").view(np.uint8).reshape(m, 8)[:, :self.n_bytes]
+        f = np.unpackbits(by, axis=1, bitorder="little").astype(np.float32)
+        # float32 products are exact while m < 2^24; bits are 0/1, so the
+        # diagonal of the joint counts is the per-bit one count
+        joint = np.rint(f.T @ f).astype(np.int64)
+        self.joint += joint
+        self.ones += np.diagonal(joint)
+        offsets = (np.arange(self.n_bytes, dtype=np.int64) * 256)[None, :]
+        self.byte_hist += np.bincount((by + offsets).ravel(),
+                                      minlength=self.n_bytes * 256).reshape(self.n_bytes, 256)
+        if self.n_bytes > 1:
+            pairs = (by[:, :-1].astype(np.int64) << 8) | by[:, 1:]
+            self.pair_hist += np.bincount(pairs.ravel(), minlength=65536)
+        self.n += m
+
+    def merge(self, other: "BitByteAccumulator"):
+        self.n += other.n
+        self.ones += other.ones
+        self.joint += other.joint
+        self.byte_hist += other.byte_hist
+        self.pair_hist += other.pair_hist
+
+    def report(self, alpha: float = 0.05, top: int = 5) -> dict:
+        n, nb = self.n, self.n_bits
+        if n < 2:
+            return {"n_seeds": n, "error": f"only {n} seeds"}
+
+        # Per-bit bias (normal approximation to the binomial, Bonferroni)
+        z_bits = (2 * self.ones - n) / np.sqrt(n)
+        p_bits = 2 * stats.norm.sf(np.abs(z_bits))
+        biased = p_bits < alpha / nb
+
+        # Pairwise phi coefficients; sqrt(n) * phi ~ N(0, 1) under independence
+        p1 = self.ones / n
+        cov = self.joint / n - np.outer(p1, p1)
+        var = p1 * (1 - p1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            phi = cov / np.sqrt(np.outer(var, var))
+        iu = np.triu_indices(nb, k=1)
+        phi_pairs = np.nan_to_num(phi[iu])
+        p_pairs = 2 * stats.norm.sf(np.abs(phi_pairs) * np.sqrt(n))
+        n_pairs = len(phi_pairs)
+        order = np.argsort(-np.abs(phi_pairs))[:top]
+
+        # Byte-value histograms, one chi-squared per byte position
+        expected_byte = n / 256
+        chi2_pos = ((self.byte_hist - expected_byte) ** 2).sum(axis=1) / expected_byte
+        p_pos = stats.chi2.sf(chi2_pos, 255)
+        pooled = self.byte_hist.sum(axis=0)
+        expected_pooled = n * self.n_bytes / 256
+        chi2_pooled = float(((pooled - expected_pooled) ** 2).sum() / expected_pooled)
+
+        out = {
+            "n_seeds": n,
+            "n_bits": nb,
+            "bit_bias": {
+                "n_biased_bits": int(biased.sum()),
+                "biased_bits": [int(b) for b in np.flatnonzero(biased)],
+                "max_abs_z": round(float(np.abs(z_bits).max()), 4),
+                "overall_proportion_1": round(float(self.ones.sum() / (n * nb)), 6),
+                "proportion_1": [round(float(p), 6) for p in p1],
+                "p_values": [round(float(p), 6) for p in p_bits],
+            },
+            "bit_correlation": {
+                "n_pairs": n_pairs,
+                "max_abs_phi": round(float(np.abs(phi_pairs).max()), 6),
+                "n_correlated_pairs": int((p_pairs < alpha / n_pairs).sum()),
+                "top_pairs": [{"bits": [int(iu[0][k]), int(iu[1][k])],
+                               "phi": round(float(phi_pairs[k]), 6),
+                               "p_value": round(float(p_pairs[k]), 6)} for k in order],
+            },
+            "byte_histogram": {
+                "chi2_per_position": [round(float(c), 2) for c in chi2_pos],
+                "p_per_position": [round(float(p), 6) for p in p_pos],
+                "n_nonuniform_positions": int((p_pos < alpha / self.n_bytes).sum()),
+                "pooled_chi2": round(chi2_pooled, 2),
+                "pooled_p_value": round(float(stats.chi2.sf(chi2_pooled, 255)), 6),
+            },
+        }
+
+        if self.n_bytes > 1:
+            n_pairs_obs = n * (self.n_bytes - 1)
+            expected_pair = n_pairs_obs / 65536
+            chi2_pair = float(((self.pair_hist - expected_pair) ** 2).sum() / expected_pair)
+            out["byte_pairs"] = {
+                "n_pairs": n_pairs_obs,
+                "expected_per_cell": round(expected_pair, 3),
+                "chi2": round(chi2_pair, 2),
+                "dof": 65535,
+                "p_value": round(float(stats.chi2.sf(chi2_pair, 65535)), 6),
+                # the chi-squared approximation wants >= 5 expected per cell
+                "reliable": bool(expected_pair >= 5),
+            }
+        return out
+
+
+def bit_byte_analysis(seeds, n_bits: int = 64) -> dict:
+    """Bit bias, bit correlations, byte and byte-pair histograms in one pass."""
+    acc = BitByteAccumulator(n_bits)
+    acc.update(np.asarray(seeds, dtype=np.uint64))
+    return acc.report()
+
+
 def test_pairwise_distribution(seeds_a: list[int], seeds_b: list[int],
                                 name: str) -> dict:
     """Two-sample tests between source distributions."""
@@ -232,12 +423,19 @@ def test_pairwise_distribution(seeds_a: list[int], seeds_b: list[int],
     # Welch t-test
     t_stat, t_p = stats.ttest_ind(arr_a, arr_b, equal_var=False)
 
+    return _pairwise_report(name, len(seeds_a), len(seeds_b), np.mean(arr_a), np.mean(arr_b),
+                            (ks_stat, ks_p), (u_stat, u_p), (t_stat, t_p))
+
+
+def _pairwise_report(name: str, n_a: int, n_b: int, mean_a: float, mean_b: float,
+                     ks: tuple, mwu: tuple, welch: tuple) -> dict:
+    (ks_stat, ks_p), (u_stat, u_p), (t_stat, t_p) = ks, mwu, welch
     return {
         "comparison": name,
-        "n_a": len(seeds_a),
-        "n_b": len(seeds_b),
-        "mean_a": round(float(np.mean(arr_a)), 6),
-        "mean_b": round(float(np.mean(arr_b)), 6),
+        "n_a": n_a,
+        "n_b": n_b,
+        "mean_a": round(float(mean_a), 6),
+        "mean_b": round(float(mean_b), 6),
         "ks_2sample": {
             "statistic": round(float(ks_stat), 6),
             "p_value": round(float(ks_p), 6),
@@ -257,69 +455,137 @@ def test_pairwise_distribution(seeds_a: list[int], seeds_b: list[int],
 
 
 # ─────────────────────────────────────────────────────────────────────
-# Main analysis
+# Shared-memory parallel analysis
 # ─────────────────────────────────────────────────────────────────────
 
-def analyze_from_generators(n: int, prng_seeds_list: list[int] = None) -> dict:
-    """Generate seeds and run full analysis suite."""
-    if prng_seeds_list is None:
-        prng_seeds_list = [42, 123, 7, 999, 314]
-
-    print(f"Generating {n} seeds per source...")
-
-    all_seeds = {}
-
-    # Multiple PRNG streams
-    for ps in prng_seeds_list:
-        key = f"PRNG_stream_{ps}"
-        all_seeds[key] = generate_prng_seeds(n, stream_seed=ps)
-
-    # Aggregate PRNG (all streams combined)
-    all_seeds["PRNG_combined"] = []
-    for ps in prng_seeds_list:
-        all_seeds["PRNG_combined"].extend(all_seeds[f"PRNG_stream_{ps}"])
-
-    all_seeds["TRNG"] = generate_trng_seeds(n)
-    all_seeds["HMIX"] = generate_hmix_seeds(n)
-
-    results = {
-        "analysis_type": "seed_distribution_characterization",
-        "timestamp": datetime.now().isoformat(),
-        "n_per_source": n,
-        "prng_streams": prng_seeds_list,
-        "per_source": {},
-        "pairwise_comparisons": {},
-        "summary": {},
+KS_EXACT_MAX = 10000       # ks_2samp 'auto' uses the exact null up to this sample size
+MWU_EXACT_MAX = 8          # mannwhitneyu 'auto' may go exact when a sample is this small
+
+# Set in the parent before forking: one SharedMemory block and the layout
+# of every source inside it. Workers inherit the mapping, so the sorted
+# arrays one worker writes are visible to the parent and to later tasks.
+_SHARED = {}
+
+
+def _open_arena(sources: dict[str, tuple[int, str, int]]):
+    """Allocate one shared block for every source's seeds and sorted U(0,1) copy.
+
+    sources maps name -> (n, owner, start). A source owned by another name
+    reads its seeds from owner's seeds[start:start + n] (the PRNG streams
+    inside PRNG_combined), so they are stored once; every source gets its
+    own sorted region.
+    """
+    from multiprocessing import shared_memory
+
+    offset, seed_offset = 0, {}
+    for name, (n, owner, _) in sources.items():
+        if owner == name:
+            seed_offset[name] = offset
+            offset += 8 * n
+    layout = {}
+    for name, (n, owner, start) in sources.items():
+        layout[name] = (seed_offset[owner] + 8 * start, n, offset)
+        offset += 8 * n
+    _SHARED.update(shm=shared_memory.SharedMemory(create=True, size=max(offset, 1)),
+                   layout=layout)
+
+
+def _close_arena():
+    shm = _SHARED.pop("shm")
+    _SHARED.clear()
+    shm.unlink()
+    shm.close()
+
+
+def _shared_seeds(name: str) -> np.ndarray:
+    seed_offset, n, _ = _SHARED["layout"][name]
+    return np.ndarray(n, dtype=np.uint64, buffer=_SHARED["shm"].buf, offset=seed_offset)
+
+
+def _shared_sorted(name: str) -> np.ndarray:
+    _, n, sorted_offset = _SHARED["layout"][name]
+    return np.ndarray(n, dtype=np.float64, buffer=_SHARED["shm"].buf, offset=sorted_offset)
+
+
+def _source_suite(name: str) -> tuple:
+    """Per-source suite on shared seeds; also fills the source's sorted region."""
+    t0 = time.perf_counter()
+    seeds64 = _shared_seeds(name)
+    seeds = seeds64 % (2**32)
+    print(f"\nAnalyzing {name} ({len(seeds)} seeds)...")
+    normalized = seeds / (2**32)
+    ordered = _shared_sorted(name)
+    ordered[:] = normalized
+    ordered.sort()
+    moments = (float(np.mean(normalized)), float(np.var(normalized, ddof=1)))
+    suite = {
+        "uniformity": test_uniformity(seeds),
+        "autocorrelation": test_autocorrelation(seeds),
+        "serial_correlation": serial_correlation_analysis(seeds),
+        "runs_test": test_runs(seeds),
+        "bit_bias": test_bit_bias(seeds),
+        "bit_byte_64": bit_byte_analysis(seeds64),
+        "nist_battery": nist_battery(seeds_to_bytes(seeds64)),
     }
+    del seeds64, ordered
+    return name, suite, moments, time.perf_counter() - t0
+
+
+def _ks_2samp_sorted(a: np.ndarray, b: np.ndarray) -> tuple[float, float]:
+    """ks_2samp on presorted samples, with the same D and p as its 'auto' mode."""
+    n1, n2 = len(a), len(b)
+    if max(n1, n2) <= KS_EXACT_MAX:
+        return tuple(stats.ks_2samp(a, b))  # exact null; re-sorting 10^4 values is negligible
+    data_all = np.concatenate((a, b))
+    diff = np.searchsorted(a, data_all, side="right") / n1 - \
+        np.searchsorted(b, data_all, side="right") / n2
+    d = max(float(diff.max()), float(np.clip(-diff.min(), 0, 1)))
+    en = n1 * n2 / (n1 + n2)
+    return d, float(np.clip(stats.kstwo.sf(d, np.round(en)), 0, 1))
+
+
+def _mannwhitneyu_sorted(a: np.ndarray, b: np.ndarray) -> tuple[float, float]:
+    """Two-sided mannwhitneyu on presorted samples (asymptotic, tie-corrected).
+
+    U1 counts the b values below each a value (ties as 1/2); tie sizes come
+    from the merged order, built from searchsorted positions instead of a sort.
+    """
+    n1, n2 = len(a), len(b)
+    if min(n1, n2) <= MWU_EXACT_MAX:
+        return tuple(stats.mannwhitneyu(a, b, alternative="two-sided"))
+    lo = np.searchsorted(b, a, side="left")
+    hi = np.searchsorted(b, a, side="right")
+    u1 = float(lo.sum()) + 0.5 * float((hi - lo).sum())
+
+    n = n1 + n2
+    merged = np.empty(n)
+    merged[np.arange(n1) + lo] = a
+    merged[np.arange(n2) + np.searchsorted(a, b, side="right")] = b
+    t = np.diff(np.concatenate(([0], np.flatnonzero(np.diff(merged)) + 1, [n]))).astype(np.float64)
+    tie_term = float((t ** 3 - t).sum())
+    s = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    z = (max(u1, n1 * n2 - u1) - n1 * n2 / 2 - 0.5) / s
+    return u1, float(np.clip(2 * stats.norm.sf(z), 0, 1))
+
+
+def _pairwise_task(task: tuple) -> tuple:
+    name, a, b, (mean_a, var_a), (mean_b, var_b) = task
+    arr_a, arr_b = _shared_sorted(a), _shared_sorted(b)
+    n_a, n_b = len(arr_a), len(arr_b)
+    ks = _ks_2samp_sorted(arr_a, arr_b)
+    mwu = _mannwhitneyu_sorted(arr_a, arr_b)
+    del arr_a, arr_b
+    welch = stats.ttest_ind_from_stats(mean_a, np.sqrt(var_a), n_a, mean_b, np.sqrt(var_b), n_b,
+                                       equal_var=False)
+    return name, _pairwise_report(name, n_a, n_b, mean_a, mean_b, ks, mwu, tuple(welch))
 
-    # Per-source analysis
-    for source_name, seeds in all_seeds.items():
-        print(f"\nAnalyzing {source_name} ({len(seeds)} seeds)...")
-        results["per_source"][source_name] = {
-            "uniformity": test_uniformity(seeds),
-            "autocorrelation": test_autocorrelation(seeds),
-            "runs_test": test_runs(seeds),
-            "bit_bias": test_bit_bias(seeds),
-        }
-
-    # Pairwise comparisons (main sources only)
-    main_sources = ["PRNG_combined", "TRNG", "HMIX"]
-    for i in range(len(main_sources)):
-        for j in range(i + 1, len(main_sources)):
-            name = f"{main_sources[i]}_vs_{main_sources[j]}"
-            print(f"\nComparing {name}...")
-            results["pairwise_comparisons"][name] = test_pairwise_distribution(
-                all_seeds[main_sources[i]], all_seeds[main_sources[j]], name)
 
-    # Cross-stream PRNG comparisons
-    for i in range(len(prng_seeds_list)):
-        for j in range(i + 1, len(prng_seeds_list)):
-            s1, s2 = prng_seeds_list[i], prng_seeds_list[j]
-            name = f"PRNG_{s1}_vs_PRNG_{s2}"
-            results["pairwise_comparisons"][name] = test_pairwise_distribution(
-                all_seeds[f"PRNG_stream_{s1}"], all_seeds[f"PRNG_stream_{s2}"], name)
+# ─────────────────────────────────────────────────────────────────────
+# Main analysis
+# ─────────────────────────────────────────────────────────────────────
 
-    # Summary
+def summarize(results: dict) -> dict:
+    """Print the per-source and pairwise summary; return the summary block."""
     print(f"\n{'='*60}")
     print("SUMMARY")
     print(f"{'='*60}")
@@ -331,24 +597,133 @@ def analyze_from_generators(n: int, prng_seeds_list: list[int] = None) -> dict:
         auto = analysis["autocorrelation"].get("lag_1", {}).get("autocorrelation", "N/A")
         runs_p = analysis["runs_test"].get("p_value", "N/A")
         n_biased = analysis["bit_bias"]["n_biased_bits"]
+        bb = analysis["bit_byte_64"]
         uniform_results[source] = {
             "ks_uniform": u["ks_test"]["uniform"],
             "lag1_autocorr": auto,
             "runs_random": analysis["runs_test"].get("random", "N/A"),
             "biased_bits": n_biased,
+            "biased_bits_64": bb["bit_bias"]["n_biased_bits"],
+            "correlated_bit_pairs": bb["bit_correlation"]["n_correlated_pairs"],
+            "byte_pair_p": bb["byte_pairs"]["p_value"],
+            "ljung_box_p": {h: v["p_value"] for h, v in
+                            analysis["serial_correlation"]["ljung_box"].items()},
+            "periodogram_p": analysis["serial_correlation"]["periodogram"].get("fisher_g_p_value"),
+            "nist_failed": analysis.get("nist_battery", {}).get("failed"),
         }
         status = "PASS" if u["ks_test"]["uniform"] else "FAIL"
         print(f"  {source}: KS uniform={status} (p={ks_p:.4f}), "
               f"autocorr={auto}, runs={'random' if analysis['runs_test'].get('random') else 'NOT random'}, "
-              f"biased_bits={n_biased}/32")
+              f"biased_bits={n_biased}/32, "
+              f"64-bit: biased={bb['bit_bias']['n_biased_bits']}/64 "
+              f"corr_pairs={bb['bit_correlation']['n_correlated_pairs']} "
+              f"byte_pair_p={bb['byte_pairs']['p_value']:.4f}, "
+              f"NIST {analysis.get('nist_battery', {}).get('n_passed', '-')}/"
+              f"{analysis.get('nist_battery', {}).get('n_tests', '-')}")
 
     print("\nPairwise distribution differences:")
     for name, comp in results["pairwise_comparisons"].items():
         ks = comp["ks_2sample"]
         print(f"  {name}: {'DIFFERENT' if ks['different'] else 'SAME'} (KS p={ks['p_value']:.4f})")
 
-    results["summary"] = uniform_results
+    return uniform_results
+
+
+def analyze_from_generators(n: int, prng_seeds_list: list[int] = None,
+                            prng_engine: str = "mt", prng_root: int = PHILOX_ROOT,
+                            workers: int = 1) -> dict:
+    """Generate seeds and run full analysis suite.
+
+    Seeds live in one shared-memory block. Per-source suites run on a pool
+    of `workers` forked processes (largest source first); each also writes
+    its source's sorted U(0,1) copy, which every pairwise comparison then
+    reads without re-sorting. Wall-clock per phase goes to results["timing"].
+    """
+    if prng_seeds_list is None:
+        prng_seeds_list = [42, 123, 7, 999, 314]
+
+    t_start = t0 = time.perf_counter()
+    phases = {}
+    print(f"Generating {n} seeds per source...")
+
+    # PRNG streams are stored as slices of PRNG_combined (all streams combined)
+    k = len(prng_seeds_list)
+    sources = {f"PRNG_stream_{ps}": (n, "PRNG_combined", i * n)
+               for i, ps in enumerate(prng_seeds_list)}
+    sources["PRNG_combined"] = (k * n, "PRNG_combined", 0)
+    sources["TRNG"] = (n, "TRNG", 0)
+    sources["HMIX"] = (n, "HMIX", 0)
+
+    results = {
+        "analysis_type": "seed_distribution_characterization",
+        "timestamp": datetime.now().isoformat(),
+        "n_per_source": n,
+        "prng_streams": prng_seeds_list,
+        "prng_engine": prng_engine,
+        **({"prng_root": prng_root} if prng_engine == "philox" else {}),
+        "per_source": {},
+        "pairwise_comparisons": {},
+        "summary": {},
+    }
 
+    _open_arena(sources)
+    procs = None
+    try:
+        # Multiple PRNG streams
+        for ps in prng_seeds_list:
+            _shared_seeds(f"PRNG_stream_{ps}")[:] = generate_prng_seeds64(
+                n, stream_seed=ps, engine=prng_engine, root=prng_root)
+        _shared_seeds("TRNG")[:] = generate_trng_seeds64(n)
+        _shared_seeds("HMIX")[:] = generate_hmix_seeds64(n)
+        phases["generate"] = time.perf_counter() - t0
+
+        if workers > 1:
+            import multiprocessing as mp
+            procs = mp.get_context("fork").Pool(workers)
+        run = (lambda f, tasks: procs.map(f, tasks, chunksize=1)) if procs else \
+            (lambda f, tasks: list(map(f, tasks)))
+
+        # Per-source analysis
+        t0 = time.perf_counter()
+        done = {}
+        for name, suite, moments, dt in run(_source_suite,
+                                            sorted(sources, key=lambda s: -sources[s][0])):
+            done[name] = (suite, moments, dt)
+        for name in sources:
+            results["per_source"][name] = done[name][0]
+        phases["per_source"] = time.perf_counter() - t0
+
+        # Pairwise comparisons: main sources, then cross-stream PRNG
+        main_sources = ["PRNG_combined", "TRNG", "HMIX"]
+        pairs = [(f"{a}_vs_{b}", a, b) for i, a in enumerate(main_sources)
+                 for b in main_sources[i + 1:]]
+        pairs += [(f"PRNG_{s1}_vs_PRNG_{s2}", f"PRNG_stream_{s1}", f"PRNG_stream_{s2}")
+                  for i, s1 in enumerate(prng_seeds_list) for s2 in prng_seeds_list[i + 1:]]
+        print(f"\nComparing {len(pairs)} pairs...")
+        t0 = time.perf_counter()
+        for name, report in run(_pairwise_task, [(name, a, b, done[a][1], done[b][1])
+                                                 for name, a, b in pairs]):
+            results["pairwise_comparisons"][name] = report
+        phases["pairwise"] = time.perf_counter() - t0
+    finally:
+        if procs is not None:
+            procs.close()
+            procs.join()
+        _close_arena()
+
+    t0 = time.perf_counter()
+    results["summary"] = summarize(results)
+    phases["summary"] = time.perf_counter() - t0
+    phases["total"] = time.perf_counter() - t_start
+
+    results["timing"] = {
+        "workers": workers,
+        "phases_seconds": {k: round(v, 4) for k, v in phases.items()},
+        "per_source_seconds": {name: round(done[name][2], 4) for name in sources},
+    }
+    print("\nWall-clock per phase:")
+    for phase, dt in phases.items():
+        print(f"  {phase:<12} {dt:9.3f}s")
     return results
 
 
@@ -358,14 +733,21 @@ def analyze_from_experiment(filepath: str) -> dict:
         data = json.load(f)
 
     all_seeds = {}
+    seeds64 = {}  # full 64-bit seeds, where the file has them
 
-    if data.get("experiment_version") == "v2":
+    if "seed_ledger" in data:
+        for source, seeds in seeds_by_source(filepath, data["seed_ledger"]).items():
+            seeds64[source] = np.asarray(seeds)
+            all_seeds[source] = (seeds % (2**32)).tolist()
+    elif data.get("experiment_version") == "v2":
         for stream in data.get("streams", []):
             sd = stream.get("seed_distributions", {})
             for source, info in sd.items():
                 if source not in all_seeds:
                     all_seeds[source] = []
                 all_seeds[source].extend(info.get("seeds_32bit", []))
+                if "seeds_64bit" in info:
+                    seeds64.setdefault(source, []).extend(info["seeds_64bit"])
     else:
         st = data.get("single_turn", {})
         for prompt, sources in st.items():
@@ -393,9 +775,14 @@ def analyze_from_experiment(filepath: str) -> dict:
         results["per_source"][source] = {
             "uniformity": test_uniformity(seeds),
             "autocorrelation": test_autocorrelation(seeds, max_lag=5),
+            "serial_correlation": serial_correlation_analysis(seeds),
             "runs_test": test_runs(seeds),
             "bit_bias": test_bit_bias(seeds),
         }
+        if source in seeds64:
+            results["per_source"][source]["bit_byte_64"] = bit_byte_analysis(seeds64[source])
+            results["per_source"][source]["nist_battery"] = nist_battery(
+                seeds_to_bytes(seeds64[source]))
 
     sources = [s for s in all_seeds if len(all_seeds[s]) >= 10]
     for i in range(len(sources)):
@@ -407,6 +794,346 @@ def analyze_from_experiment(filepath: str) -> dict:
     return results
 
 
+# ─────────────────────────────────────────────────────────────────────
+# Streaming analysis
+# ─────────────────────────────────────────────────────────────────────
+
+STREAM_BLOCK = 1 << 20     # seeds generated / read per block
+KS_BITS = 20               # KS / MWU resolution: histogram of the top 20 of 32 bits
+AD_CRITICAL_CASE0 = {"15%": 1.610, "10%": 1.933, "5%": 2.492, "2.5%": 3.070, "1%": 3.857}
+
+
+class StreamingSeedAccumulator:
+    """Mergeable per-source state behind the streaming per_source report.
+
+    Memory is fixed (a 2^KS_BITS histogram, the BitByteAccumulator and
+    a SerialAccumulator) whatever the number of seeds, except for the
+    NIST battery's p-values: nine per completed sequence, so they grow
+    linearly with the stream (about 620,000 floats for 2^30 seeds at
+    10^6-bit sequences). Feed uint64 blocks in
+    draw order; merge(other) appends other's seeds after this one's, so
+    PRNG_combined is the merge of its streams.
+
+    Differences from the in-memory tests: KS, Anderson-Darling and the
+    two-sample rank tests use the binned ECDF (values resolved to 2^-20);
+    Anderson-Darling is the fully specified U(0,1) form (case 0 critical
+    values); the runs test dichotomises at the population median 2^31;
+    serial correlation stops at STREAM_MAX_LAG with a Welch periodogram.
+    """
+    def __init__(self, max_lag: int = STREAM_MAX_LAG, nist: bool = True):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hist = np.zeros(1 << KS_BITS, dtype=np.int64)
+        self.n_high = 0          # values >= 2^31
+        self.transitions = 0
+        self.first_high = None
+        self.last_high = None
+        self.bits = BitByteAccumulator(64)
+        self.serial = SerialAccumulator(max_lag=max_lag, center=0.5)
+        self.nist = NistBattery() if nist else None
+
+    def update(self, seeds64: np.ndarray):
+        seeds64 = np.asarray(seeds64, dtype=np.uint64)
+        if not len(seeds64):
+            return
+        u = seeds64 & np.uint64(0xFFFFFFFF)
+        x = u / 2**32
+
+        # Chan et al. parallel mean / M2 update
+        m, mean = len(x), float(x.mean())
+        m2 = float(((x - mean) ** 2).sum())
+        self._merge_moments(m, mean, m2)
+
+        self.hist += np.bincount((u >> np.uint64(32 - KS_BITS)).astype(np.intp),
+                                 minlength=len(self.hist))
+
+        high = u >= np.uint64(1 << 31)
+        self.n_high += int(high.sum())
+        self.transitions += int(np.count_nonzero(high[1:] != high[:-1]))
+        if self.last_high is not None and bool(high[0]) != self.last_high:
+            self.transitions += 1
+        if self.first_high is None:
+            self.first_high = bool(high[0])
+        self.last_high = bool(high[-1])
+
+        self.bits.update(seeds64)
+        self.serial.update(x)
+        if self.nist is not None:
+            self.nist.update_seeds(seeds64)
+
+    def _merge_moments(self, m: int, mean: float, m2: float):
+        n = self.n + m
+        delta = mean - self.mean
+        self.mean += delta * m / n
+        self.m2 += m2 + delta * delta * self.n * m / n
+        self.n = n
+
+    def merge(self, other: "StreamingSeedAccumulator"):
+        """Append other's seeds after this one's."""
+        if not other.n:
+            return
+        if self.last_high is not None and other.first_high != self.last_high:
+            self.transitions += 1
+        if self.first_high is None:
+            self.first_high = other.first_high
+        self.last_high = other.last_high
+        self.transitions += other.transitions
+        self.n_high += other.n_high
+        self._merge_moments(other.n, other.mean, other.m2)
+        self.hist += other.hist
+        self.bits.merge(other.bits)
+        self.serial.merge(other.serial)
+        if self.nist is not None and other.nist is not None:
+            self.nist.merge(other.nist)
+
+    # ── reports in the in-memory per_source format ──
+
+    def _ecdf(self) -> tuple[np.ndarray, np.ndarray]:
+        """(right bin edges, ECDF at those edges)."""
+        edges = np.arange(1, len(self.hist) + 1) / len(self.hist)
+        return edges, np.cumsum(self.hist) / self.n
+
+    def uniformity(self) -> dict:
+        n = self.n
+        edges, F = self._ecdf()
+        left = edges - 1 / len(self.hist)
+        F_left = np.concatenate(([0.0], F[:-1]))
+        ks_stat = float(max((F - edges).max(), (left - F_left).max(), 0.0))
+        ks_p = float(stats.kstwo.sf(ks_stat, n))
+
+        chi2_results = {}
+        for bins in [16, 64, 256]:
+            observed = self.hist.reshape(bins, -1).sum(axis=1)
+            chi2_stat, chi2_p = stats.chisquare(observed, np.full(bins, n / bins))
+            chi2_results[f"{bins}_bins"] = {
+                "statistic": round(float(chi2_stat), 4),
+                "p_value": round(float(chi2_p), 6),
+                "uniform": bool(chi2_p > 0.05),
+            }
+
+        # A^2 = n ∫ (F_n - t)^2 / (t(1-t)) dt, midpoint rule per bin
+        t = (left + edges) / 2
+        F_mid = (F_left + F) / 2
+        ad_stat = float(n * (((F_mid - t) ** 2) / (t * (1 - t))).sum() / len(self.hist))
+
+        return {
+            "n": n,
+            "mean": round(self.mean, 6),
+            "std": round(float(np.sqrt(self.m2 / (n - 1))), 6),
+            "expected_mean": 0.5,
+            "expected_std": round(1 / np.sqrt(12), 6),
+            "ks_test": {
+                "statistic": round(ks_stat, 6),
+                "p_value": round(ks_p, 6),
+                "uniform": bool(ks_p > 0.05),
+                "resolution": 2.0 ** -KS_BITS,
+            },
+            "chi_squared": chi2_results,
+            "anderson_darling": {
+                "statistic": round(ad_stat, 4),
+                "critical_values": AD_CRITICAL_CASE0,
+                "case": "fully specified U(0,1), binned ECDF",
+            },
+        }
+
+    def runs_test(self) -> dict:
+        out = _runs_report(self.transitions + 1, self.n - self.n_high, self.n_high)
+        out["threshold"] = "2^31 (population median)"
+        return out
+
+    def report(self, max_lag: int = 10) -> dict:
+        return {
+            "uniformity": self.uniformity(),
+            "autocorrelation": _autocorrelation_report(
+                self.serial.autocorrelation(max_lag, unbiased=True), self.n, max_lag),
+            "serial_correlation": self.serial.report(),
+            "runs_test": self.runs_test(),
+            "bit_bias": _bit_bias_report(self.bits.ones, self.n, 32),
+            "bit_byte_64": self.bits.report(),
+            **({"nist_battery": self.nist.report()} if self.nist is not None else {}),
+        }
+
+
+def streaming_pairwise(a: StreamingSeedAccumulator, b: StreamingSeedAccumulator,
+                       name: str) -> dict:
+    """test_pairwise_distribution from two accumulators (binned KS and MWU)."""
+    n, m = a.n, b.n
+    _, Fa = a._ecdf()
+    _, Fb = b._ecdf()
+    ks_stat = float(np.abs(Fa - Fb).max())
+    ks_p = float(stats.kstwobign.sf(ks_stat * np.sqrt(n * m / (n + m))))
+
+    # U for a: pairs with a > b, ties inside a bin count one half
+    below_b = np.concatenate(([0], np.cumsum(b.hist)[:-1]))
+    u_stat = float((a.hist * (below_b + 0.5 * b.hist)).sum())
+    mu = n * m / 2
+    sigma = np.sqrt(n * m * (n + m + 1) / 12)
+    u_p = float(2 * stats.norm.sf((abs(u_stat - mu) - 0.5) / sigma))
+
+    va, vb = a.m2 / (n - 1), b.m2 / (m - 1)
+    se2 = va / n + vb / m
+    t_stat = (a.mean - b.mean) / np.sqrt(se2)
+    dof = se2 ** 2 / ((va / n) ** 2 / (n - 1) + (vb / m) ** 2 / (m - 1))
+    t_p = float(2 * stats.t.sf(abs(t_stat), dof))
+
+    return _pairwise_report(name, n, m, a.mean, b.mean,
+                            (ks_stat, ks_p), (u_stat, u_p), (t_stat, t_p))
+
+
+def analyze_streaming(n: int, prng_seeds_list: list[int] = None, prng_engine: str = "mt",
+                      prng_root: int = PHILOX_ROOT, block: int = STREAM_BLOCK,
+                      nist: bool = True) -> dict:
+    """analyze_from_generators in fixed-size blocks, with bounded memory."""
+    if prng_seeds_list is None:
+        prng_seeds_list = [42, 123, 7, 999, 314]
+
+    print(f"Streaming {n:,} seeds per source in blocks of {block:,}...")
+    t_start = time.perf_counter()
+
+    accs = {}
+    plan = [(f"PRNG_stream_{ps}", "PRNG", ps) for ps in prng_seeds_list]
+    plan += [("TRNG", "TRNG", None), ("HMIX", "HMIX", None)]
+    for key, source, ps in plan:
+        t0 = time.perf_counter()
+        acc = StreamingSeedAccumulator(nist=nist)
+        for chunk in iter_seed_blocks(source, n, block, stream_seed=ps,
+                                      engine=prng_engine, root=prng_root):
+            acc.update(chunk)
+        accs[key] = acc
+        print(f"  {key}: {n:,} seeds in {time.perf_counter() - t0:.1f}s")
+        if key == f"PRNG_stream_{prng_seeds_list[-1]}":
+            combined = StreamingSeedAccumulator(nist=nist)
+            for s_ in prng_seeds_list:
+                combined.merge(accs[f"PRNG_stream_{s_}"])
+            accs["PRNG_combined"] = combined
+
+    results = {
+        "analysis_type": "seed_distribution_characterization",
+        "timestamp": datetime.now().isoformat(),
+        "n_per_source": n,
+        "prng_streams": prng_seeds_list,
+        "prng_engine": prng_engine,
+        **({"prng_root": prng_root} if prng_engine == "philox" else {}),
+        "streaming": {
+            "block_size": block,
+            "ks_resolution_bits": KS_BITS,
+            "max_lag": STREAM_MAX_LAG,
+            "welch_segment": WELCH_SEGMENT,
+        },
+        "per_source": {},
+        "pairwise_comparisons": {},
+        "summary": {},
+    }
+
+    for source_name, acc in accs.items():
+        print(f"\nAnalyzing {source_name} ({acc.n:,} seeds, streamed)...")
+        results["per_source"][source_name] = acc.report()
+
+    main_sources = ["PRNG_combined", "TRNG", "HMIX"]
+    for i in range(len(main_sources)):
+        for j in range(i + 1, len(main_sources)):
+            name = f"{main_sources[i]}_vs_{main_sources[j]}"
+            results["pairwise_comparisons"][name] = streaming_pairwise(
+                accs[main_sources[i]], accs[main_sources[j]], name)
+
+    for i in range(len(prng_seeds_list)):
+        for j in range(i + 1, len(prng_seeds_list)):
+            s1, s2 = prng_seeds_list[i], prng_seeds_list[j]
+            name = f"PRNG_{s1}_vs_PRNG_{s2}"
+            results["pairwise_comparisons"][name] = streaming_pairwise(
+                accs[f"PRNG_stream_{s1}"], accs[f"PRNG_stream_{s2}"], name)
+
+    results["summary"] = summarize(results)
+    results["streaming"]["seconds"] = round(time.perf_counter() - t_start, 2)
+    return results
+
+
+def analyze_experiment_streaming(filepath: str, block: int = STREAM_BLOCK,
+                                 nist: bool = True) -> dict:
+    """analyze_from_experiment for results with a seed ledger, read in blocks."""
+    with open(filepath) as f:
+        data = json.load(f)
+    if "seed_ledger" not in data:
+        raise ValueError(f"{filepath} has no seed ledger; run without --streaming")
+
+    accs = {}
+    for source, chunk in iter_seeds_by_source(filepath, data["seed_ledger"], block):
+        accs.setdefault(source, StreamingSeedAccumulator(nist=nist)).update(chunk)
+
+    results = {
+        "analysis_type": "seed_distribution_from_experiment",
+        "source_file": filepath,
+        "timestamp": datetime.now().isoformat(),
+        "streaming": {"block_size": block, "ks_resolution_bits": KS_BITS,
+                      "max_lag": STREAM_MAX_LAG, "welch_segment": WELCH_SEGMENT},
+        "per_source": {},
+        "pairwise_comparisons": {},
+    }
+    for source, acc in accs.items():
+        if acc.n < 10:
+            results["per_source"][source] = {"error": f"only {acc.n} seeds"}
+            continue
+        print(f"\nAnalyzing {source} ({acc.n:,} seeds from ledger, streamed)...")
+        results["per_source"][source] = acc.report(max_lag=5)
+
+    sources = [s for s in accs if accs[s].n >= 10]
+    for i in range(len(sources)):
+        for j in range(i + 1, len(sources)):
+            name = f"{sources[i]}_vs_{sources[j]}"
+            results["pairwise_comparisons"][name] = streaming_pairwise(
+                accs[sources[i]], accs[sources[j]], name)
+    return results
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Bit engine benchmark
+# ─────────────────────────────────────────────────────────────────────
+
+def benchmark_bits(sizes: list[int], loop_n: int = 20000) -> dict:
+    """Time the NumPy bit/byte engine against the original per-bit loop."""
+    results = {"benchmark": "bit_byte_engine", "timestamp": datetime.now().isoformat(),
+               "bit_chunk": BIT_CHUNK, "runs": []}
+
+    seeds = os_pool().get_seeds64(loop_n)
+    small = (seeds % (2**32)).tolist()
+    t0 = time.perf_counter()
+    ref = _test_bit_bias_loop(small)
+    loop_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    vec = test_bit_bias(small)
+    vec_s = time.perf_counter() - t0
+    assert [vec["per_bit"][f"bit_{b}"]["count_1"] for b in range(32)] == ref.astype(int).tolist()
+    results["loop_reference"] = {
+        "n_seeds": loop_n,
+        "loop_seconds": round(loop_s, 4),
+        "vectorized_seconds": round(vec_s, 4),
+        "speedup": round(loop_s / vec_s, 1),
+    }
+    print(f"  32-bit bias, {loop_n:,} seeds: loop {loop_s:.3f}s, "
+          f"vectorized {vec_s:.4f}s ({loop_s / vec_s:.0f}x), counts identical")
+
+    for n in sizes:
+        seeds = os_pool().get_seeds64(n)
+        t0 = time.perf_counter()
+        report = bit_byte_analysis(seeds)
+        dt = time.perf_counter() - t0
+        results["runs"].append({
+            "n_seeds": n,
+            "seconds": round(dt, 4),
+            "seeds_per_sec": round(n / dt, 1),
+            "loop_estimate_seconds": round(loop_s * n / loop_n * 2, 1),  # 64 bits vs 32
+            "n_biased_bits": report["bit_bias"]["n_biased_bits"],
+            "n_correlated_pairs": report["bit_correlation"]["n_correlated_pairs"],
+            "byte_pair_p": report["byte_pairs"]["p_value"],
+        })
+        print(f"  64-bit engine, {n:>12,} seeds: {dt:8.3f}s ({n / dt:14,.0f} seeds/s), "
+              f"biased={report['bit_bias']['n_biased_bits']}/64, "
+              f"corr_pairs={report['bit_correlation']['n_correlated_pairs']}, "
+              f"byte_pair_p={report['byte_pairs']['p_value']:.4f}")
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description="Seed distribution analysis")
     parser.add_argument("--n", type=int, default=10000,
@@ -415,15 +1142,44 @@ def main():
                         help="Analyze seeds from an experiment JSON file")
     parser.add_argument("--prng-seeds", type=str, default="42,123,7,999,314",
                         help="PRNG stream seeds")
+    parser.add_argument("--prng-engine", choices=["mt", "philox"], default="mt",
+                        help="PRNG generator, as in run_comprehensive_experiment_v2.py")
+    parser.add_argument("--prng-root", type=int, default=PHILOX_ROOT,
+                        help="Root SeedSequence entropy for --prng-engine philox")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Chunked analysis with bounded memory (any --n; ledger files only "
+                             "with --from-experiment)")
+    parser.add_argument("--block", type=int, default=STREAM_BLOCK,
+                        help=f"Seeds per block in --streaming mode (default: {STREAM_BLOCK})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for per-source suites and pairwise tests (default: 1)")
+    parser.add_argument("--no-nist", action="store_true",
+                        help="Skip the NIST battery in --streaming mode")
+    parser.add_argument("--benchmark-bits", action="store_true",
+                        help="Benchmark the 64-bit bit/byte engine on OS pool seeds")
+    parser.add_argument("--sizes", type=str, default="100000,1000000,10000000",
+                        help="Seed counts for --benchmark-bits")
 
     args = parser.parse_args()
 
-    if args.from_experiment:
-        results = analyze_from_experiment(args.from_experiment)
+    if args.benchmark_bits:
+        results = benchmark_bits([int(s) for s in args.sizes.split(",")])
+        suffix = "bit_benchmark"
+    elif args.from_experiment:
+        if args.streaming:
+            results = analyze_experiment_streaming(args.from_experiment, args.block,
+                                                   nist=not args.no_nist)
+        else:
+            results = analyze_from_experiment(args.from_experiment)
         suffix = Path(args.from_experiment).stem
     else:
         prng_seeds = [int(s) for s in args.prng_seeds.split(",")]
-        results = analyze_from_generators(args.n, prng_seeds)
+        if args.streaming:
+            results = analyze_streaming(args.n, prng_seeds, args.prng_engine, args.prng_root,
+                                        args.block, nist=not args.no_nist)
+        else:
+            results = analyze_from_generators(args.n, prng_seeds, args.prng_engine,
+                                              args.prng_root, workers=args.workers)
         suffix = f"n{args.n}"
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
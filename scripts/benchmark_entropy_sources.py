@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark for every entropy source in the repo.
+
+Groups (each imported lazily; a group whose dependencies are missing is
+reported as skipped instead of failing the run):
+  - v2:         PRNGSource / TRNGSource / HMIXSource from the v2 runner (seeds)
+  - injection:  the direct injection sources' get_bytes / get_float
+  - shared:     entropy_sources primitives (OS pool, batch HMIX, Philox, replay)
+  - literary:   LiteraryPreservationSource, every HashAlgorithm × ExtractionMethod
+
+For each (source, operation, request size) the report has calls/sec,
+seeds/sec or bytes/sec, per-call latency percentiles and the peak Python
+allocation per call. With --baseline the run is compared against a
+stored report and throughput or p99 latency regressions beyond
+--threshold are listed (exit status 1).
+
+Usage:
+    python benchmark_entropy_sources.py
+    python benchmark_entropy_sources.py --groups v2,shared --seconds 0.2
+    python benchmark_entropy_sources.py --baseline results/benchmarks/entropy_baseline.json
+    python benchmark_entropy_sources.py --write-baseline
+"""
+
+import sys
+sys.stdout.reconfigure(line_buffering=True)
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "benchmarks"
+DEFAULT_BASELINE = OUTPUT_DIR / "entropy_baseline.json"
+
+GROUPS = ["v2", "injection", "shared", "literary"]
+SEED_SIZE = 8
+BYTE_SIZES = [8, 64, 4096, 4 * 50257]  # 8 B seed up to the GPT-2 logit noise vector
+MEMORY_CALLS = 50
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────────────
+
+def measure(fn, units_per_call: int, unit: str, min_seconds: float,
+            max_calls: int = 1_000_000) -> dict:
+    """Time fn() call by call until min_seconds elapse, then sample memory."""
+    fn()  # warm caches and lazy state
+    latencies = []
+    perf = time.perf_counter_ns
+    t_end = time.perf_counter() + min_seconds
+    while len(latencies) < max_calls:
+        t0 = perf()
+        fn()
+        latencies.append(perf() - t0)
+        if time.perf_counter() >= t_end:
+            break
+    lat = np.array(latencies, dtype=np.float64) / 1e3  # µs
+    total_s = lat.sum() / 1e6
+
+    tracemalloc.start()
+    for _ in range(MEMORY_CALLS):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": len(lat),
+        "calls_per_sec": round(len(lat) / total_s, 1),
+        f"{unit}_per_sec": round(len(lat) * units_per_call / total_s, 1),
+        "latency_us": {
+            "p50": round(float(np.percentile(lat, 50)), 3),
+            "p90": round(float(np.percentile(lat, 90)), 3),
+            "p99": round(float(np.percentile(lat, 99)), 3),
+            "max": round(float(lat.max()), 3),
+        },
+        "peak_alloc_kib": round(peak / 1024, 2),
+    }
+
+
+def bench_seeds(name: str, make, min_seconds: float) -> dict:
+    source = make()
+    return {f"{name}/get_seed/{SEED_SIZE}": measure(source.get_seed, 1, "seeds", min_seconds)}
+
+
+def bench_bytes(name: str, make, sizes: list[int], min_seconds: float) -> dict:
+    source = make()
+    out = {f"{name}/get_float/4": measure(source.get_float, 1, "seeds", min_seconds)}
+    for size in sizes:
+        out[f"{name}/get_bytes/{size}"] = measure(
+            lambda: source.get_bytes(size), size, "bytes", min_seconds)
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Groups
+# ─────────────────────────────────────────────────────────────────────
+
+def group_v2(sizes: list[int], min_seconds: float) -> dict:
+    import run_comprehensive_experiment_v2 as v2
+
+    out = {}
+    for name, make in {"PRNG": v2.PRNGSource, "TRNG": v2.TRNGSource,
+                       "HMIX": v2.HMIXSource}.items():
+        out.update(bench_seeds(f"v2.{name}", make, min_seconds))
+    return out
+
+
+def group_injection(sizes: list[int], min_seconds: float) -> dict:
+    import run_direct_injection_experiment as di
+
+    out = {}
+    for name, make in {"PRNG": di.PRNGSource, "TRNG": di.TRNGSource,
+                       "HMIX": di.HMIXSource}.items():
+        out.update(bench_bytes(f"injection.{name}", make, sizes, min_seconds))
+    return out
+
+
+def group_shared(sizes: list[int], min_seconds: float) -> dict:
+    import entropy_sources as es
+
+    out = {}
+    pool = es.OSEntropyPool()
+    out["shared.OSEntropyPool/get_seed64/8"] = measure(pool.get_seed64, 1, "seeds", min_seconds)
+    for size in sizes:
+        out[f"shared.OSEntropyPool/get_bytes/{size}"] = measure(
+            lambda: pool.get_bytes(size), size, "bytes", min_seconds)
+    out["shared.hmix_seeds/batch/65536"] = measure(
+        lambda: es.hmix_seeds(65536), 65536, "seeds", min_seconds, max_calls=50)
+    out.update(bench_seeds("shared.Philox", lambda: es.PhiloxSource(stream=0), min_seconds))
+    out["shared.Philox/get_seeds/65536"] = measure(
+        lambda: es.PhiloxSource(stream=0).get_seeds(65536), 65536, "seeds", min_seconds,
+        max_calls=200)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = Path(tmp) / "replay.bin"
+        dump.write_bytes(os.urandom(8 << 20))
+        replay = lambda: es.ReplaySource(dump, policy="wrap", name="REPLAY")
+        out.update(bench_seeds("shared.Replay", replay, min_seconds))
+        out.update(bench_bytes("shared.Replay", replay, sizes, min_seconds))
+    return out
+
+
+def group_literary(sizes: list[int], min_seconds: float) -> dict:
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+    from entropy.entropy_sources.literary_preservation import (
+        ExtractionMethod, HashAlgorithm, LiteraryPreservationSource)
+
+    out = {}
+    for hash_algo in HashAlgorithm:
+        for method in ExtractionMethod:
+            source = LiteraryPreservationSource(
+                text_name="bible_kjv", hash_algo=hash_algo, extract_method=method,
+                initial_seed=42)
+            out[f"literary.{hash_algo.name}.{method.name}/get_seed/{SEED_SIZE}"] = measure(
+                lambda: source.get_seed([]), 1, "seeds", min_seconds)
+    return out
+
+
+GROUP_FUNCS = {
+    "v2": group_v2,
+    "injection": group_injection,
+    "shared": group_shared,
+    "literary": group_literary,
+}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Report and baseline comparison
+# ─────────────────────────────────────────────────────────────────────
+
+def run_benchmarks(groups: list[str], sizes: list[int], min_seconds: float) -> dict:
+    report = {
+        "benchmark": "entropy_sources",
+        "timestamp": datetime.now().isoformat(),
+        "platform": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {"groups": groups, "sizes": sizes, "min_seconds": min_seconds},
+        "groups": {},
+        "benchmarks": {},
+    }
+    for group in groups:
+        print(f"\n[{group}]")
+        t0 = time.perf_counter()
+        try:
+            results = GROUP_FUNCS[group](sizes, min_seconds)
+        except ImportError as e:
+            report["groups"][group] = {"status": "skipped", "reason": f"{type(e).__name__}: {e}"}
+            print(f"  skipped ({e})")
+            continue
+        report["groups"][group] = {"status": "ok", "n": len(results),
+                                   "seconds": round(time.perf_counter() - t0, 2)}
+        for key, r in results.items():
+            rate = next(k for k in r if k.endswith("_per_sec") and k != "calls_per_sec")
+            print(f"  {key:<48} {r[rate]:>16,.0f} {rate.replace('_per_sec', '/s'):<8} "
+                  f"p50 {r['latency_us']['p50']:>10.2f}us  p99 {r['latency_us']['p99']:>10.2f}us")
+        report["benchmarks"].update(results)
+    return report
+
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: float) -> dict:
+    """Throughput and p99 ratios against a baseline report.
+
+    A benchmark regresses when throughput falls below (1 - threshold) of
+    the baseline or p99 latency rises above (1 + threshold) of it.
+    """
+    per_benchmark, regressions = {}, []
+    for key, cur in report["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(key)
+        if base is None:
+            continue
+        tput = cur["calls_per_sec"] / base["calls_per_sec"]
+        p99 = cur["latency_us"]["p99"] / max(base["latency_us"]["p99"], 1e-9)
+        per_benchmark[key] = {"throughput_ratio": round(tput, 3), "p99_ratio": round(p99, 3)}
+        if tput < 1 - threshold or p99 > 1 + threshold:
+            regressions.append(key)
+    return {
+        "baseline_timestamp": baseline.get("timestamp"),
+        "threshold": threshold,
+        "n_compared": len(per_benchmark),
+        "missing_from_baseline": sorted(set(report["benchmarks"]) - set(baseline.get("benchmarks", {}))),
+        "regressions": regressions,
+        "per_benchmark": per_benchmark,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entropy source benchmark suite")
+    parser.add_argument("--groups", type=str, default=",".join(GROUPS),
+                        help=f"Comma-separated groups (default: {','.join(GROUPS)})")
+    parser.add_argument("--sizes", type=str, default=",".join(map(str, BYTE_SIZES)),
+                        help="Comma-separated get_bytes request sizes")
+    parser.add_argument("--seconds", type=float, default=0.5,
+                        help="Minimum timing window per benchmark")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help=f"Baseline report to compare against (default: {DEFAULT_BASELINE.name} if present)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown that counts as a regression (default: 0.25)")
+    parser.add_argument("--write-baseline", action="store_true",
+                        help=f"Also store this report as {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+
+    groups = [g.strip() for g in args.groups.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {sorted(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    report = run_benchmarks(groups, sizes, args.seconds)
+
+    baseline_path = Path(args.baseline) if args.baseline else DEFAULT_BASELINE
+    regressed = False
+    if baseline_path.exists() and not args.write_baseline:
+        with open(baseline_path) as f:
+            comparison = compare_to_baseline(report, json.load(f), args.threshold)
+        comparison["baseline"] = str(baseline_path)
+        report["comparison"] = comparison
+        print(f"\nBaseline {baseline_path.name}: {comparison['n_compared']} compared, "
+              f"{len(comparison['regressions'])} regressions (threshold {args.threshold:.0%})")
+        for key in comparison["regressions"]:
+            r = comparison["per_benchmark"][key]
+            print(f"  REGRESSION {key}: throughput x{r['throughput_ratio']:.2f}, "
+                  f"p99 x{r['p99_ratio']:.2f}")
+        regressed = bool(comparison["regressions"])
+    elif args.baseline:
+        print(f"\nBaseline {baseline_path} not found")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    filepath = OUTPUT_DIR / f"entropy_sources_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filepath, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved: {filepath}")
+    if args.write_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline: {DEFAULT_BASELINE}")
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Vectorized bootstrap confidence intervals for paired effect sizes.
+
+A run's per-sample metric values are packed into one NaN-padded array
+x[prompt, source, metric, sample]. Each resample draws prompt indices
+(and optionally, sample indices within every prompt × source cell) as
+index matrices, so a batch of resamples is a few NumPy reductions over
+a (batch, prompt, ...) array, for all metrics and comparisons at once:
+  - Cohen's d_z and the mean difference of prompt means per source pair
+  - mean cross-source CV% per metric
+Intervals are BCa, with the acceleration from the leave-one-prompt-out
+jackknife; percentile intervals are reported alongside. Batches are
+seeded from one SeedSequence, so results depend on the seed and number
+of resamples but not on the number of workers.
+
+Used by statistical_analysis_v2.py for the paired tests and per domain.
+"""
+
+import time
+
+import numpy as np
+from scipy import stats
+
+N_BOOT = 2000
+LEVEL = 0.95
+BATCH_ELEMENTS = 1 << 22   # resampled values per batch (prompt means or samples)
+MIN_PROMPTS = 3
+
+# Set in the parent before forking; workers read the packed data from it.
+_BOOT_STATE = {}
+
+
+def pack_samples(all_samples: dict, prompts: list, sources: list[str],
+                 metrics: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(x, counts): x[p, s, m, :counts[p, s, m]] holds the cell's sample values."""
+    P, S, M = len(prompts), len(sources), len(metrics)
+    cells = [[[all_samples.get(p, {}).get(s, {}).get(m, []) for m in metrics]
+              for s in sources] for p in prompts]
+    counts = np.array([[[len(v) for v in row] for row in by_source] for by_source in cells],
+                      dtype=np.int64).reshape(P, S, M)
+    x = np.full((P, S, M, max(1, int(counts.max(initial=0)))), np.nan)
+    for i in range(P):
+        for j in range(S):
+            for k in range(M):
+                x[i, j, k, :counts[i, j, k]] = cells[i][j][k]
+    return x, counts
+
+
+def cell_means(x: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Prompt means per (prompt, source, metric); NaN for empty cells."""
+    keep = np.arange(x.shape[-1]) < counts[..., None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(keep, x, 0.0).sum(axis=-1) / counts
+
+
+def effect_statistics(means: np.ndarray, pairs: np.ndarray) -> tuple:
+    """(d_z, mean difference, mean CV%) from prompt means of shape (..., P, S, M).
+
+    pairs is a (C, 2) array of (alt, base) source indices; d_z and the mean
+    difference have shape (..., M, C), the CV (..., M). Prompts missing
+    either source are dropped from that pair, as in run_paired_tests.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        diff = means[..., pairs[:, 0], :] - means[..., pairs[:, 1], :]   # (..., P, C, M)
+        valid = ~np.isnan(diff)
+        n = valid.sum(axis=-3)
+        mean = np.where(valid, diff, 0.0).sum(axis=-3) / n
+        dev = np.where(valid, diff - mean[..., None, :, :], 0.0)
+        sd = np.sqrt((dev ** 2).sum(axis=-3) / (n - 1))
+        d_z = np.where(sd > 0, mean / sd, np.where(np.isnan(sd), np.nan, 0.0))
+
+        present = ~np.isnan(means)
+        k = present.sum(axis=-2)                                          # (..., P, M)
+        mu = np.where(present, means, 0.0).sum(axis=-2) / k
+        var = (np.where(present, means - mu[..., None, :], 0.0) ** 2).sum(axis=-2) / (k - 1)
+        cv = np.where(mu == 0, 0.0, np.sqrt(var) / np.abs(mu) * 100)
+        cv = np.where(k >= 2, cv, np.nan)
+        n_cv = (~np.isnan(cv)).sum(axis=-2)
+        mean_cv = np.where(np.isnan(cv), 0.0, cv).sum(axis=-2) / n_cv
+    return np.swapaxes(d_z, -1, -2), np.swapaxes(mean, -1, -2), mean_cv
+
+
+def _boot_batch(task: tuple) -> tuple:
+    size, seed = task
+    st = _BOOT_STATE
+    rng = np.random.default_rng(seed)
+    P = st["means"].shape[0]
+    idx = rng.integers(0, P, size=(size, P))
+    if st["within"]:
+        x, counts = st["x"], st["counts"]
+        c = counts[idx]                                                    # (B, P, S, M)
+        j = rng.integers(0, np.maximum(c, 1)[..., None], size=c.shape + (x.shape[-1],))
+        means = cell_means(np.take_along_axis(x[idx], j, axis=-1), c)
+    else:
+        means = st["means"][idx]
+    return effect_statistics(means, st["pairs"])
+
+
+def _jackknife(means: np.ndarray, pairs: np.ndarray) -> tuple:
+    P = len(means)
+    keep = ~np.eye(P, dtype=bool)
+    idx = np.broadcast_to(np.arange(P), (P, P))[keep].reshape(P, P - 1)
+    return effect_statistics(means[idx], pairs)
+
+
+def _quantiles(ordered: np.ndarray, n: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Quantiles q (..., k) of the first n values of ordered (sorted along axis 0)."""
+    pos = q * np.maximum(n - 1, 0)[..., None]
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0)[..., None])
+    w = pos - lo
+    take = lambda i: np.moveaxis(np.take_along_axis(ordered, np.moveaxis(i, -1, 0), axis=0), 0, -1)
+    out = (1 - w) * take(lo) + w * take(hi)
+    return np.where((n > 0)[..., None], out, np.nan)
+
+
+def bca_interval(boot: np.ndarray, theta: np.ndarray, jack: np.ndarray,
+                 level: float = LEVEL) -> tuple[np.ndarray, np.ndarray]:
+    """(BCa, percentile) intervals of shape (..., 2) for every element of theta.
+
+    boot is (B, ...) bootstrap replicates and jack (P, ...) leave-one-out
+    values; NaN replicates (resamples where a statistic is undefined) are
+    ignored.
+    """
+    B = boot.shape[0]
+    ok = ~np.isnan(boot)
+    n = ok.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        below = ((ok & (boot < theta)).sum(axis=0) + 0.5 * (ok & (boot == theta)).sum(axis=0)) / n
+        z0 = stats.norm.ppf(np.clip(below, 1 / (2 * B), 1 - 1 / (2 * B)))
+        dev = np.nanmean(jack, axis=0) - jack
+        num = np.nansum(dev ** 3, axis=0)
+        den = 6 * np.nansum(dev ** 2, axis=0) ** 1.5
+        a = np.where(den > 0, num / den, 0.0)
+        tails = np.array([(1 - level) / 2, (1 + level) / 2])
+        z = z0[..., None] + stats.norm.ppf(tails)
+        q_bca = stats.norm.cdf(z0[..., None] + z / (1 - a[..., None] * z))
+    q_bca = np.where(np.isnan(q_bca), tails, q_bca)
+    ordered = np.sort(boot, axis=0)  # NaN sorts last
+    q_pct = np.broadcast_to(tails, q_bca.shape)
+    return _quantiles(ordered, n, q_bca), _quantiles(ordered, n, q_pct)
+
+
+def _entry(estimate, boot, bca, pct) -> dict:
+    r = lambda v: round(float(v), 6)
+    return {
+        "estimate": r(estimate),
+        "se": r(np.nanstd(boot, ddof=1)) if np.count_nonzero(~np.isnan(boot)) > 1 else None,
+        "ci_bca": [r(bca[0]), r(bca[1])],
+        "ci_percentile": [r(pct[0]), r(pct[1])],
+    }
+
+
+def bootstrap_effects(all_samples: dict, metrics: list[str], sources: list[str],
+                      comparisons: list, n_boot: int = N_BOOT, seed: int = 0,
+                      within: bool = False, level: float = LEVEL, workers: int = 1,
+                      prompts: list | None = None) -> dict:
+    """BCa intervals for d_z, mean difference and mean CV% of every metric × comparison.
+
+    Resamples prompts (the pairing unit); with within, also resamples
+    samples within each prompt × source cell. prompts restricts the
+    analysis to a subset (e.g. one domain).
+    """
+    t0 = time.perf_counter()
+    prompts = list(all_samples) if prompts is None else [p for p in prompts if p in all_samples]
+    if len(prompts) < MIN_PROMPTS:
+        return {"error": f"only {len(prompts)} prompts"}
+    pairs = np.array([[sources.index(a), sources.index(b)] for a, b in comparisons])
+    x, counts = pack_samples(all_samples, prompts, sources, metrics)
+    means = cell_means(x, counts)
+    theta = effect_statistics(means, pairs)
+    jack = _jackknife(means, pairs)
+
+    # batch size depends only on the data, so results do not depend on workers
+    per_resample = means.size * (x.shape[-1] if within else 1)
+    batch = max(1, BATCH_ELEMENTS // per_resample)
+    sizes = [min(batch, n_boot - lo) for lo in range(0, n_boot, batch)]
+    tasks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    _BOOT_STATE.update(x=x, counts=counts, means=means, pairs=pairs, within=within)
+    try:
+        if workers > 1 and len(tasks) > 1:
+            import multiprocessing as mp
+            with mp.get_context("fork").Pool(workers) as procs:
+                parts = procs.map(_boot_batch, tasks)
+        else:
+            parts = [_boot_batch(t) for t in tasks]
+    finally:
+        _BOOT_STATE.clear()
+    boot = [np.concatenate([p[i] for p in parts]) for i in range(3)]
+    intervals = [bca_interval(b, t, j, level) for b, t, j in zip(boot, theta, jack)]
+
+    (dz_bca, dz_pct), (md_bca, md_pct), (cv_bca, cv_pct) = intervals
+    effects = {}
+    for m, metric in enumerate(metrics):
+        effects[metric] = {}
+        for c, (alt, base) in enumerate(comparisons):
+            effects[metric][f"{alt}_vs_{base}"] = {
+                "cohens_d": _entry(theta[0][m, c], boot[0][:, m, c], dz_bca[m, c], dz_pct[m, c]),
+                "mean_difference": _entry(theta[1][m, c], boot[1][:, m, c],
+                                          md_bca[m, c], md_pct[m, c]),
+            }
+    return {
+        "n_boot": n_boot,
+        "seed": seed,
+        "level": level,
+        "resampling": "prompts and samples within prompts" if within else "prompts",
+        "n_prompts": len(prompts),
+        "interval": "BCa (jackknife acceleration over prompts)",
+        "effects": effects,
+        "mean_cv_percent": {metric: _entry(theta[2][m], boot[2][:, m], cv_bca[m], cv_pct[m])
+                            for m, metric in enumerate(metrics)},
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
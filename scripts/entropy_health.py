@@ -0,0 +1,326 @@
+"""
+Online health tests for entropy sources during experiment runs.
+
+HealthMonitor watches the byte stream a source hands out and keeps:
+  - Repetition Count Test (SP 800-90B 4.4.1): alarm when one byte value
+    repeats C = 1 + ceil(-log2(alpha) / H) times in a row
+  - Adaptive Proportion Test (SP 800-90B 4.4.2): alarm when the first byte
+    of a non-overlapping W-byte window occurs C times inside that window
+  - a seed-level repetition check (identical consecutive 64-bit seeds)
+  - running monobit and byte histograms, checked every HISTOGRAM_EVERY bytes
+
+State is a few counters plus a 256-bin histogram, so cost per byte is
+O(1); large draws (logit noise vectors) are processed with NumPy over the
+whole chunk, carrying run and window state across calls. Alarms are
+printed to the run log and kept in report() for the result metadata.
+MonitoredSource wraps any source exposing get_seed / get_bytes / get_float.
+
+    python entropy_health.py     # self_check(): alarm counts, NumPy vs bytewise
+"""
+
+import math
+import time
+
+import numpy as np
+
+ALPHA_LOG2 = 40          # false-alarm probability 2^-40 per test decision
+ASSUMED_H = 8.0          # claimed min-entropy per byte (bits)
+APT_WINDOW = 512         # SP 800-90B window for non-binary samples
+HISTOGRAM_EVERY = 1 << 16
+MONOBIT_Z_ALARM = 6.0
+CHI2_Z_ALARM = 8.0
+MAX_ALARMS = 100
+SMALL_CHUNK = 64         # below this, a Python loop beats NumPy call overhead
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def rct_cutoff(h: float = ASSUMED_H, alpha_log2: int = ALPHA_LOG2) -> int:
+    return 1 + math.ceil(alpha_log2 / h)
+
+
+def apt_cutoff(window: int = APT_WINDOW, h: float = ASSUMED_H,
+               alpha_log2: int = ALPHA_LOG2) -> int:
+    """1 + CRITBINOM(W, 2^-H, 1 - alpha), computed from the exact binomial tail."""
+    p = 2.0 ** -h
+    alpha = 2.0 ** -alpha_log2
+    pmf = [math.comb(window, k) * p ** k * (1 - p) ** (window - k) for k in range(window + 1)]
+    tail = 0.0
+    for k in range(window, -1, -1):
+        if tail + pmf[k] > alpha:
+            return 1 + k
+        tail += pmf[k]
+    return 1
+
+
+class HealthMonitor:
+    """Streaming RCT / APT / monobit / byte-histogram monitor for one source."""
+    def __init__(self, name: str, h: float = ASSUMED_H, window: int = APT_WINDOW,
+                 alpha_log2: int = ALPHA_LOG2, log=print):
+        self.name = name
+        self.h = h
+        self.window = window
+        self.rct_c = rct_cutoff(h, alpha_log2)
+        self.apt_c = apt_cutoff(window, h, alpha_log2)
+        self.log = log
+
+        self.n_bytes = 0
+        self.n_seeds = 0
+        self.hist = np.zeros(256, dtype=np.int64)
+        self._next_hist_check = HISTOGRAM_EVERY
+
+        self._run_value = -1
+        self._run_len = 0
+        self.max_run = 0
+
+        self._apt_value = -1
+        self._apt_count = 0
+        self._apt_pos = 0       # position inside the current window (0 = start new)
+        self.max_apt = 0
+
+        self._last_seed = None
+        self.seed_repeats = 0
+
+        self.n_alarms = 0
+        self.alarms = []
+
+    # ── alarms ──
+
+    def _alarm(self, test: str, **detail):
+        self.n_alarms += 1
+        if len(self.alarms) < MAX_ALARMS:
+            self.alarms.append({"test": test, "source": self.name, "byte": self.n_bytes,
+                                "time": round(time.time(), 3), **detail})
+        if self.log is not None:
+            self.log(f"      [health] ALARM {self.name} {test}: "
+                     + ", ".join(f"{k}={v}" for k, v in detail.items()))
+
+    # ── observation ──
+
+    def observe_seed(self, seed: int):
+        """One 64-bit seed: seed-level repeat check plus its 8 big-endian bytes."""
+        if seed == self._last_seed:
+            self.seed_repeats += 1
+            self._alarm("seed_repeat", seed=seed)
+        self._last_seed = seed
+        self.n_seeds += 1
+        self.observe(seed.to_bytes(8, "big"))
+
+    def observe(self, data: bytes):
+        if not data:
+            return
+        if len(data) < SMALL_CHUNK:
+            self._observe_small(data)
+        else:
+            self._observe_array(np.frombuffer(data, dtype=np.uint8))
+        if self.n_bytes >= self._next_hist_check:
+            self._next_hist_check = self.n_bytes + HISTOGRAM_EVERY
+            self._check_histogram()
+
+    def _observe_small(self, data: bytes):
+        hist = self.hist
+        for b in data:
+            hist[b] += 1
+            # RCT
+            if b == self._run_value:
+                self._run_len += 1
+                if self._run_len > self.max_run:
+                    self.max_run = self._run_len
+                if self._run_len == self.rct_c:
+                    self._alarm("repetition_count", value=b, run=self._run_len, cutoff=self.rct_c)
+            else:
+                self._run_value, self._run_len = b, 1
+            # APT
+            if self._apt_pos == 0:
+                self._apt_value, self._apt_count = b, 1
+            elif b == self._apt_value:
+                self._apt_count += 1
+            self._apt_pos += 1
+            if self._apt_pos == self.window:
+                self._close_window(self._apt_value, self._apt_count)
+                self._apt_pos = 0
+        self.n_bytes += len(data)
+
+    def _observe_array(self, a: np.ndarray):
+        self.hist += np.bincount(a, minlength=256)
+        self._rct_array(a)
+        self._apt_array(a)
+        self.n_bytes += len(a)
+
+    def _rct_array(self, a: np.ndarray):
+        # Run-length encode the chunk; the first run continues the carried one
+        starts = np.concatenate(([0], np.flatnonzero(a[1:] != a[:-1]) + 1))
+        lengths = np.diff(np.append(starts, len(a)))
+        carry = self._run_len if a[0] == self._run_value else 0
+        lengths[0] += carry
+        # one alarm per run reaching the cutoff; a carried run that already
+        # reached it has alarmed
+        alarm = lengths >= self.rct_c
+        alarm[0] &= carry < self.rct_c
+        for j in np.flatnonzero(alarm):
+            self._alarm("repetition_count", value=int(a[starts[j]]), run=int(lengths[j]),
+                        cutoff=self.rct_c)
+        self.max_run = max(self.max_run, int(lengths.max()))
+        self._run_value, self._run_len = int(a[-1]), int(lengths[-1])
+
+    def _apt_array(self, a: np.ndarray):
+        i = 0
+        if self._apt_pos:  # finish the window carried from the previous call
+            take = min(self.window - self._apt_pos, len(a))
+            self._apt_count += int(np.count_nonzero(a[:take] == self._apt_value))
+            self._apt_pos += take
+            i = take
+            if self._apt_pos == self.window:
+                self._close_window(self._apt_value, self._apt_count)
+                self._apt_pos = 0
+        n_full = (len(a) - i) // self.window
+        if n_full:
+            w = a[i:i + n_full * self.window].reshape(n_full, self.window)
+            counts = np.count_nonzero(w == w[:, :1], axis=1)
+            self.max_apt = max(self.max_apt, int(counts.max()))
+            for j in np.flatnonzero(counts >= self.apt_c):
+                self._close_window(int(w[j, 0]), int(counts[j]))
+            i += n_full * self.window
+        if i < len(a):  # open a new window with the tail
+            tail = a[i:]
+            self._apt_value = int(tail[0])
+            self._apt_count = int(np.count_nonzero(tail == tail[0]))
+            self._apt_pos = len(tail)
+
+    def _close_window(self, value: int, count: int):
+        if count > self.max_apt:
+            self.max_apt = count
+        if count >= self.apt_c:
+            self._alarm("adaptive_proportion", value=value, count=count,
+                        window=self.window, cutoff=self.apt_c)
+
+    # ── histogram statistics ──
+
+    def monobit_z(self) -> float:
+        bits = 8 * self.n_bytes
+        if not bits:
+            return 0.0
+        ones = int(self.hist @ _POPCOUNT)
+        return (2 * ones - bits) / math.sqrt(bits)
+
+    def byte_chi2(self) -> float:
+        expected = self.n_bytes / 256
+        return float(((self.hist - expected) ** 2).sum() / expected) if expected else 0.0
+
+    def _check_histogram(self):
+        z = self.monobit_z()
+        if abs(z) > MONOBIT_Z_ALARM:
+            self._alarm("monobit", z=round(z, 2))
+        chi2_z = (self.byte_chi2() - 255) / math.sqrt(2 * 255)
+        if chi2_z > CHI2_Z_ALARM:
+            self._alarm("byte_histogram", chi2_z=round(chi2_z, 2))
+
+    # ── reporting ──
+
+    def merge(self, other: "HealthMonitor"):
+        """Fold in a monitor of the same source from another process."""
+        self.n_bytes += other.n_bytes
+        self.n_seeds += other.n_seeds
+        self.hist += other.hist
+        self.max_run = max(self.max_run, other.max_run)
+        self.max_apt = max(self.max_apt, other.max_apt)
+        self.seed_repeats += other.seed_repeats
+        self.n_alarms += other.n_alarms
+        self.alarms.extend(other.alarms[:MAX_ALARMS - len(self.alarms)])
+
+    def report(self) -> dict:
+        return {
+            "bytes": self.n_bytes,
+            "seeds": self.n_seeds,
+            "assumed_min_entropy_bits": self.h,
+            "repetition_count": {"cutoff": self.rct_c, "max_run": self.max_run},
+            "adaptive_proportion": {"window": self.window, "cutoff": self.apt_c,
+                                    "max_count": self.max_apt},
+            "seed_repeats": self.seed_repeats,
+            "monobit_z": round(self.monobit_z(), 4),
+            "byte_chi2": round(self.byte_chi2(), 2),
+            "n_alarms": self.n_alarms,
+            "alarms": self.alarms,
+        }
+
+
+class MonitoredSource:
+    """Source wrapper that feeds every draw to a HealthMonitor.
+
+    Other attributes (name, _seeds_generated, describe, ...) are passed
+    through to the wrapped source.
+    """
+    def __init__(self, source, monitor: HealthMonitor):
+        self._source = source
+        self.monitor = monitor
+
+    def __getattr__(self, attr):
+        return getattr(self._source, attr)
+
+    def get_seed(self) -> int:
+        s = self._source.get_seed()
+        self.monitor.observe_seed(s)
+        return s
+
+    def get_bytes(self, n: int) -> bytes:
+        data = self._source.get_bytes(n)
+        self.monitor.observe(data)
+        return data
+
+    def get_float(self) -> float:
+        f = self._source.get_float()
+        self.monitor.observe(min(int(f * 2**32), 2**32 - 1).to_bytes(4, "big"))
+        return f
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Self-check
+# ─────────────────────────────────────────────────────────────────────
+
+def self_check(seed: int = 0) -> dict:
+    """Alarm counts of the NumPy path against the byte-by-byte path.
+
+    One draw holds several stuck runs and several biased APT windows, so
+    every failure inside a single observe() call must raise its own alarm;
+    the same bytes are also fed in uneven chunks to exercise carried runs
+    and windows.
+    """
+    rng = np.random.default_rng(seed)
+    m = HealthMonitor("check", log=None)
+    data = rng.integers(0, 256, 8 * m.window, dtype=np.uint8)
+    for k, pos in enumerate((100, 700, 1500, 2600)):            # stuck runs
+        data[pos:pos + m.rct_c + k] = 0xAA
+    for w in (4, 6):                                            # biased windows
+        lo = w * m.window
+        data[lo:lo + m.window:4] = data[lo]
+    data[-m.rct_c // 2:] = 0x55                                 # run crossing a chunk boundary
+    extra = np.full(m.rct_c, 0x55, dtype=np.uint8)
+
+    runs = {}
+    for mode in ("bytewise", "one_draw", "chunked"):
+        mon = HealthMonitor(mode, log=None)
+        if mode == "bytewise":
+            for b in np.concatenate((data, extra)).tobytes():
+                mon._observe_small(bytes([b]))
+        elif mode == "one_draw":
+            mon.observe(data.tobytes())
+            mon.observe(extra.tobytes())
+        else:
+            cuts = np.sort(rng.choice(np.arange(1, len(data)), 12, replace=False))
+            for part in np.split(data, cuts):
+                mon.observe(part.tobytes())
+            mon.observe(extra.tobytes())
+        runs[mode] = {t: sum(a["test"] == t for a in mon.alarms)
+                      for t in ("repetition_count", "adaptive_proportion")}
+    expected = {"repetition_count": 5, "adaptive_proportion": 2}
+    ok = all(r == expected for r in runs.values())
+    return {"expected": expected, "observed": runs, "pass": ok}
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    result = self_check()
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["pass"] else 1)
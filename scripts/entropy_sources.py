@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Shared entropy source primitives for the experiment scripts.
+
+OSEntropyPool reads OS entropy (getrandom / /dev/urandom) in large blocks
+and serves seeds, floats and byte slices from the buffer, so drawing an
+8-byte seed no longer costs one syscall. Every buffered byte is served at
+most once, and the buffer is discarded in a forked child so parent and
+child never hand out the same bytes.
+
+hmix_seeds builds N HMIX seeds in one call with the same construction
+as HMIXSource.get_seed (SHA256 of "{time_ns}-{32 hex chars}-{counter}",
+first 8 bytes big-endian), taking the hex parts from one bulk pool read.
+
+PhiloxSource is a counter-based PRNG stream: child spawn_key of a root
+SeedSequence, so streams are independent by construction, and any draw
+index can be reached in O(1) without replaying earlier draws.
+
+ReplaySource serves bytes and seeds from a recorded entropy dump (hex
+text, integer text or raw binary), converted once to a raw byte file and
+memory-mapped. Consumers take disjoint partitions of the file, and an
+exhaustion policy decides what happens when a partition runs out.
+
+Usage:
+    python entropy_sources.py --benchmark
+    python entropy_sources.py --benchmark --block-size 4194304
+    python entropy_sources.py --benchmark-hmix --n 1000000
+    python entropy_sources.py --convert-replay qrng_dump.hex
+"""
+
+import sys
+sys.stdout.reconfigure(line_buffering=True)
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import secrets
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "entropy_sources"
+
+DEFAULT_BLOCK_SIZE = 1 << 20  # 1 MiB per OS read
+
+_U64 = struct.Struct(">Q")
+_U32 = struct.Struct(">I")
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Buffered OS entropy
+# ─────────────────────────────────────────────────────────────────────
+
+_fork_generation = 0
+
+
+def _after_fork_in_child():
+    global _fork_generation
+    _fork_generation += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class OSEntropyPool:
+    """Block-buffered os.urandom with fork-safe reseeding.
+
+    Requests are served from a block_size buffer that is refilled with a
+    single os.urandom call when exhausted; requests larger than a block
+    go straight to the OS. When the process ID changes (fork), the
+    inherited buffer is dropped before the next request.
+    """
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._buf = b""
+        self._pos = 0
+        self._pid = os.getpid()
+        self._generation = _fork_generation
+        self.refills = 0
+        self.bytes_served = 0
+
+    def _check_fork(self):
+        if self._generation != _fork_generation or self._pid != os.getpid():
+            self._buf, self._pos = b"", 0
+            self._pid = os.getpid()
+            self._generation = _fork_generation
+
+    def _reserve(self, n: int) -> int:
+        """Claim n buffered bytes and return their start offset."""
+        if self._generation != _fork_generation:
+            self._check_fork()
+        self.bytes_served += n
+        pos = self._pos
+        if pos + n > len(self._buf):
+            self._buf = os.urandom(self.block_size)
+            self.refills += 1
+            pos = 0
+        self._pos = pos + n
+        return pos
+
+    def get_bytes(self, n: int) -> bytes:
+        if n > self.block_size:
+            self.bytes_served += n
+            return os.urandom(n)
+        pos = self._reserve(n)
+        return self._buf[pos:pos + n]
+
+    def get_seed64(self) -> int:
+        """64-bit seed, identical to int.from_bytes(get_bytes(8), 'big')."""
+        pos = self._reserve(8)
+        return _U64.unpack_from(self._buf, pos)[0]
+
+    def get_float(self) -> float:
+        """Uniform float in [0, 1) from 32 bits, as TRNGSource.get_float."""
+        pos = self._reserve(4)
+        return _U32.unpack_from(self._buf, pos)[0] / (2**32)
+
+    def get_seeds64(self, n: int):
+        """n big-endian 64-bit seeds as a NumPy uint64 array (one slice)."""
+        import numpy as np
+        return np.frombuffer(self.get_bytes(8 * n), dtype=">u8").astype(np.uint64)
+
+
+_default_pool = None
+
+
+def os_pool() -> OSEntropyPool:
+    """Process-wide shared pool (fork-safe, created on first use)."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = OSEntropyPool()
+    return _default_pool
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Batch HMIX
+# ─────────────────────────────────────────────────────────────────────
+
+HMIX_CHUNK = 1 << 16  # seeds per bulk entropy read
+
+
+def hmix_seed_reference(counter: int) -> int:
+    """One HMIX seed exactly as HMIXSource.get_seed computes it."""
+    data = f"{time.time_ns()}-{secrets.token_hex(16)}-{counter}"
+    h = hashlib.sha256(data.encode()).digest()
+    return int.from_bytes(h[:8], byteorder='big')
+
+
+def _hmix_chunk(pool: OSEntropyPool, m: int, first: int) -> bytes:
+    """Concatenated SHA256 digests for counters first..first+m-1."""
+    sha256 = hashlib.sha256
+    time_ns = time.time_ns
+    hexes = pool.get_bytes(16 * m).hex()
+    return b"".join([
+        sha256(f"{time_ns()}-{hexes[32 * i:32 * i + 32]}-{first + i}".encode()).digest()
+        for i in range(m)
+    ])
+
+
+def _hmix_chunk_worker(task: tuple[int, int]) -> bytes:
+    return _hmix_chunk(os_pool(), *task)
+
+
+def hmix_seeds(n: int, start: int = 1, pool: OSEntropyPool | None = None,
+               workers: int = 1):
+    """n HMIX seeds for counters start..start+n-1 as a NumPy uint64 array.
+
+    Each seed is SHA256(f"{time.time_ns()}-{hex}-{counter}")[:8] read
+    big-endian, with a fresh timestamp per seed and 16 bytes of OS entropy
+    per seed rendered as 32 lowercase hex characters, the same string
+    secrets.token_hex(16) yields. Each chunk of HMIX_CHUNK seeds takes its
+    entropy from a single pool read and its digests are unpacked with one
+    NumPy view. With workers > 1 chunks are hashed in forked processes,
+    each drawing from its own (post-fork) pool; pool is then ignored.
+    """
+    import numpy as np
+
+    tasks = [(min(HMIX_CHUNK, n - lo), start + lo) for lo in range(0, n, HMIX_CHUNK)]
+    if workers > 1 and len(tasks) > 1:
+        import multiprocessing as mp
+        with mp.get_context("fork").Pool(workers) as procs:
+            chunks = procs.map(_hmix_chunk_worker, tasks)
+    else:
+        pool = pool or os_pool()
+        chunks = (_hmix_chunk(pool, m, first) for m, first in tasks)
+
+    out = np.empty(n, dtype=np.uint64)
+    lo = 0
+    for digests in chunks:
+        m = len(digests) // 32
+        out[lo:lo + m] = np.frombuffer(digests, dtype=">u8")[::4]
+        lo += m
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Counter-based PRNG streams
+# ─────────────────────────────────────────────────────────────────────
+
+PHILOX_ROOT = 42  # default root entropy for Philox streams
+PHILOX_WORDS = 4  # uint64 outputs per Philox4x64 counter increment
+
+
+class PhiloxSource:
+    """Philox4x64-10 stream keyed by SeedSequence(root, spawn_key=(stream,)).
+
+    Seed k of a stream is the k-th raw 64-bit output. seek(k) reaches it
+    by advancing the counter k // 4 blocks and discarding k % 4 words, so
+    a shard or resumed run needs only (root, stream, offset) from the
+    recorded metadata.
+    """
+    def __init__(self, stream: int, root: int = PHILOX_ROOT, offset: int = 0):
+        import numpy as np
+
+        self.name = "PRNG"
+        self.stream_seed = stream
+        self.root = root
+        self.offset = offset
+        self._seq = np.random.SeedSequence(root, spawn_key=(stream,))
+        self._seeds_generated = []
+        self.seek(offset)
+
+    def seek(self, k: int):
+        """Position the stream so the next get_seed returns draw k."""
+        import numpy as np
+
+        self._bg = np.random.Philox(self._seq)
+        self._bg.advance(k // PHILOX_WORDS)
+        if k % PHILOX_WORDS:
+            self._bg.random_raw(k % PHILOX_WORDS)
+        self._position = k
+
+    def get_seed(self) -> int:
+        s = int(self._bg.random_raw())
+        self._position += 1
+        self._seeds_generated.append(s)
+        return s
+
+    def get_seeds(self, n: int):
+        """Next n seeds as a NumPy uint64 array."""
+        seeds = self._bg.random_raw(n)
+        self._position += n
+        self._seeds_generated.extend(seeds.tolist())
+        return seeds
+
+    def describe(self) -> dict:
+        """Parameters that reproduce this stream's draws without replay."""
+        return {
+            "algorithm": "Philox4x64-10 (numpy.random.Philox)",
+            "entropy": self.root,
+            "spawn_key": [self.stream_seed],
+            "key": [hex(int(w)) for w in self._bg.state["state"]["key"]],
+            "offset": self.offset,
+            "draws": "seed k = k-th random_raw() uint64; counter advance k//4, skip k%4",
+        }
+
+
+def philox_seeds(n: int, stream: int, root: int = PHILOX_ROOT, offset: int = 0):
+    """Draws offset..offset+n-1 of a Philox stream as a uint64 array."""
+    src = PhiloxSource(stream, root, offset)
+    return src._bg.random_raw(n)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Recorded entropy replay
+# ─────────────────────────────────────────────────────────────────────
+
+REPLAY_FORMATS = ["auto", "hex", "int", "raw"]
+REPLAY_POLICIES = ["error", "wrap", "fallback"]
+_HEX_TOKEN = re.compile(r"(0x)?[0-9a-fA-F]+")
+
+
+class ReplayExhausted(RuntimeError):
+    """A ReplaySource partition ran out under the "error" policy."""
+
+
+def _detect_format(raw: bytes, path: Path) -> str:
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return "raw"
+    if "\0" in text:
+        return "raw"
+    tokens = _entropy_tokens(text)
+    if tokens and all(_HEX_TOKEN.fullmatch(t) for t in tokens):
+        hex_like = path.suffix == ".hex" or any(
+            t.startswith("0x") or re.search(r"[a-fA-F]", t) for t in tokens)
+        return "hex" if hex_like else "int"
+    raise ValueError(
+        f"{path} does not look like an entropy dump (non-numeric text). "
+        "Expected hex, whitespace/comma-separated integers or raw bytes; "
+        "examples/*_samples.txt hold model outputs, not recorded entropy.")
+
+
+def _entropy_tokens(text: str) -> list[str]:
+    lines = (line.split("#", 1)[0] for line in text.splitlines())
+    return " ".join(lines).replace(",", " ").split()
+
+
+def replay_file(path: Path, fmt: str = "auto", int_bits: int = 32) -> tuple[Path, dict]:
+    """Raw byte file for a recorded dump, converting text dumps once.
+
+    Text dumps are converted to <path>.replay.bin; raw dumps are
+    memory-mapped in place. Either way a <path>.replay.json description
+    (format, length, SHA-256) is written and reused while the source size
+    and mtime are unchanged, so the dump is only read and hashed once.
+    Integers are written big-endian, int_bits wide.
+    """
+    path = Path(path)
+    st = path.stat()
+    bin_path = path.with_name(path.name + ".replay.bin")
+    meta_path = path.with_name(path.name + ".replay.json")
+    if meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        cached = path if meta["format"] == "raw" else bin_path
+        if (meta["source_size"], meta["source_mtime_ns"], meta["int_bits"]) == \
+                (st.st_size, st.st_mtime_ns, int_bits) and fmt in ("auto", meta["format"]) \
+                and cached.exists():
+            return cached, meta
+
+    raw = path.read_bytes()
+    if fmt == "auto":
+        fmt = _detect_format(raw, path)
+    meta = {"source": str(path), "format": fmt, "int_bits": int_bits,
+            "source_size": st.st_size, "source_mtime_ns": st.st_mtime_ns}
+    if fmt == "raw":
+        data, bin_path = raw, path
+    else:
+        tokens = _entropy_tokens(raw.decode("utf-8"))
+        if fmt == "hex":
+            data = bytes.fromhex("".join(t.removeprefix("0x") for t in tokens))
+        else:
+            width = int_bits // 8
+            data = b"".join(int(t).to_bytes(width, "big") for t in tokens)
+        bin_path.write_bytes(data)
+    if not data:
+        raise ValueError(f"{path} contains no entropy")
+    meta.update(n_bytes=len(data), sha256=hashlib.sha256(data).hexdigest())
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return bin_path, meta
+
+
+class ReplaySource:
+    """Seeds and bytes replayed from a recorded entropy dump.
+
+    The source reads bytes [offset, offset + limit) of the converted dump
+    sequentially; read_at gives random access within that window. When
+    the window is used up, policy "error" raises ReplayExhausted, "wrap"
+    restarts at offset, and "fallback" serves the remainder from the OS
+    entropy pool (counted in fallback_bytes).
+    """
+    def __init__(self, path: Path, offset: int = 0, limit: int | None = None,
+                 policy: str = "error", name: str = "QRNG", fmt: str = "auto",
+                 int_bits: int = 32):
+        if policy not in REPLAY_POLICIES:
+            raise ValueError(f"unknown replay policy {policy!r}")
+        self.name = name
+        self.path = Path(path)
+        self.policy = policy
+        bin_path, self.meta = replay_file(self.path, fmt, int_bits)
+        with open(bin_path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._start = min(offset, len(self._data))
+        self._end = len(self._data) if limit is None else min(offset + limit, len(self._data))
+        if self._end <= self._start:
+            raise ValueError(f"empty replay window [{offset}, {self._end}) in {path}")
+        self._pos = self._start
+        self.wraps = 0
+        self.fallback_bytes = 0
+        self._seeds_generated = []
+
+    @classmethod
+    def partition(cls, path: Path, index: int, parts: int, **kwargs) -> "ReplaySource":
+        """Consumer index of parts equal, disjoint windows over the dump."""
+        size = replay_file(Path(path), kwargs.get("fmt", "auto"),
+                           kwargs.get("int_bits", 32))[1]["n_bytes"] // parts
+        return cls(path, offset=index * size, limit=size, **kwargs)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def seek(self, pos: int):
+        """Move the cursor to byte pos of this source's window."""
+        if not 0 <= pos <= len(self):
+            raise IndexError(f"replay position {pos} outside window of {len(self)} bytes")
+        self._pos = self._start + pos
+
+    def tell(self) -> int:
+        return self._pos - self._start
+
+    def read_at(self, pos: int, n: int) -> bytes:
+        """n bytes at byte pos of the window, without moving the cursor."""
+        if pos < 0 or pos + n > len(self):
+            raise IndexError(f"replay read [{pos}, {pos + n}) outside window of {len(self)} bytes")
+        return self._data[self._start + pos:self._start + pos + n]
+
+    def get_bytes(self, n: int) -> bytes:
+        parts = []
+        while n:
+            if self._pos == self._end:
+                if self.policy == "wrap":
+                    self._pos = self._start
+                    self.wraps += 1
+                elif self.policy == "fallback":
+                    parts.append(os_pool().get_bytes(n))
+                    self.fallback_bytes += n
+                    break
+                else:
+                    raise ReplayExhausted(
+                        f"{self.name} replay of {self.path.name} exhausted after {len(self)} bytes")
+            take = min(n, self._end - self._pos)
+            parts.append(self._data[self._pos:self._pos + take])
+            self._pos += take
+            n -= take
+        return b"".join(parts)
+
+    def get_seed(self) -> int:
+        s = int.from_bytes(self.get_bytes(8), 'big')
+        self._seeds_generated.append(s)
+        return s
+
+    def get_float(self) -> float:
+        return int.from_bytes(self.get_bytes(4), 'big') / (2**32)
+
+    def describe(self) -> dict:
+        return {
+            "algorithm": f"replay ({self.meta['format']} dump)",
+            "file": str(self.path),
+            "sha256": self.meta["sha256"],
+            "offset": self._start,
+            "limit": len(self),
+            "position": self.tell(),
+            "policy": self.policy,
+            "wraps": self.wraps,
+            "fallback_bytes": self.fallback_bytes,
+        }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Benchmark
+# ─────────────────────────────────────────────────────────────────────
+
+def _rate(fn, min_seconds: float) -> tuple[int, float]:
+    calls = 0
+    t0 = time.perf_counter()
+    while True:
+        for _ in range(1000):
+            fn()
+        calls += 1000
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_seconds:
+            return calls, elapsed
+
+
+def benchmark_os_pool(block_size: int = DEFAULT_BLOCK_SIZE,
+                      sizes=(4, 8, 4096, 4 * 50257),
+                      min_seconds: float = 0.5) -> dict:
+    """Compare secrets.token_bytes with OSEntropyPool for seeds and byte slices."""
+    pool = OSEntropyPool(block_size)
+    report = {"block_size": block_size, "seeds": {}, "bytes": {}}
+
+    seed_paths = {
+        "secrets": lambda: int.from_bytes(secrets.token_bytes(8), 'big'),
+        "pool": pool.get_seed64,
+    }
+    for name, fn in seed_paths.items():
+        calls, elapsed = _rate(fn, min_seconds)
+        report["seeds"][name] = {"seeds_per_sec": round(calls / elapsed, 1),
+                                 "ns_per_seed": round(elapsed / calls * 1e9, 1)}
+    n = 1_000_000
+    t0 = time.perf_counter()
+    pool.get_seeds64(n)
+    elapsed = time.perf_counter() - t0
+    report["seeds"]["pool_array"] = {"seeds_per_sec": round(n / elapsed, 1),
+                                     "ns_per_seed": round(elapsed / n * 1e9, 1)}
+    report["seeds"]["speedup"] = round(report["seeds"]["pool"]["seeds_per_sec"]
+                                       / report["seeds"]["secrets"]["seeds_per_sec"], 2)
+
+    for size in sizes:
+        row = {}
+        for name, fn in {"secrets": lambda: secrets.token_bytes(size),
+                         "pool": lambda: pool.get_bytes(size)}.items():
+            calls, elapsed = _rate(fn, min_seconds)
+            row[name] = {"mb_per_sec": round(calls * size / elapsed / 1e6, 2),
+                         "us_per_call": round(elapsed / calls * 1e6, 3)}
+        row["speedup"] = round(row["pool"]["mb_per_sec"] / row["secrets"]["mb_per_sec"], 2)
+        report["bytes"][str(size)] = row
+
+    report["refills"] = pool.refills
+    report["timestamp"] = datetime.now().isoformat()
+    return report
+
+
+def benchmark_hmix_batch(n: int = 1_000_000, reference_n: int = 100_000,
+                         workers: int = 1) -> dict:
+    """Seeds/sec for the per-seed HMIX loop versus hmix_seeds."""
+    t0 = time.perf_counter()
+    for i in range(reference_n):
+        hmix_seed_reference(i)
+    ref = reference_n / (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    hmix_seeds(n, workers=workers)
+    batch = n / (time.perf_counter() - t0)
+    return {
+        "reference": {"n": reference_n, "seeds_per_sec": round(ref, 1)},
+        "batch": {"n": n, "workers": workers, "seeds_per_sec": round(batch, 1)},
+        "speedup": round(batch / ref, 2),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared entropy source primitives")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Benchmark the buffered OS pool against secrets.token_bytes")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE,
+                        help="OS read size for the pool (bytes)")
+    parser.add_argument("--seconds", type=float, default=0.5,
+                        help="Minimum timing window per measurement")
+    parser.add_argument("--benchmark-hmix", action="store_true",
+                        help="Benchmark batch HMIX seed generation against the per-seed loop")
+    parser.add_argument("--n", type=int, default=1_000_000,
+                        help="Seeds for --benchmark-hmix")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for batch HMIX hashing")
+    parser.add_argument("--convert-replay", type=str, default=None, metavar="DUMP",
+                        help="Convert a recorded entropy dump for ReplaySource and exit")
+    parser.add_argument("--replay-format", choices=REPLAY_FORMATS, default="auto",
+                        help="Dump format for --convert-replay")
+    parser.add_argument("--replay-int-bits", type=int, default=32,
+                        help="Integer width for integer-text dumps")
+    args = parser.parse_args()
+
+    if args.convert_replay:
+        bin_path, meta = replay_file(Path(args.convert_replay), args.replay_format,
+                                     args.replay_int_bits)
+        print(f"{args.convert_replay}: {meta['format']} dump, {meta['n_bytes']:,d} bytes "
+              f"-> {bin_path} (sha256 {meta['sha256'][:16]})")
+        return
+
+    if args.benchmark_hmix:
+        report = benchmark_hmix_batch(args.n, min(args.n, 100_000), args.workers)
+        print(f"HMIX seeds: per-seed {report['reference']['seeds_per_sec']:>12,.0f}/s, "
+              f"batch {report['batch']['seeds_per_sec']:>12,.0f}/s ({report['speedup']:.1f}x)")
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        filepath = OUTPUT_DIR / f"hmix_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(filepath, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved: {filepath}")
+        return
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    report = benchmark_os_pool(args.block_size, min_seconds=args.seconds)
+    s = report["seeds"]
+    print(f"OS entropy pool (block {args.block_size:,d} B):")
+    print(f"  seeds  secrets: {s['secrets']['seeds_per_sec']:>14,.0f}/s")
+    print(f"  seeds  pool:    {s['pool']['seeds_per_sec']:>14,.0f}/s  ({s['speedup']:.1f}x)")
+    print(f"  seeds  array:   {s['pool_array']['seeds_per_sec']:>14,.0f}/s")
+    for size, row in report["bytes"].items():
+        print(f"  {int(size):>7,d} B/call: secrets {row['secrets']['mb_per_sec']:>9.2f} MB/s, "
+              f"pool {row['pool']['mb_per_sec']:>9.2f} MB/s ({row['speedup']:.1f}x)")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    filepath = OUTPUT_DIR / f"os_pool_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filepath, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved: {filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+REML fits of random-intercept models, batched across metrics.
+
+Fits lmer(metric ~ source + (1|prompt) [+ (1|stream)]) in NumPy, using
+the profiled REML deviance of lme4 (Bates et al. 2015). With λ_b = σ_b / σ
+for each random-effect block and Λ = diag(λ) over the q group columns
+of Z, A = ΛZ'ZΛ + I and
+
+    -2 ℓ_R(λ) = log|A| + log|X'V⁻¹X| + (N - p)(1 + log(2π r² / (N - p)))
+
+where V = I + ZΛ²Z' (in units of σ²) is only ever applied through
+Woodbury, so everything comes from the cross-products Z'Z, Z'X, X'X,
+Z'y, X'y and y'y. The design (prompts, streams, sources) is shared by
+all metrics, so:
+  - the cross-products are formed once per missing-value pattern, with
+    y holding every metric as a column
+  - the deviance for a grid of λ is one batched Cholesky/solve of the
+    (grid, q, q) A matrices, evaluated for every metric at once; the
+    best grid point per metric is then refined with L-BFGS-B
+  - all source contrasts come from one fit (X codes every non-reference
+    source), with SEs from σ²(X'V⁻¹X)⁻¹
+
+Contrast tests use t with between-within degrees of freedom
+N - p - Σ_b (levels_b - 1).
+
+Used by statistical_analysis_v2.py for the mixed-effects analysis.
+"""
+
+import time
+
+import numpy as np
+from scipy import optimize, stats
+
+GRID = np.concatenate(([0.0], np.logspace(-3, 2, 26)))   # λ = σ_b / σ starting points
+MIN_GROUPS = 3
+
+
+def extract_long_samples(data: dict, version: str, metrics: list[str],
+                         sources: list[str]) -> dict:
+    """Per-sample rows: y (N, metrics), with prompt, source and stream indices.
+
+    v1 files have one implicit stream. Missing metric values are NaN.
+    """
+    if version == "v2":
+        streams = [s.get("single_turn", {}) for s in data.get("streams", [])]
+    else:
+        streams = [data.get("single_turn", {})]
+    prompts, rows, labels = {}, [], []
+    for k, st in enumerate(streams):
+        for prompt, source_data in st.items():
+            p = prompts.setdefault(prompt, len(prompts))
+            for j, source in enumerate(sources):
+                cell = source_data.get(source)
+                if not isinstance(cell, dict):
+                    continue
+                for sample in cell.get("samples", []):
+                    m = sample.get("metrics")
+                    if m is None:
+                        continue
+                    vals = [m.get(metric) for metric in metrics]
+                    rows.append([np.nan if v is None else float(v) for v in vals])
+                    labels.append((p, j, k))
+    labels = np.array(labels, dtype=np.int64).reshape(-1, 3)
+    return {
+        "y": np.array(rows, dtype=np.float64).reshape(-1, len(metrics)),
+        "prompt": labels[:, 0],
+        "source": labels[:, 1],
+        "stream": labels[:, 2],
+        "n_prompts": len(prompts),
+        "n_streams": len(streams),
+    }
+
+
+def _indicators(codes: np.ndarray) -> np.ndarray:
+    """One column per level present in codes."""
+    levels, inv = np.unique(codes, return_inverse=True)
+    z = np.zeros((len(codes), len(levels)))
+    z[np.arange(len(codes)), inv] = 1.0
+    return z
+
+
+def _deviance(lam: np.ndarray, cp: dict) -> tuple:
+    """REML deviance (B, K) at B points lam (B, r), plus (beta, r², X'V⁻¹X)."""
+    N, p, q = cp["N"], cp["XtX"].shape[0], cp["ZtZ"].shape[0]
+    s = lam[:, cp["block"]]                                             # (B, q)
+    A = s[:, :, None] * cp["ZtZ"] * s[:, None, :] + np.eye(q)
+    logdet_a = 2 * np.log(np.diagonal(np.linalg.cholesky(A), axis1=1, axis2=2)).sum(axis=1)
+    G = s[:, :, None] * cp["ZtX"]                                       # (B, q, p)
+    h = s[:, :, None] * cp["Zty"]                                       # (B, q, K)
+    sol = np.linalg.solve(A, np.concatenate((G, h), axis=2))
+    a_g, a_h = sol[..., :p], sol[..., p:]
+    xvx = cp["XtX"] - np.swapaxes(G, 1, 2) @ a_g                        # (B, p, p)
+    xvy = cp["Xty"] - np.swapaxes(G, 1, 2) @ a_h                        # (B, p, K)
+    yvy = cp["yty"] - (h * a_h).sum(axis=1)                             # (B, K)
+    beta = np.linalg.solve(xvx, xvy)
+    r2 = np.maximum(yvy - (beta * xvy).sum(axis=1), 1e-300)
+    logdet_x = np.linalg.slogdet(xvx)[1]
+    dev = (logdet_a[:, None] + logdet_x[:, None]
+           + (N - p) * (1 + np.log(2 * np.pi * r2 / (N - p))))
+    return dev, beta, r2, xvx
+
+
+def _fit_pattern(y: np.ndarray, X: np.ndarray, Z: np.ndarray, block: np.ndarray,
+                 n_blocks: int) -> dict:
+    """Fit every column of y (N, K) sharing the design (X, Z)."""
+    cp = {
+        "N": len(y), "block": block,
+        "XtX": X.T @ X, "ZtZ": Z.T @ Z, "ZtX": Z.T @ X,
+        "Xty": X.T @ y, "Zty": Z.T @ y, "yty": (y * y).sum(axis=0),
+    }
+    grid = np.stack(np.meshgrid(*[GRID] * n_blocks, indexing="ij"), axis=-1).reshape(-1, n_blocks)
+    dev = _deviance(grid, cp)[0]                                        # (grid, K)
+    K = y.shape[1]
+    lam = np.empty((K, n_blocks))
+    converged = np.empty(K, dtype=bool)
+    for k in range(K):
+        fit = optimize.minimize(lambda v: _deviance(v[None], cp)[0][0, k],
+                                grid[np.argmin(dev[:, k])], method="L-BFGS-B",
+                                bounds=[(0, None)] * n_blocks)
+        lam[k], converged[k] = fit.x, fit.success
+    dev, beta, r2, xvx = _deviance(lam, cp)
+    K_idx = np.arange(K)
+    p = X.shape[1]
+    sigma2 = r2[K_idx, K_idx] / (len(y) - p)
+    return {
+        "deviance": dev[K_idx, K_idx],
+        "beta": beta[K_idx, :, K_idx],                                  # (K, p)
+        "cov_unscaled": np.linalg.inv(xvx),                             # (K, p, p)
+        "sigma2": sigma2,
+        "lam": lam,
+        "converged": converged,
+    }
+
+
+def reml_random_intercepts(long: dict, metrics: list[str], sources: list[str],
+                           comparisons: list, stream_effect: bool = False) -> dict:
+    """REML fits of metric ~ source + (1|prompt) [+ (1|stream)] for every metric.
+
+    The first source with data is the reference level; each comparison
+    (alt, base) is the contrast β_alt - β_base.
+    """
+    t0 = time.perf_counter()
+    y_all = long["y"]
+    blocks = ["prompt"] + (["stream"] if stream_effect else [])
+    if stream_effect and long["n_streams"] < 2:
+        return {"error": "stream effect needs at least 2 streams"}
+
+    # metrics with the same missing-value pattern share the cross-products
+    patterns = {}
+    for k in range(len(metrics)):
+        patterns.setdefault(np.isnan(y_all[:, k]).tobytes(), []).append(k)
+
+    fits = {}
+    for cols in patterns.values():
+        keep = ~np.isnan(y_all[:, cols[0]])
+        src = long["source"][keep]
+        groups = [long[b][keep] for b in blocks]
+        levels = [len(np.unique(g)) for g in groups]
+        present = np.unique(src)
+        if len(present) < 2 or levels[0] < MIN_GROUPS:
+            for k in cols:
+                fits[k] = {"error": f"{levels[0]} prompts, {len(present)} sources"}
+            continue
+        X = np.column_stack([np.ones(keep.sum())] + [(src == j).astype(float) for j in present[1:]])
+        Zs = [_indicators(g) for g in groups]
+        block = np.concatenate([np.full(z.shape[1], b) for b, z in enumerate(Zs)])
+        fit = _fit_pattern(y_all[keep][:, cols], X, np.hstack(Zs), block, len(blocks))
+        df = int(keep.sum() - X.shape[1] - sum(n - 1 for n in levels))
+        col_of = {int(j): c + 1 for c, j in enumerate(present[1:])}
+        for i, k in enumerate(cols):
+            fits[k] = dict(n_obs=int(keep.sum()), levels=levels, df=df, col_of=col_of,
+                           ref=int(present[0]),
+                           **{key: v[i] for key, v in fit.items()})
+
+    r = lambda v: round(float(v), 6)
+    results = {}
+    for k, metric in enumerate(metrics):
+        f = fits[k]
+        if "error" in f:
+            results[metric] = {"error": f["error"]}
+            continue
+        sigma2 = f["sigma2"]
+        cov = sigma2 * f["cov_unscaled"]
+        var = {b: sigma2 * f["lam"][i] ** 2 for i, b in enumerate(blocks)}
+        total = sigma2 + sum(var.values())
+        contrasts = {}
+        for alt, base in comparisons:
+            a, b = sources.index(alt), sources.index(base)
+            if any(j != f["ref"] and j not in f["col_of"] for j in (a, b)):
+                contrasts[f"{alt}_vs_{base}"] = {"error": "missing source data"}
+                continue
+            c = np.zeros(len(f["beta"]))
+            for j, sign in ((a, 1), (b, -1)):
+                if j != f["ref"]:
+                    c[f["col_of"][j]] += sign
+            est = float(c @ f["beta"])
+            se = float(np.sqrt(c @ cov @ c))
+            t = est / se if se > 0 else 0.0
+            contrasts[f"{alt}_vs_{base}"] = {
+                "estimate": r(est),
+                "se": r(se),
+                "t_statistic": round(t, 4),
+                "df": f["df"],
+                "p_value": r(2 * stats.t.sf(abs(t), f["df"])),
+                "standardized_effect": round(est / np.sqrt(total), 4) if total > 0 else 0.0,
+            }
+        results[metric] = {
+            "n_obs": f["n_obs"],
+            "reference_source": sources[f["ref"]],
+            "n_groups": dict(zip(blocks, f["levels"])),
+            "fixed_effects": {
+                "intercept": r(f["beta"][0]),
+                **{f"source[{sources[j]}]": r(f["beta"][c]) for j, c in f["col_of"].items()},
+            },
+            "variance_components": {**{b: r(v) for b, v in var.items()}, "residual": r(sigma2)},
+            "icc_prompt": r(var["prompt"] / total) if total > 0 else None,
+            "reml_log_likelihood": round(float(-f["deviance"] / 2), 4),
+            "converged": bool(f["converged"]),
+            "contrasts": contrasts,
+        }
+    return {
+        "model": "metric ~ source + (1|prompt)" + (" + (1|stream)" if stream_effect else ""),
+        "fits": results,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Vectorized NIST SP 800-22 style test battery for seed bitstreams.
+
+A source's seeds are packed into one bitstream (each uint64 seed as 8
+big-endian bytes, MSB first, the byte order the health monitor sees) and
+cut into sequences of SEQ_BITS bits. Every test runs on all sequences of
+a batch at once with NumPy, mostly on bytes through lookup tables:
+  - frequency (monobit)
+  - frequency within a block (M = 128)
+  - cumulative sums, forward and backward
+  - longest run of ones in a block (M and class table by sequence length)
+  - serial (m = 16; both ∇ψ² and ∇²ψ² p-values)
+  - approximate entropy (m = 10)
+  - discrete Fourier transform (spectral)
+
+Serial and approximate entropy share one table of overlapping 16-bit
+pattern counts per sequence; shorter patterns are sums over it.
+
+As in the NIST STS, each test reports the proportion of sequences with
+p >= alpha against the acceptable range (1 - alpha) - 3·sqrt(alpha(1 - alpha)/s)
+and the uniformity of its p-values (10-bin chi-squared, P-value_T >= 1e-4).
+
+Usage:
+    python nist_battery.py results/direct_injection/run.json      # every ledger source
+    python nist_battery.py --raw dump.bin
+    python nist_battery.py --benchmark --bits 100000000
+"""
+
+import sys
+sys.stdout.reconfigure(line_buffering=True)
+
+import argparse
+import json
+import math
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from scipy import special, stats
+
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "nist_battery"
+
+SEQ_BITS = 1_000_000
+ALPHA = 0.01
+MIN_BITS = 1000           # shortest sequence every test is defined for
+BATCH_BITS = 1 << 24      # bits processed per batch of sequences
+BLOCK_FREQUENCY_M = 128
+SERIAL_M = 16
+APEN_M = 10
+UNIFORMITY_MIN_SEQUENCES = 55
+UNIFORMITY_ALARM = 1e-4
+
+TESTS = ["monobit", "block_frequency", "cusum_forward", "cusum_backward", "longest_run",
+         "serial_1", "serial_2", "approximate_entropy", "spectral_dft"]
+
+# (minimum n, block length M, class upper bounds v_0..v_K, class probabilities)
+LONGEST_RUN_TABLES = [
+    (750_000, 10_000, [10, 11, 12, 13, 14, 15, 16],
+     [0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727]),
+    (6272, 128, [4, 5, 6, 7, 8, 9], [0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124]),
+    (128, 8, [1, 2, 3, 4], [0.2148, 0.3672, 0.2305, 0.2344]),
+]
+
+
+def _byte_tables():
+    """Per byte (MSB first): popcount, max / min of the ±1 walk prefix sums,
+    and the leading, trailing and longest runs of ones."""
+    tables = np.zeros((6, 256), dtype=np.int64)
+    for b in range(256):
+        bits = [(b >> i) & 1 for i in range(7, -1, -1)]
+        walk = np.cumsum([1 if x else -1 for x in bits])
+        runs = "".join(map(str, bits)).split("0")
+        tables[:, b] = [sum(bits), walk.max(), walk.min(),
+                        len(runs[0]), len(runs[-1]), max(map(len, runs))]
+    return tables
+
+
+_POPCOUNT, _WALK_MAX, _WALK_MIN, _LEAD, _TRAIL, _INNER = _byte_tables()
+
+
+def seeds_to_bytes(seeds) -> np.ndarray:
+    """Packed bitstream of uint64 seeds: 8 big-endian bytes each."""
+    return np.ascontiguousarray(np.asarray(seeds, dtype=np.uint64), dtype=">u8").view(np.uint8)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Tests: each takes a (s, n/8) uint8 matrix of s sequences, returns p-values
+# ─────────────────────────────────────────────────────────────────────
+
+def monobit(rows: np.ndarray) -> np.ndarray:
+    n = rows.shape[1] * 8
+    s = 2 * _POPCOUNT[rows].sum(axis=1) - n
+    return special.erfc(np.abs(s) / math.sqrt(2 * n))
+
+
+def block_frequency(rows: np.ndarray, m: int = BLOCK_FREQUENCY_M) -> np.ndarray:
+    s, nbytes = rows.shape
+    n_blocks = nbytes * 8 // m
+    blocks = rows[:, :n_blocks * m // 8].reshape(s, n_blocks, m // 8)
+    pi = _POPCOUNT[blocks].sum(axis=2) / m
+    chi2 = 4 * m * ((pi - 0.5) ** 2).sum(axis=1)
+    return special.gammaincc(n_blocks / 2, chi2 / 2)
+
+
+def _cusum_p(z: int, n: int) -> float:
+    if z == 0:
+        return 1.0
+    sq = math.sqrt(n)
+    k1 = np.arange(int((-n / z + 1) / 4), math.floor((n / z - 1) / 4) + 1)
+    k2 = np.arange(int((-n / z - 3) / 4), math.floor((n / z - 1) / 4) + 1)
+    phi = stats.norm.cdf
+    p = (1.0 - (phi((4 * k1 + 1) * z / sq) - phi((4 * k1 - 1) * z / sq)).sum()
+         + (phi((4 * k2 + 3) * z / sq) - phi((4 * k2 + 1) * z / sq)).sum())
+    return float(min(max(p, 0.0), 1.0))
+
+
+def cumulative_sums(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(forward, backward) p-values from byte-level walk extremes."""
+    n = rows.shape[1] * 8
+    step = 2 * _POPCOUNT[rows] - 8
+    before = np.cumsum(step, axis=1) - step         # S at each byte boundary
+    s_max = (before + _WALK_MAX[rows]).max(axis=1)  # max S_k, 1 <= k <= n
+    s_min = (before + _WALK_MIN[rows]).min(axis=1)
+    total = before[:, -1] + step[:, -1]
+    z_fwd = np.maximum(np.abs(s_max), np.abs(s_min))
+    # backward sums are S_n - S_j, 0 <= j < n (S_0 = 0)
+    z_bwd = np.maximum(total - np.minimum(s_min, 0), np.maximum(s_max, 0) - total)
+    return (np.array([_cusum_p(int(z), n) for z in z_fwd]),
+            np.array([_cusum_p(int(z), n) for z in z_bwd]))
+
+
+def longest_runs(blocks: np.ndarray) -> np.ndarray:
+    """Longest run of ones in each row of a (k, M/8) byte matrix."""
+    # A run longer than one byte is the trailing ones of one non-full byte,
+    # the 0xFF bytes after it, and the leading ones of the next non-full
+    # byte. A zero byte appended to each row closes runs at its end.
+    b = np.concatenate((blocks, np.zeros((len(blocks), 1), dtype=np.uint8)), axis=1)
+    pos = np.arange(b.shape[1])
+    nonfull = b != 0xFF
+    last = np.maximum.accumulate(np.where(nonfull, pos, -1), axis=1)
+    prev = np.concatenate((np.full((len(b), 1), -1), last[:, :-1]), axis=1)
+    trail_prev = np.where(prev >= 0, _TRAIL[np.take_along_axis(b, np.maximum(prev, 0), axis=1)], 0)
+    spanning = np.where(nonfull, trail_prev + 8 * (pos - prev - 1) + _LEAD[b], 0)
+    return np.maximum(spanning.max(axis=1), _INNER[b].max(axis=1))
+
+
+def longest_run(rows: np.ndarray) -> np.ndarray:
+    s, nbytes = rows.shape
+    n = nbytes * 8
+    _, m, bounds, probs = next(t for t in LONGEST_RUN_TABLES if n >= t[0])
+    n_blocks = n // m
+    blocks = rows[:, :n_blocks * m // 8].reshape(s * n_blocks, m // 8)
+    longest = longest_runs(blocks).reshape(s, n_blocks)
+    cls = np.clip(np.searchsorted(bounds, longest, side="left"), 0, len(bounds) - 1)
+    counts = np.stack([np.bincount(r, minlength=len(bounds)) for r in cls])
+    expected = n_blocks * np.asarray(probs)
+    chi2 = ((counts - expected) ** 2 / expected).sum(axis=1)
+    return special.gammaincc((len(bounds) - 1) / 2, chi2 / 2)
+
+
+def pattern_counts(rows: np.ndarray) -> np.ndarray:
+    """(s, 65536) counts of overlapping 16-bit windows, wrapping each sequence."""
+    s, nbytes = rows.shape
+    ext = np.concatenate((rows, rows[:, :2]), axis=1).astype(np.uint32)
+    u24 = (ext[:, :-2] << 16) | (ext[:, 1:-1] << 8) | ext[:, 2:]
+    out = np.empty((s, 1 << 16), dtype=np.int64)
+    for i in range(s):
+        windows = np.concatenate([(u24[i] >> (8 - k)) & 0xFFFF for k in range(8)])
+        out[i] = np.bincount(windows, minlength=1 << 16)
+    return out
+
+
+def _counts_m(counts16: np.ndarray, m: int) -> np.ndarray:
+    """Counts of m-bit windows (m <= 16) from the 16-bit window table."""
+    return counts16.reshape(len(counts16), 1 << m, 1 << (16 - m)).sum(axis=2)
+
+
+def serial(counts16: np.ndarray, n: int, m: int = SERIAL_M) -> tuple[np.ndarray, np.ndarray]:
+    def psi2(k):
+        if k <= 0:
+            return 0.0
+        return (1 << k) / n * (_counts_m(counts16, k).astype(np.float64) ** 2).sum(axis=1) - n
+    p0, p1, p2 = psi2(m), psi2(m - 1), psi2(m - 2)
+    return (special.gammaincc(2 ** (m - 2), (p0 - p1) / 2),
+            special.gammaincc(2 ** (m - 3), (p0 - 2 * p1 + p2) / 2))
+
+
+def approximate_entropy(counts16: np.ndarray, n: int, m: int = APEN_M) -> np.ndarray:
+    def phi(k):
+        pi = _counts_m(counts16, k) / n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(pi > 0, pi * np.log(pi), 0.0).sum(axis=1)
+    apen = phi(m) - phi(m + 1)
+    chi2 = 2 * n * (math.log(2) - apen)
+    return special.gammaincc(2 ** (m - 1), chi2 / 2)
+
+
+def spectral_dft(rows: np.ndarray) -> np.ndarray:
+    n = rows.shape[1] * 8
+    x = np.unpackbits(rows, axis=1).astype(np.float32) * 2 - 1
+    mod = np.abs(np.fft.rfft(x, axis=1)[:, :n // 2])
+    t = math.sqrt(math.log(1 / 0.05) * n)
+    n0 = 0.95 * n / 2
+    n1 = (mod < t).sum(axis=1)
+    d = (n1 - n0) / math.sqrt(n * 0.95 * 0.05 / 4)
+    return special.erfc(np.abs(d) / math.sqrt(2))
+
+
+def run_tests(rows: np.ndarray) -> dict[str, np.ndarray]:
+    """p-values of every test for a batch of equal-length sequences."""
+    n = rows.shape[1] * 8
+    log2n = int(math.log2(n))
+    # NIST: m < floor(log2 n) - 2 (serial), m < floor(log2 n) - 5 (ApEn)
+    m_serial = min(SERIAL_M, log2n - 3)
+    m_apen = min(APEN_M, log2n - 6)
+    counts16 = pattern_counts(rows)
+    fwd, bwd = cumulative_sums(rows)
+    s1, s2 = serial(counts16, n, m_serial)
+    return {
+        "monobit": monobit(rows),
+        "block_frequency": block_frequency(rows),
+        "cusum_forward": fwd,
+        "cusum_backward": bwd,
+        "longest_run": longest_run(rows),
+        "serial_1": s1,
+        "serial_2": s2,
+        "approximate_entropy": approximate_entropy(counts16, n, m_apen),
+        "spectral_dft": spectral_dft(rows),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Battery over a stream
+# ─────────────────────────────────────────────────────────────────────
+
+class NistBattery:
+    """Runs the battery on SEQ_BITS sequences as bytes arrive.
+
+    merge(other) pools the per-sequence p-values of another battery and
+    appends its buffered partial sequence to this one's, testing any
+    sequences that completes, so no fed bits are lost across merges.
+    """
+    def __init__(self, seq_bits: int = SEQ_BITS, alpha: float = ALPHA):
+        if seq_bits % 8 or seq_bits < MIN_BITS:
+            raise ValueError(f"seq_bits must be a multiple of 8 and >= {MIN_BITS}")
+        self.seq_bits = seq_bits
+        self.alpha = alpha
+        self.p_values = {t: [] for t in TESTS}
+        self.n_sequences = 0
+        self.n_bytes = 0
+        self._buf = np.empty(0, dtype=np.uint8)
+        self.seconds = 0.0
+
+    def update(self, data):
+        data = np.frombuffer(data, dtype=np.uint8) if isinstance(data, (bytes, bytearray)) \
+            else np.asarray(data, dtype=np.uint8).ravel()
+        self.n_bytes += len(data)
+        self._consume(np.concatenate((self._buf, data)) if len(self._buf) else data)
+
+    def _consume(self, buf: np.ndarray):
+        """Test every whole sequence in buf and keep the remainder buffered."""
+        seq_bytes = self.seq_bits // 8
+        n_seq = len(buf) // seq_bytes
+        per_batch = max(1, BATCH_BITS // self.seq_bits)
+        for i in range(0, n_seq, per_batch):
+            k = min(per_batch, n_seq - i)
+            self._run(buf[i * seq_bytes:(i + k) * seq_bytes].reshape(k, seq_bytes))
+        self._buf = buf[n_seq * seq_bytes:].copy()
+
+    def update_seeds(self, seeds):
+        self.update(seeds_to_bytes(seeds))
+
+    def _run(self, rows: np.ndarray):
+        t0 = time.perf_counter()
+        for test, p in run_tests(rows).items():
+            self.p_values[test].extend(np.clip(p, 0.0, 1.0).tolist())
+        self.n_sequences += len(rows)
+        self.seconds += time.perf_counter() - t0
+
+    def merge(self, other: "NistBattery"):
+        for t in TESTS:
+            self.p_values[t].extend(other.p_values[t])
+        self.n_sequences += other.n_sequences
+        self.n_bytes += other.n_bytes
+        self.seconds += other.seconds
+        if len(other._buf):
+            self._consume(np.concatenate((self._buf, other._buf)))
+
+    def report(self) -> dict:
+        p_values, n_seq, seq_bits = self.p_values, self.n_sequences, self.seq_bits
+        # a stream shorter than one sequence is tested as a single sequence
+        if not n_seq and len(self._buf) * 8 >= MIN_BITS:
+            usable = len(self._buf) // 16 * 16
+            t0 = time.perf_counter()
+            p_values = {t: np.clip(p, 0.0, 1.0).tolist()
+                        for t, p in run_tests(self._buf[:usable].reshape(1, usable)).items()}
+            self.seconds += time.perf_counter() - t0
+            n_seq, seq_bits = 1, usable * 8
+        if not n_seq:
+            return {"n_bits": self.n_bytes * 8, "error": f"fewer than {MIN_BITS} bits"}
+
+        alpha = self.alpha
+        min_prop = (1 - alpha) - 3 * math.sqrt(alpha * (1 - alpha) / n_seq)
+        tests = {}
+        for test in TESTS:
+            p = np.asarray(p_values[test])
+            prop = float((p >= alpha).mean())
+            counts = np.histogram(p, bins=10, range=(0, 1))[0]
+            chi2 = float(((counts - n_seq / 10) ** 2).sum() / (n_seq / 10))
+            p_t = float(special.gammaincc(9 / 2, chi2 / 2))
+            uniform = bool(p_t >= UNIFORMITY_ALARM) if n_seq >= UNIFORMITY_MIN_SEQUENCES else None
+            tests[test] = {
+                "proportion_passing": round(prop, 4),
+                "min_proportion": round(max(min_prop, 0.0), 4),
+                "uniformity_p_value": round(p_t, 6),
+                "uniform": uniform,
+                "pass": bool(prop >= min_prop and uniform is not False),
+                "p_values": [round(float(v), 6) for v in p],
+            }
+        failed = [t for t in TESTS if not tests[t]["pass"]]
+        return {
+            "n_bits": self.n_bytes * 8,
+            "sequence_bits": seq_bits,
+            "n_sequences": n_seq,
+            "unused_bits": self.n_bytes * 8 - n_seq * seq_bits,
+            "alpha": alpha,
+            "tests": tests,
+            "n_tests": len(TESTS),
+            "n_passed": len(TESTS) - len(failed),
+            "failed": failed,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def nist_battery(data, seq_bits: int = SEQ_BITS, alpha: float = ALPHA) -> dict:
+    """One-shot battery over a byte string or uint8 array."""
+    battery = NistBattery(seq_bits, alpha)
+    battery.update(data)
+    return battery.report()
+
+
+def print_report(name: str, report: dict):
+    if "error" in report:
+        print(f"  {name}: {report['error']}")
+        return
+    print(f"  {name}: {report['n_sequences']} x {report['sequence_bits']:,} bits, "
+          f"{report['n_passed']}/{report['n_tests']} tests pass ({report['seconds']:.2f}s)")
+    for test, r in report["tests"].items():
+        flag = "" if r["pass"] else "  <-- FAIL"
+        print(f"    {test:<20} prop={r['proportion_passing']:.4f} (min {r['min_proportion']:.4f})"
+              f"  P-value_T={r['uniformity_p_value']:.4f}{flag}")
+
+
+# ─────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────
+
+def screen_ledger(result_path: str, seq_bits: int) -> dict:
+    """Battery per source over the seed ledger referenced by a result file."""
+    from seed_ledger import iter_seeds_by_source
+
+    with open(result_path) as f:
+        data = json.load(f)
+    if "seed_ledger" not in data:
+        raise SystemExit(f"{result_path} has no seed_ledger reference")
+    batteries = {}
+    for source, chunk in iter_seeds_by_source(result_path, data["seed_ledger"]):
+        batteries.setdefault(source, NistBattery(seq_bits)).update_seeds(chunk)
+    return {source: b.report() for source, b in batteries.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NIST SP 800-22 style battery")
+    parser.add_argument("result", nargs="?", default=None,
+                        help="Experiment result JSON with a seed_ledger reference")
+    parser.add_argument("--raw", type=str, default=None, help="Raw binary file to test")
+    parser.add_argument("--seq-bits", type=int, default=SEQ_BITS,
+                        help=f"Bits per sequence (default: {SEQ_BITS})")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time the battery on OS entropy")
+    parser.add_argument("--bits", type=int, default=100_000_000,
+                        help="Stream length for --benchmark (default: 1e8)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        data = np.frombuffer(os.urandom(args.bits // 8), dtype=np.uint8)
+        t0 = time.perf_counter()
+        report = nist_battery(data, args.seq_bits)
+        dt = time.perf_counter() - t0
+        print(f"{args.bits:,} bits in {dt:.2f}s ({args.bits / dt / 1e6:.1f} Mbit/s)")
+        print_report("os.urandom", report)
+        results = {"benchmark": True, "seconds": round(dt, 3), "sources": {"os.urandom": report}}
+        stem = f"benchmark_{args.bits}"
+    elif args.raw:
+        report = nist_battery(np.fromfile(args.raw, dtype=np.uint8), args.seq_bits)
+        print_report(Path(args.raw).name, report)
+        results = {"source_file": args.raw, "sources": {Path(args.raw).name: report}}
+        stem = Path(args.raw).stem
+    elif args.result:
+        reports = screen_ledger(args.result, args.seq_bits)
+        for source, report in reports.items():
+            print_report(source, report)
+        results = {"source_file": args.result, "sources": reports}
+        stem = Path(args.result).stem
+    else:
+        parser.error("give a result JSON, --raw or --benchmark")
+
+    results["timestamp"] = datetime.now().isoformat()
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    filepath = OUTPUT_DIR / f"nist_{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filepath, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved: {filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Sign-flip permutation tests for paired source comparisons.
+
+Under H0 (no source effect) each prompt's paired difference d_i is
+symmetric about zero, so the null distribution of T = Σ d_i is that of
+Σ ±d_i over all 2^n sign vectors. T is equivalent to the paired t
+statistic (Σ d_i² is fixed under sign flips), with no normal approximation.
+
+  - exact, for n ≤ EXACT_MAX_N nonzero differences: meet in the middle.
+    The 2^(n/2) sums of each half are enumerated by doubling (every sum
+    is one addition from an earlier one), and pairs with a + b ≥ |T| are
+    counted from one stable sort of the merged halves, so 2^30 sign
+    vectors cost two 2^15-element arrays.
+  - Monte Carlo otherwise: a seeded ±1 matrix times all difference
+    vectors of the same length, p = (1 + #{|T*| ≥ |T|}) / (1 + B).
+
+Every metric × comparison goes through in one call: rows of equal n are
+stacked and enumerated (or flipped) together.
+
+Used by statistical_analysis_v2.py, whose BH correction includes these
+p-values.
+"""
+
+import numpy as np
+
+EXACT_MAX_N = 40
+N_RESAMPLES = 100_000
+BATCH_ELEMENTS = 1 << 22   # merged half sums (exact) or flipped values (Monte Carlo) per batch
+RTOL = 1e-9                # |T*| within RTOL·Σ|d| of |T| counts as a tie
+
+
+def _half_sums(d: np.ndarray) -> np.ndarray:
+    """All 2^k sums Σ ±d_j over the k columns of d (R, k), as (R, 2^k)."""
+    sums = np.zeros((d.shape[0], 1))
+    for j in range(d.shape[1]):
+        col = d[:, j:j + 1]
+        sums = np.concatenate((sums - col, sums + col), axis=1)
+    return sums
+
+
+def _count_at_least(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Per row, #{(i, j): a[i] + b[j] ≥ t}, for a (R, nA), b (R, nB), t (R,)."""
+    n_a, n_b = a.shape[1], b.shape[1]
+    # queries t - a go first, so the stable sort puts them before equal b values
+    merged = np.concatenate((t[:, None] - a, b), axis=1)
+    is_b = np.argsort(merged, axis=1, kind="stable") >= n_a
+    b_before = np.cumsum(is_b, axis=1) - is_b
+    return np.where(is_b, 0, n_b - b_before).sum(axis=1)
+
+
+def _exact(d: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Two-sided exact p-values for rows of d (R, n) with thresholds t (R,)."""
+    R, n = d.shape
+    k = n // 2
+    rows = max(1, BATCH_ELEMENTS // (2 << max(k, n - k)))
+    counts = np.empty(R, dtype=np.int64)
+    for lo in range(0, R, rows):
+        sl = slice(lo, lo + rows)
+        counts[sl] = _count_at_least(_half_sums(d[sl, :k]), _half_sums(d[sl, k:]), t[sl])
+    # the null is symmetric: #{T* ≤ -t} = #{T* ≥ t}
+    return np.minimum(1.0, 2.0 * counts / 2.0 ** n)
+
+
+def _monte_carlo(d: np.ndarray, t: np.ndarray, n_resamples: int,
+                 rng: np.random.Generator) -> np.ndarray:
+    R, n = d.shape
+    batch = max(1, BATCH_ELEMENTS // max(n, R))
+    hits = np.zeros(R, dtype=np.int64)
+    for lo in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - lo)
+        signs = 1.0 - 2.0 * rng.integers(0, 2, size=(size, n), dtype=np.int8)
+        hits += (np.abs(signs @ d.T) >= t).sum(axis=0)
+    return (hits + 1) / (n_resamples + 1)
+
+
+def sign_flip_tests(diffs: list, n_resamples: int = N_RESAMPLES, seed: int = 0,
+                    exact_max: int = EXACT_MAX_N) -> list[dict]:
+    """Two-sided sign-flip tests of mean zero for each array of paired differences.
+
+    Zero differences are dropped (they do not change T). Arrays with at
+    most exact_max nonzero differences are tested exactly; longer ones
+    with n_resamples Monte Carlo sign vectors, seeded from (seed, n) so a
+    test does not depend on which other arrays are in the call.
+    """
+    clean = [np.asarray(v, dtype=np.float64) for v in diffs]
+    clean = [v[~np.isnan(v) & (v != 0)] for v in clean]
+    out = [None] * len(clean)
+    by_n = {}
+    for i, v in enumerate(clean):
+        by_n.setdefault(len(v), []).append(i)
+
+    for n, idx in sorted(by_n.items()):
+        if n == 0:
+            for i in idx:
+                out[i] = {"statistic": 0.0, "p_value": 1.0, "method": "exact", "n_sign_flips": 1}
+            continue
+        d = np.stack([clean[i] for i in idx])
+        t = np.abs(d.sum(axis=1)) - RTOL * np.abs(d).sum(axis=1)
+        if n <= exact_max:
+            p = _exact(d, t)
+            method, flips = "exact", 2 ** n
+        else:
+            p = _monte_carlo(d, t, n_resamples, np.random.default_rng([seed, n]))
+            method, flips = "monte_carlo", n_resamples
+        for row, i in enumerate(idx):
+            out[i] = {
+                "statistic": float(d[row].sum()),
+                "p_value": float(p[row]),
+                "method": method,
+                "n_sign_flips": flips,
+            }
+            if method == "monte_carlo":
+                out[i]["monte_carlo_se"] = float(np.sqrt(p[row] * (1 - p[row]) / n_resamples))
+    for v, r in zip(clean, out):
+        r["n_nonzero"] = len(v)
+    return out
@@ -18,6 +18,8 @@ Usage:
     python run_comprehensive_experiment_v2.py --model gemma3:4b --samples 10
     python run_comprehensive_experiment_v2.py --model gemma3:4b --samples 10 --temperature 0.8
     python run_comprehensive_experiment_v2.py --all-models --samples 5
+    python run_comprehensive_experiment_v2.py --model gemma3:4b --samples 10 --prng-engine philox
+    python run_comprehensive_experiment_v2.py --model gemma3:4b --samples 10 --replay qrng_cache.hex
 """
 
 import sys
@@ -30,7 +32,6 @@ import os
 import random as stdlib_random
 import re
 import requests
-import secrets
 import subprocess
 import time
 from collections import Counter
@@ -38,6 +39,11 @@ from datetime import datetime
 from math import log2
 from pathlib import Path
 
+from entropy_sources import (PHILOX_ROOT, REPLAY_POLICIES, PhiloxSource, ReplaySource,
+                             hmix_seeds, os_pool)
+from entropy_health import HealthMonitor, MonitoredSource
+from seed_ledger import SeedLedger
+
 OUTPUT_DIR = Path(__file__).parent.parent / "results" / "v2_experiments"
 ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 COT_PATTERN = re.compile(r'<think>.*?</think>', re.DOTALL)
@@ -171,15 +177,27 @@ class PRNGSource:
         self._seeds_generated.append(s)
         return s
 
+    def describe(self) -> dict:
+        return {
+            "algorithm": "MT19937 (random.Random)",
+            "seed": self.stream_seed,
+            "offset": 0,
+            "draws": "seed k = k-th getrandbits(64); no seek, replay required",
+        }
+
 
 class TRNGSource:
-    """OS hardware entropy (/dev/urandom, Apple Secure Enclave on M-series)."""
+    """OS hardware entropy (/dev/urandom, Apple Secure Enclave on M-series).
+
+    Seeds are drawn from the shared block-buffered OSEntropyPool rather
+    than one getrandom call per seed.
+    """
     def __init__(self):
         self.name = "TRNG"
         self._seeds_generated = []
 
     def get_seed(self) -> int:
-        s = int.from_bytes(secrets.token_bytes(8), byteorder='big')
+        s = os_pool().get_seed64()
         self._seeds_generated.append(s)
         return s
 
@@ -197,12 +215,19 @@ class HMIXSource:
 
     def get_seed(self) -> int:
         self._counter += 1
-        data = f"{time.time_ns()}-{secrets.token_hex(16)}-{self._counter}"
+        data = f"{time.time_ns()}-{os_pool().get_bytes(16).hex()}-{self._counter}"
         h = hashlib.sha256(data.encode()).digest()
         s = int.from_bytes(h[:8], byteorder='big')
         self._seeds_generated.append(s)
         return s
 
+    def get_seeds(self, n: int) -> list[int]:
+        """n consecutive seeds in one batch, same construction as get_seed."""
+        seeds = hmix_seeds(n, start=self._counter + 1).tolist()
+        self._counter += n
+        self._seeds_generated.extend(seeds)
+        return seeds
+
 
 # ─────────────────────────────────────────────────────────────────────
 # Text processing
@@ -387,7 +412,9 @@ def run_ollama(model: str, prompt: str, seed: int, temperature: float = 0.7,
 # ─────────────────────────────────────────────────────────────────────
 
 def run_single_turn_experiments(model: str, num_samples: int, sources: dict,
-                                temperature: float, rng: stdlib_random.Random) -> dict:
+                                temperature: float, rng: stdlib_random.Random,
+                                ledger: SeedLedger | None = None,
+                                stream_idx: int = 0) -> dict:
     """Run single-turn experiments with randomized source order."""
     results = {}
     source_names = list(sources.keys())
@@ -424,6 +451,10 @@ def run_single_turn_experiments(model: str, num_samples: int, sources: dict,
                                     "output": output, "metrics": None})
                     print(f"      {source_name}[{i+1}]: {output}")
 
+            if ledger is not None:
+                ledger.record(stream_idx, "single_turn", prompt_key, source_name,
+                              [s["seed"] for s in samples])
+
             valid = [s for s in samples if s["metrics"]]
             if valid:
                 agg = {}
@@ -444,7 +475,9 @@ def run_single_turn_experiments(model: str, num_samples: int, sources: dict,
 
 
 def run_multi_turn_experiments(model: str, num_samples: int, sources: dict,
-                                temperature: float, rng: stdlib_random.Random) -> dict:
+                                temperature: float, rng: stdlib_random.Random,
+                                ledger: SeedLedger | None = None,
+                                stream_idx: int = 0) -> dict:
     """Run multi-turn conversation experiments with randomized source order."""
     results = {}
     source_names = list(sources.keys())
@@ -480,19 +513,50 @@ def run_multi_turn_experiments(model: str, num_samples: int, sources: dict,
 
                 conv_samples.append({"seed": seed, "seed_32": seed % (2**32), "turns": turns})
 
+            if ledger is not None:
+                ledger.record(stream_idx, "multi_turn", conv["name"], source_name,
+                              [s["seed"] for s in conv_samples])
             results[conv["name"]][source_name] = conv_samples
 
     return results
 
 
+def make_prng_source(prng_seed: int, engine: str = "mt", root: int = PHILOX_ROOT):
+    """PRNG stream for one entry of --prng-seeds.
+
+    "mt" seeds random.Random directly; "philox" uses the value as the
+    spawn key of a child of SeedSequence(root), giving independent,
+    seekable streams.
+    """
+    if engine == "philox":
+        return PhiloxSource(stream=prng_seed, root=root)
+    return PRNGSource(seed=prng_seed)
+
+
 def run_full_experiment(model: str, num_samples: int, temperature: float,
-                       prng_seeds: list, skip_multi_turn: bool = False) -> dict:
-    """Run complete experiment suite with multiple PRNG streams."""
+                       prng_seeds: list, skip_multi_turn: bool = False,
+                       prng_engine: str = "mt", prng_root: int = PHILOX_ROOT,
+                       ledger: SeedLedger | None = None, replay: dict | None = None,
+                       health: bool = True) -> dict:
+    """Run complete experiment suite with multiple PRNG streams.
+
+    replay ({"path", "name", "policy"}) adds a source that replays a
+    recorded entropy dump; each PRNG stream reads its own disjoint
+    partition of the file.
+
+    With health, every source is wrapped in an online HealthMonitor
+    (entropy_health.py); alarms are printed as they happen and each
+    stream records its monitors' reports under source_health.
+
+    With a ledger, every sample seed is recorded there (see seed_ledger.py)
+    and seed_distributions keeps only counts and generator parameters;
+    without one the 64/32-bit seed lists are embedded in the JSON as before.
+    """
     print(f"\n{'='*70}")
     print(f" COMPREHENSIVE ENTROPY EXPERIMENT v2: {model}")
     print(f" Samples per condition: {num_samples}")
     print(f" Temperature: {temperature}")
-    print(f" PRNG streams: {prng_seeds}")
+    print(f" PRNG streams: {prng_seeds} ({prng_engine})")
     multi_turn_status = "SKIPPED" if skip_multi_turn else str(len(MULTI_TURN_CONVERSATIONS))
     print(f" Prompts: {len(SINGLE_TURN_PROMPTS)} single-turn, {multi_turn_status} multi-turn")
     print(f"{'='*70}")
@@ -508,10 +572,17 @@ def run_full_experiment(model: str, num_samples: int, temperature: float,
         print(f"{'─'*50}")
 
         sources = {
-            "PRNG": PRNGSource(seed=prng_seed),
+            "PRNG": make_prng_source(prng_seed, prng_engine, prng_root),
             "TRNG": TRNGSource(),
             "HMIX": HMIXSource(),
         }
+        if replay:
+            sources[replay["name"]] = ReplaySource.partition(
+                replay["path"], stream_idx, len(prng_seeds),
+                policy=replay["policy"], name=replay["name"])
+        if health:
+            sources = {name: MonitoredSource(src, HealthMonitor(name))
+                       for name, src in sources.items()}
 
         stream_result = {
             "prng_stream_seed": prng_seed,
@@ -521,27 +592,39 @@ def run_full_experiment(model: str, num_samples: int, temperature: float,
 
         print("\n  [PHASE 1: Single-Turn Prompts]")
         stream_result["single_turn"] = run_single_turn_experiments(
-            model, num_samples, sources, temperature, order_rng)
+            model, num_samples, sources, temperature, order_rng, ledger, stream_idx)
 
         if not skip_multi_turn:
             print("\n  [PHASE 2: Multi-Turn Conversations]")
             stream_result["multi_turn"] = run_multi_turn_experiments(
-                model, num_samples, sources, temperature, order_rng)
+                model, num_samples, sources, temperature, order_rng, ledger, stream_idx)
         else:
             stream_result["multi_turn"] = {"skipped": True, "note": "Multi-turn disabled via --no-multi-turn"}
 
         # Log seed distributions
         stream_result["seed_distributions"] = {
             name: {
-                "seeds_64bit": src._seeds_generated,
-                "seeds_32bit": [s % (2**32) for s in src._seeds_generated],
+                **({} if ledger is not None else {
+                    "seeds_64bit": src._seeds_generated,
+                    "seeds_32bit": [s % (2**32) for s in src._seeds_generated],
+                }),
                 "count": len(src._seeds_generated),
+                **({"generator": src.describe()} if hasattr(src, "describe") else {}),
             }
             for name, src in sources.items()
         }
 
+        if health:
+            stream_result["source_health"] = {
+                name: src.monitor.report() for name, src in sources.items()}
+
         all_stream_results.append(stream_result)
 
+    health_alarms = {}
+    for stream in all_stream_results:
+        for name, report in stream.get("source_health", {}).items():
+            health_alarms[name] = health_alarms.get(name, 0) + report["n_alarms"]
+
     results = {
         "model": model,
         "experiment_version": "v2",
@@ -549,7 +632,13 @@ def run_full_experiment(model: str, num_samples: int, temperature: float,
         "num_samples": num_samples,
         "temperature": temperature,
         "prng_seeds": prng_seeds,
+        "prng_engine": prng_engine,
+        **({"replay": {"file": str(replay["path"]), "name": replay["name"],
+                       "policy": replay["policy"], "partitions": len(prng_seeds)}}
+           if replay else {}),
+        **({"prng_root": prng_root} if prng_engine == "philox" else {}),
         "skip_multi_turn": skip_multi_turn,
+        **({"health_alarms": health_alarms} if health else {}),
         "num_prompts_single_turn": len(SINGLE_TURN_PROMPTS),
         "num_prompts_multi_turn": 0 if skip_multi_turn else len(MULTI_TURN_CONVERSATIONS),
         "prompt_domains": {
@@ -560,10 +649,14 @@ def run_full_experiment(model: str, num_samples: int, temperature: float,
             "source_order": "randomized per prompt (seed=12345)",
             "temperature": f"explicitly set to {temperature} for all models",
             "cot_handling": "stripped before metric computation; length_words_raw preserves original",
-            "prng_streams": f"{len(prng_seeds)} independent Mersenne Twister streams",
+            "prng_streams": (f"{len(prng_seeds)} Philox streams spawned from SeedSequence({prng_root})"
+                             if prng_engine == "philox" else
+                             f"{len(prng_seeds)} independent Mersenne Twister streams"),
             "hmix_note": "HMIX = SHA256(timestamp + secrets + counter), NOT quantum random",
             "metrics": "shannon_char, shannon_word (Miller-Madow corrected), TTR, MTLD, D2, rep_ratio",
             "seed_truncation": "64-bit → 32-bit via modulo for ollama compatibility",
+            "seed_storage": ("binary ledger (seed_ledger)" if ledger is not None
+                             else "seed_distributions lists"),
         },
         "streams": all_stream_results,
     }
@@ -583,7 +676,7 @@ def get_model_family(model: str) -> str:
     return "other"
 
 
-def save_results(results: dict, model: str) -> Path:
+def save_results(results: dict, model: str, ledger: SeedLedger | None = None) -> Path:
     family = get_model_family(model)
     output_dir = OUTPUT_DIR / family
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -593,6 +686,8 @@ def save_results(results: dict, model: str) -> Path:
     filename = f"v2_{model_safe}_{timestamp}.json"
 
     filepath = output_dir / filename
+    if ledger is not None:
+        results["seed_ledger"] = ledger.write(filepath.with_suffix(""))
     with open(filepath, "w") as f:
         json.dump(results, f, indent=2, default=str)
 
@@ -614,6 +709,20 @@ def main():
                         help="Generation temperature (default: 0.7, same for all models)")
     parser.add_argument("--prng-seeds", type=str, default="42,123,7,999,314",
                         help="Comma-separated PRNG stream seeds (default: 42,123,7,999,314)")
+    parser.add_argument("--prng-engine", choices=["mt", "philox"], default="mt",
+                        help="PRNG stream generator: Mersenne Twister per seed (mt) or "
+                             "counter-based Philox child streams of --prng-root (philox)")
+    parser.add_argument("--prng-root", type=int, default=PHILOX_ROOT,
+                        help=f"Root SeedSequence entropy for --prng-engine philox (default: {PHILOX_ROOT})")
+    parser.add_argument("--replay", type=str, default=None, metavar="DUMP",
+                        help="Add a source replaying a recorded entropy dump (hex, integer "
+                             "text or raw bytes), e.g. a cached QRNG measurement file")
+    parser.add_argument("--replay-name", type=str, default="QRNG",
+                        help="Source name for --replay (default: QRNG)")
+    parser.add_argument("--replay-policy", choices=REPLAY_POLICIES, default="error",
+                        help="When a replay partition runs out: error, wrap, or fall back to OS entropy")
+    parser.add_argument("--no-health", action="store_true",
+                        help="Disable online entropy health monitors (RCT/APT/monobit)")
     parser.add_argument("--single-stream", action="store_true",
                         help="Use only the first PRNG stream (faster, less robust)")
     parser.add_argument("--no-multi-turn", action="store_true",
@@ -629,6 +738,9 @@ def main():
     prng_seeds = [int(s.strip()) for s in args.prng_seeds.split(",")]
     if args.single_stream:
         prng_seeds = prng_seeds[:1]
+    replay = ({"path": Path(args.replay), "name": args.replay_name, "policy": args.replay_policy}
+              if args.replay else None)
+    n_sources = 4 if replay else 3
 
     models_to_test = []
 
@@ -647,20 +759,24 @@ def main():
         return
 
     print(f"Models to test: {models_to_test}")
-    print(f"PRNG streams: {prng_seeds}")
+    print(f"PRNG streams: {prng_seeds} ({args.prng_engine})")
     print(f"Temperature: {args.temperature}")
     print(f"Samples per condition: {args.samples}")
-    multi_turn_gens = 0 if args.no_multi_turn else len(MULTI_TURN_CONVERSATIONS) * 3 * 3 * args.samples
-    total_gens = (len(SINGLE_TURN_PROMPTS) * 3 * args.samples + multi_turn_gens) * len(prng_seeds)
+    multi_turn_gens = 0 if args.no_multi_turn else len(MULTI_TURN_CONVERSATIONS) * n_sources * 3 * args.samples
+    total_gens = (len(SINGLE_TURN_PROMPTS) * n_sources * args.samples + multi_turn_gens) * len(prng_seeds)
     print(f"Total generations per model: {total_gens}")
     if args.no_multi_turn:
         print("Multi-turn conversations: SKIPPED (--no-multi-turn)")
 
     for model in models_to_test:
         try:
+            ledger = SeedLedger()
             results = run_full_experiment(model, args.samples, args.temperature, prng_seeds,
-                                         skip_multi_turn=args.no_multi_turn)
-            filepath = save_results(results, model)
+                                         skip_multi_turn=args.no_multi_turn,
+                                         prng_engine=args.prng_engine, prng_root=args.prng_root,
+                                         ledger=ledger, replay=replay,
+                                         health=not args.no_health)
+            filepath = save_results(results, model, ledger)
         except Exception as e:
             print(f"Error with {model}: {e}")
             import traceback
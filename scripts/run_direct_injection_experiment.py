@@ -13,18 +13,33 @@ Three injection modes:
 This tests whether entropy source quality matters when it actually
 touches the generation process, not just the RNG seed.
 
+Generation runs either through the hand-written decode loop
+(--generation legacy) or through model.generate() with each injection
+mode wrapped as a LogitsProcessor (--generation hf), which adds KV caching
+and batched sampling; --parity-check compares the two paths.
+
 Requires: pip install transformers torch
 
 Usage:
     python run_direct_injection_experiment.py --model distilgpt2 --samples 10
     python run_direct_injection_experiment.py --model gpt2 --samples 10
     python run_direct_injection_experiment.py --model gpt2-medium --samples 10
+    python run_direct_injection_experiment.py --model gpt2 --samples 10 --trace
+    python run_direct_injection_experiment.py --model gpt2 --samples 10 --generation hf --batch-size 10
+    python run_direct_injection_experiment.py --model distilgpt2 --parity-check
+    python run_direct_injection_experiment.py --model gpt2 --cpu-backend int8 --threads 8
+    python run_direct_injection_experiment.py --benchmark-backends --threads 8
+    python run_direct_injection_experiment.py --model gpt2 --workers 8 --threads-per-worker 2
+    python run_direct_injection_experiment.py --model gpt2 --replay qrng_cache.hex
+    python run_direct_injection_experiment.py --verify-determinism results/direct_injection/injection_gpt2_X.json
+    python run_direct_injection_experiment.py --benchmark-hmix
 """
 
 import sys
 sys.stdout.reconfigure(line_buffering=True)
 
 import argparse
+import base64
 import hashlib
 import json
 import os
@@ -39,6 +54,11 @@ from pathlib import Path
 
 import numpy as np
 import torch
+from transformers import (LogitsProcessor, LogitsProcessorList,
+                          TopKLogitsWarper, TopPLogitsWarper)
+
+from entropy_health import HealthMonitor, MonitoredSource
+from entropy_sources import REPLAY_POLICIES, ReplaySource, os_pool, replay_file
 
 OUTPUT_DIR = Path(__file__).parent.parent / "results" / "direct_injection"
 
@@ -79,14 +99,23 @@ class PRNGSource:
         return self.rng.random()
 
 class TRNGSource:
+    """OS entropy served from the shared block-buffered OSEntropyPool."""
     def __init__(self):
         self.name = "TRNG"
     def get_bytes(self, n: int) -> bytes:
-        return secrets.token_bytes(n)
+        return os_pool().get_bytes(n)
     def get_float(self) -> float:
-        return int.from_bytes(secrets.token_bytes(4), 'big') / (2**32)
+        return os_pool().get_float()
 
 class HMIXSource:
+    """SHA256(timestamp + secrets + counter), expanded with SHAKE-256.
+
+    Requests up to 32 bytes return a prefix of the SHA256 digest, exactly
+    as in v2. Larger requests (the full-vocabulary noise vector) use that
+    digest as the key of a SHAKE-256 XOF and squeeze n bytes from it, so
+    the stream never repeats within a call and costs one hash round per
+    call rather than per 32 bytes.
+    """
     def __init__(self):
         self.name = "HMIX"
         self._counter = 0
@@ -94,12 +123,46 @@ class HMIXSource:
         self._counter += 1
         data = f"{time.time_ns()}-{secrets.token_hex(16)}-{self._counter}"
         h = hashlib.sha256(data.encode()).digest()
-        result = h[:n] if n <= 32 else h * (n // 32 + 1)
-        return result[:n]
+        if n <= 32:
+            return h[:n]
+        return hashlib.shake_256(h).digest(n)
     def get_float(self) -> float:
         return int.from_bytes(self.get_bytes(4), 'big') / (2**32)
 
 
+def benchmark_hmix(sizes=(32, 4 * 50257, 1 << 20, 16 << 20),
+                   min_seconds: float = 0.5) -> dict:
+    """Measure HMIXSource.get_bytes throughput and block uniqueness.
+
+    The default sizes cover a single digest, the GPT-2 logit noise vector
+    (4 bytes per vocab entry) and multi-megabyte requests. Uniqueness is
+    the fraction of distinct 32-byte blocks in one call, which was ~0 for
+    the old tiled-digest expansion.
+    """
+    source = HMIXSource()
+    results = {}
+    for size in sizes:
+        calls = 0
+        t0 = time.perf_counter()
+        while True:
+            source.get_bytes(size)
+            calls += 1
+            elapsed = time.perf_counter() - t0
+            if elapsed >= min_seconds:
+                break
+        sample = source.get_bytes(size)
+        blocks = [sample[i:i + 32] for i in range(0, size - size % 32, 32)]
+        results[str(size)] = {
+            "calls": calls,
+            "seconds": round(elapsed, 4),
+            "calls_per_sec": round(calls / elapsed, 1),
+            "mb_per_sec": round(calls * size / elapsed / 1e6, 2),
+            "us_per_call": round(elapsed / calls * 1e6, 2),
+            "unique_32b_blocks": round(len(set(blocks)) / len(blocks), 6) if blocks else 1.0,
+        }
+    return results
+
+
 # ─────────────────────────────────────────────────────────────────────
 # Injection modes
 # ─────────────────────────────────────────────────────────────────────
@@ -202,89 +265,765 @@ def calculate_metrics(text):
 # Generation with direct injection
 # ─────────────────────────────────────────────────────────────────────
 
+TOP_K = 50
+TOP_P = 0.9
+
+
+def sample_full_vocab(next_logits: torch.Tensor, top_k: int = TOP_K,
+                      top_p: float = TOP_P) -> torch.Tensor:
+    """Reference sampler: top-k/top-p masking over the full vocabulary.
+
+    Sorts, cumsums and softmaxes all vocab entries every step. Kept for
+    comparison with sample_top_k_first; modifies next_logits in place.
+    """
+    # Top-k filtering
+    if top_k > 0:
+        indices_to_remove = next_logits < torch.topk(next_logits, top_k)[0][..., -1, None]
+        next_logits[indices_to_remove] = -float('inf')
+
+    # Top-p (nucleus) filtering
+    sorted_logits, sorted_indices = torch.sort(next_logits, descending=True)
+    cumulative_probs = torch.cumsum(torch.softmax(sorted_logits, dim=-1), dim=-1)
+    sorted_indices_to_remove = cumulative_probs > top_p
+    sorted_indices_to_remove[..., 1:] = sorted_indices_to_remove[..., :-1].clone()
+    sorted_indices_to_remove[..., 0] = 0
+    indices_to_remove = sorted_indices_to_remove.scatter(
+        1, sorted_indices, sorted_indices_to_remove)
+    next_logits[indices_to_remove] = -float('inf')
+
+    # Sample
+    probs = torch.softmax(next_logits, dim=-1)
+    return torch.multinomial(probs, num_samples=1)
+
+
+def sample_top_k_first(next_logits: torch.Tensor, top_k: int = TOP_K,
+                       top_p: float = TOP_P, match_rng: bool = True) -> torch.Tensor:
+    """Top-k/top-p sampling that only touches the top-k slice.
+
+    torch.topk already returns the k largest logits in descending order,
+    so nucleus filtering, softmax and sampling run on k entries instead of
+    the whole vocabulary, and the choice is mapped back to vocab IDs.
+
+    For a single sample torch.multinomial draws q ~ Exp(1) for every
+    vocab entry and returns argmax(p / q). With match_rng=True the same
+    full-vocab exponential draw is made and gathered at the top-k IDs, so
+    token choices are identical to sample_full_vocab for the same RNG
+    state. match_rng=False draws only k exponentials: the sampling
+    distribution is unchanged but the torch RNG stream advances
+    differently, so sequences diverge from the reference sampler.
+
+    Ties at the k-th logit keep exactly k candidates here, whereas the
+    reference mask keeps every tied entry.
+    """
+    k = min(top_k, next_logits.shape[-1]) if top_k > 0 else next_logits.shape[-1]
+    top_logits, top_indices = torch.topk(next_logits, k)
+    probs = torch.softmax(top_logits, dim=-1)
+    to_remove = torch.cumsum(probs, dim=-1) > top_p
+    to_remove[..., 1:] = to_remove[..., :-1].clone()
+    to_remove[..., 0] = False
+    probs = probs.masked_fill(to_remove, 0.0)
+
+    if match_rng:
+        q = torch.empty_like(next_logits).exponential_(1).gather(-1, top_indices)
+    else:
+        q = torch.empty_like(probs).exponential_(1)
+    choice = torch.argmax(probs / q, dim=-1, keepdim=True)
+    return top_indices.gather(-1, choice)
+
+
+SAMPLERS = {
+    "full": sample_full_vocab,
+    "topk": sample_top_k_first,
+    "topk_local": lambda logits: sample_top_k_first(logits, match_rng=False),
+}
+
+
+def token_hash(token_ids) -> str:
+    """Short SHA-256 fingerprint of a token-ID sequence."""
+    return hashlib.sha256(np.asarray(token_ids, dtype="<i4").tobytes()).hexdigest()[:16]
+
+
+def pack_token_ids(token_ids) -> str:
+    """Token IDs as base64 little-endian int32 (about 5.3 characters per token)."""
+    return base64.b64encode(np.asarray(token_ids, dtype="<i4").tobytes()).decode("ascii")
+
+
+def unpack_token_ids(packed: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(packed), dtype="<i4").astype(np.int64)
+
+
+def _compare_to_reference(reference: dict, step: int, logp: torch.Tensor,
+                          token: int) -> bool:
+    """Check one sampled token against a recorded trace; True on divergence."""
+    ref_ids = reference["token_ids"]
+    if step >= len(ref_ids):
+        reference["divergence"] = {"step": step, "reason": "reference ended"}
+        return True
+    ref_token = int(ref_ids[step])
+    if reference.get("logprobs") is not None:
+        drift = abs(float(logp[ref_token]) - float(reference["logprobs"][step]))
+        reference["max_logprob_drift"] = max(reference.get("max_logprob_drift", 0.0), drift)
+    if token != ref_token:
+        reference["divergence"] = {
+            "step": step,
+            "reference_token": ref_token,
+            "token": token,
+            # log-softmax differences equal raw logit differences
+            "logit_delta": round(float(logp[token] - logp[ref_token]), 6),
+        }
+        return True
+    reference["matched_steps"] = step + 1
+    return False
+
+
 def generate_with_injection(model, tokenizer, prompt: str, source,
                              injection_fn, max_new_tokens: int = 150,
-                             base_seed: int = 42) -> str:
-    """Generate text with entropy injection at the logit level."""
+                             base_seed: int = 42, sampler: str = "topk",
+                             timings: list | None = None,
+                             trace: dict | None = None,
+                             trace_distribution: bool = True,
+                             reference: dict | None = None) -> str:
+    """Generate text with entropy injection at the logit level.
+
+    If timings is a list, the wall-clock seconds spent in the sampling
+    stage (after injection) are appended to it, one entry per step.
+
+    If trace is a dict, it is filled with the generated "token_ids" and,
+    unless trace_distribution is False, the chosen token's "logprobs" and
+    the distribution "entropy" (nats), both measured on the injected
+    logits before top-k/top-p truncation.
+
+    If reference is a recorded trace ("token_ids", optionally
+    "logprobs"), every sampled token is checked against it and generation
+    stops at the first mismatch, which is stored in reference["divergence"]
+    together with the logit gap between the two tokens.
+    """
     # Seed torch for reproducibility of the base sampling
     torch.manual_seed(base_seed)
     if torch.cuda.is_available():
         torch.cuda.manual_seed_all(base_seed)
 
+    sample_fn = SAMPLERS[sampler]
     device = next(model.parameters()).device
     input_ids = tokenizer.encode(prompt, return_tensors="pt").to(device)
+    prompt_len = input_ids.shape[-1]
 
-    generated = input_ids.clone()
+    # Preallocated sequence buffer; the model sees generated[:, :cur_len]
+    generated = torch.empty((1, prompt_len + max_new_tokens),
+                            dtype=input_ids.dtype, device=device)
+    generated[:, :prompt_len] = input_ids
+    cur_len = prompt_len
+
+    record = trace is not None and trace_distribution
+    step_logprobs, step_entropy = [], []
 
     with torch.no_grad():
         for step in range(max_new_tokens):
-            outputs = model(generated)
+            outputs = model(generated[:, :cur_len])
             next_logits = outputs.logits[:, -1, :].float()  # float32 for stability
 
             # Apply entropy injection
             next_logits = injection_fn(next_logits[0], source, step).unsqueeze(0)
 
+            if record or reference is not None:
+                logp = torch.log_softmax(next_logits[0], dim=-1)
+            if record:
+                step_entropy.append(-(logp.exp() * logp).sum())
+
             # Top-k + top-p sampling
-            top_k = 50
-            top_p = 0.9
-
-            # Top-k filtering
-            if top_k > 0:
-                indices_to_remove = next_logits < torch.topk(next_logits, top_k)[0][..., -1, None]
-                next_logits[indices_to_remove] = -float('inf')
-
-            # Top-p (nucleus) filtering
-            sorted_logits, sorted_indices = torch.sort(next_logits, descending=True)
-            cumulative_probs = torch.cumsum(torch.softmax(sorted_logits, dim=-1), dim=-1)
-            sorted_indices_to_remove = cumulative_probs > top_p
-            sorted_indices_to_remove[..., 1:] = sorted_indices_to_remove[..., :-1].clone()
-            sorted_indices_to_remove[..., 0] = 0
-            indices_to_remove = sorted_indices_to_remove.scatter(
-                1, sorted_indices, sorted_indices_to_remove)
-            next_logits[indices_to_remove] = -float('inf')
-
-            # Sample
-            probs = torch.softmax(next_logits, dim=-1)
-            next_token = torch.multinomial(probs, num_samples=1)
-
-            generated = torch.cat([generated, next_token], dim=-1)
+            t0 = time.perf_counter()
+            next_token = sample_fn(next_logits)
+            if timings is not None:
+                timings.append(time.perf_counter() - t0)
+
+            if record:
+                step_logprobs.append(logp[next_token[0, 0]])
+            if reference is not None and _compare_to_reference(
+                    reference, step, logp, int(next_token[0, 0])):
+                break
+
+            generated[:, cur_len] = next_token[:, 0]
+            cur_len += 1
 
             # Stop at EOS
             if next_token.item() == tokenizer.eos_token_id:
                 break
 
-    output_ids = generated[0][input_ids.shape[-1]:]
+    output_ids = generated[0, prompt_len:cur_len]
+    if trace is not None:
+        trace["token_ids"] = output_ids.cpu().numpy()
+    if record:
+        trace["logprobs"] = torch.stack(step_logprobs).cpu().numpy() if step_logprobs else np.empty(0)
+        trace["entropy"] = torch.stack(step_entropy).cpu().numpy() if step_entropy else np.empty(0)
     return tokenizer.decode(output_ids, skip_special_tokens=True)
 
 
+class EntropyInjectionProcessor(LogitsProcessor):
+    """LogitsProcessor that applies an INJECTION_MODES function in generate().
+
+    Holds one entropy source per batch row, so a batch of samples keeps
+    the fresh-source-per-sample design of the legacy loop. The step passed
+    to the injection function is the number of tokens generated so far.
+
+    With record_trace=True it also keeps the same per-row trace fields as
+    generate_with_injection: entropy of the injected distribution, and the
+    chosen token's logprob, read back from input_ids on the next call (or
+    by finalize_trace() after generation for the last step).
+    """
+    def __init__(self, injection_fn, sources: list, prompt_len: int,
+                 record_trace: bool = False):
+        self.injection_fn = injection_fn
+        self.sources = sources
+        self.prompt_len = prompt_len
+        self.record_trace = record_trace
+        self.logprobs = [[] for _ in sources]
+        self.entropy = [[] for _ in sources]
+        self._prev_logp = None
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        step = input_ids.shape[-1] - self.prompt_len
+        scores = scores.float()
+        injected = torch.stack([
+            self.injection_fn(scores[row], source, step)
+            for row, source in enumerate(self.sources)
+        ])
+        if self.record_trace:
+            self._record_chosen(input_ids[:, -1] if step > 0 else None)
+            logp = torch.log_softmax(injected, dim=-1)
+            for row, h in enumerate((-(logp.exp() * logp).sum(dim=-1)).tolist()):
+                self.entropy[row].append(h)
+            self._prev_logp = logp
+        return injected
+
+    def _record_chosen(self, chosen: torch.LongTensor | None):
+        if chosen is None or self._prev_logp is None:
+            return
+        picked = self._prev_logp.gather(-1, chosen[:, None])[:, 0]
+        for row, lp in enumerate(picked.tolist()):
+            self.logprobs[row].append(lp)
+
+    def finalize_trace(self, sequences: torch.LongTensor):
+        """Record the chosen-token logprob of the final generation step."""
+        if self.record_trace:
+            self._record_chosen(sequences[:, -1])
+            self._prev_logp = None
+
+
+def generate_batch_with_processor(model, tokenizer, prompt: str, sources: list,
+                                  injection_fn, max_new_tokens: int = 150,
+                                  base_seed: int = 42,
+                                  traces: list | None = None,
+                                  trace_distribution: bool = True) -> list[str]:
+    """Generate one sample per source through model.generate().
+
+    Injection runs as an EntropyInjectionProcessor ahead of transformers'
+    own top-k/top-p warpers, so the sampling distribution matches
+    generate_with_injection. With a single source the torch RNG is
+    consumed exactly as in the legacy loop; with several, base_seed seeds
+    the whole batch and per-sample seeds no longer apply.
+
+    If traces is a list, one trace dict per source is appended to it
+    (token IDs only when trace_distribution is False).
+    """
+    torch.manual_seed(base_seed)
+    if torch.cuda.is_available():
+        torch.cuda.manual_seed_all(base_seed)
+
+    device = next(model.parameters()).device
+    input_ids = tokenizer.encode(prompt, return_tensors="pt").to(device)
+    input_ids = input_ids.repeat(len(sources), 1)
+    prompt_len = input_ids.shape[-1]
+
+    injector = EntropyInjectionProcessor(injection_fn, sources, prompt_len,
+                                         record_trace=traces is not None and trace_distribution)
+    processors = LogitsProcessorList([
+        injector,
+        TopKLogitsWarper(top_k=TOP_K),
+        TopPLogitsWarper(top_p=TOP_P),
+    ])
+
+    with torch.no_grad():
+        sequences = model.generate(
+            input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            do_sample=True,
+            # Built-in warpers disabled; the ones above run after injection
+            top_k=0, top_p=1.0, temperature=1.0,
+            logits_processor=processors,
+            max_new_tokens=max_new_tokens,
+            eos_token_id=tokenizer.eos_token_id,
+            pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id,
+        )
+    injector.finalize_trace(sequences)
+
+    outputs = []
+    for row in range(len(sources)):
+        output_ids = sequences[row, prompt_len:]
+        eos = (output_ids == tokenizer.eos_token_id).nonzero()
+        if len(eos) > 0:
+            output_ids = output_ids[:int(eos[0, 0]) + 1]
+        n = len(output_ids)
+        if traces is not None:
+            traces.append({"token_ids": output_ids.cpu().numpy()})
+            if injector.record_trace:
+                traces[-1]["logprobs"] = np.array(injector.logprobs[row][:n])
+                traces[-1]["entropy"] = np.array(injector.entropy[row][:n])
+        outputs.append(tokenizer.decode(output_ids, skip_special_tokens=True))
+    return outputs
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Token traces
+# ─────────────────────────────────────────────────────────────────────
+
+TRACE_ARRAYS = {
+    "token_ids": np.int32,
+    "logprobs": np.float32,
+    "entropy": np.float32,
+}
+
+
+class TokenTraceWriter:
+    """Collects per-sample token traces into flat, memory-mappable arrays.
+
+    Every sample's steps are appended to one concatenated array per field
+    (see TRACE_ARRAYS); add() returns the {"offset", "length"} slice that
+    the result JSON stores next to the sample. write() saves one .npy per
+    field, so load_token_trace() can open them with mmap_mode="r".
+    """
+    def __init__(self):
+        self._chunks = {name: [] for name in TRACE_ARRAYS}
+        self.n_tokens = 0
+        self.n_samples = 0
+
+    def add(self, trace: dict) -> dict:
+        length = len(trace["token_ids"])
+        for name, dtype in TRACE_ARRAYS.items():
+            self._chunks[name].append(np.asarray(trace[name], dtype=dtype))
+        ref = {"offset": self.n_tokens, "length": length}
+        self.n_tokens += length
+        self.n_samples += 1
+        return ref
+
+    def extend(self, other: "TokenTraceWriter") -> int:
+        """Append another writer's traces; returns the offset shift to apply
+        to that writer's {"offset", "length"} references."""
+        shift = self.n_tokens
+        for name in TRACE_ARRAYS:
+            self._chunks[name].extend(other._chunks[name])
+        self.n_tokens += other.n_tokens
+        self.n_samples += other.n_samples
+        return shift
+
+    def write(self, directory: Path) -> dict:
+        directory.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for name, dtype in TRACE_ARRAYS.items():
+            chunks = self._chunks[name]
+            arr = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+            np.save(directory / f"{name}.npy", arr)
+            files[name] = f"{name}.npy"
+        return {
+            "directory": directory.name,
+            "files": files,
+            "n_tokens": self.n_tokens,
+            "n_samples": self.n_samples,
+            "measured_on": "injected logits before top-k/top-p truncation",
+        }
+
+
+def load_token_trace(directory: Path) -> dict:
+    """Memory-map the arrays written by TokenTraceWriter.write()."""
+    return {name: np.load(Path(directory) / f"{name}.npy", mmap_mode="r")
+            for name in TRACE_ARRAYS}
+
+
 # ─────────────────────────────────────────────────────────────────────
 # Experiment runner
 # ─────────────────────────────────────────────────────────────────────
 
-def run_experiment(model_name: str, num_samples: int, max_tokens: int):
+CPU_BACKENDS = ["eager", "bf16", "int8", "compile"]
+
+
+def configure_threads(intra_op: int | None = None, inter_op: int | None = None):
+    """Set torch intra-op/inter-op thread counts (call before any inference)."""
+    if inter_op:
+        torch.set_num_interop_threads(inter_op)
+    if intra_op:
+        torch.set_num_threads(intra_op)
+
+
+def _conv1d_to_linear(model):
+    """Replace GPT-2 style Conv1D projections with equivalent nn.Linear.
+
+    GPT-2 family models implement attention/MLP projections as
+    transformers' Conv1D (weight stored as in x out), which dynamic
+    quantization does not recognise.
+    """
+    from transformers.pytorch_utils import Conv1D
+
+    for name, module in list(model.named_modules()):
+        for child_name, child in list(module.named_children()):
+            if isinstance(child, Conv1D):
+                n_in, n_out = child.weight.shape
+                linear = torch.nn.Linear(n_in, n_out)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(module, child_name, linear)
+    return model
+
+
+def apply_cpu_backend(model, backend: str):
+    """Apply a CPU_BACKENDS acceleration mode to a loaded float32 model.
+
+    bf16 runs every forward under bfloat16 autocast, int8 dynamically
+    quantizes all linear layers (Conv1D included), and compile wraps the
+    forward in torch.compile with dynamic shapes, since the legacy loop
+    grows the sequence every step.
+    """
+    if backend == "bf16":
+        model.forward = torch.autocast("cpu", dtype=torch.bfloat16)(model.forward)
+    elif backend == "int8":
+        from torch.ao.quantization import quantize_dynamic
+        model = quantize_dynamic(_conv1d_to_linear(model), {torch.nn.Linear},
+                                 dtype=torch.qint8)
+    elif backend == "compile":
+        model.forward = torch.compile(model.forward, dynamic=True)
+    return model
+
+
+def load_model(model_name: str, cpu_backend: str = "eager", device: str | None = None):
+    """Load tokenizer and model on device (default: the best available one).
+
+    cpu_backend only applies when running on CPU; on MPS/CUDA the model
+    stays in eager float32 and the returned backend is "eager". The
+    parameter count is taken before the backend is applied: int8 packs
+    the linear weights into quantized modules with no nn.Parameters.
+    Returns (model, tokenizer, device, backend, n_parameters).
+    """
     from transformers import AutoModelForCausalLM, AutoTokenizer
 
+    if device is None:
+        device = "mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu"
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name, dtype=torch.float32
+    ).to(device)
+    model.eval()
+    n_parameters = sum(p.numel() for p in model.parameters())
+
+    if device == "cpu":
+        model = apply_cpu_backend(model, cpu_backend)
+    elif cpu_backend != "eager":
+        print(f"  Note: --cpu-backend {cpu_backend} ignored on {device}")
+        cpu_backend = "eager"
+
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    return model, tokenizer, device, cpu_backend, n_parameters
+
+
+def backend_metadata(backend: str) -> dict:
+    return {
+        "backend": backend,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+        "torch_version": torch.__version__,
+    }
+
+
+def benchmark_backends(model_names: list[str], backends: list[str],
+                       generation: str = "legacy", max_tokens: int = 64,
+                       repeats: int = 3) -> dict:
+    """Tokens/sec per model x CPU backend on a fixed baseline generation.
+
+    One warm-up generation per configuration is excluded from timing so
+    torch.compile's tracing cost is reported separately as warmup_s.
+    """
+    prompt = PROMPTS[0]["text"]
+    report = {"generation": generation, "max_tokens": max_tokens,
+              "repeats": repeats, "results": []}
+    for model_name in model_names:
+        for backend in backends:
+            t0 = time.perf_counter()
+            model, tokenizer, device, used, _ = load_model(model_name, backend)
+            load_s = time.perf_counter() - t0
+
+            def run_once(seed):
+                trace = {}
+                if generation == "hf":
+                    traces = []
+                    generate_batch_with_processor(model, tokenizer, prompt, [PRNGSource(seed)],
+                                                  inject_baseline, max_tokens, seed, traces=traces)
+                    trace = traces[0]
+                else:
+                    generate_with_injection(model, tokenizer, prompt, PRNGSource(seed),
+                                            inject_baseline, max_tokens, seed, trace=trace)
+                return len(trace["token_ids"])
+
+            t0 = time.perf_counter()
+            run_once(0)
+            warmup_s = time.perf_counter() - t0
+
+            tokens, t0 = 0, time.perf_counter()
+            for r in range(repeats):
+                tokens += run_once(42 + r)
+            elapsed = time.perf_counter() - t0
+            entry = {
+                "model": model_name,
+                "device": device,
+                **backend_metadata(used),
+                "load_s": round(load_s, 3),
+                "warmup_s": round(warmup_s, 3),
+                "tokens": tokens,
+                "seconds": round(elapsed, 3),
+                "tokens_per_sec": round(tokens / elapsed, 2) if elapsed > 0 else None,
+            }
+            report["results"].append(entry)
+            print(f"  {model_name:<14} {used:<8} {entry['tokens_per_sec']:>8} tok/s "
+                  f"(warmup {entry['warmup_s']}s, load {entry['load_s']}s)")
+            del model
+    return report
+
+
+# Replay source settings ({"path", "name", "policy", "partitions"}), set
+# by configure_replay before any condition runs; forked workers inherit it.
+REPLAY = {}
+
+
+def configure_replay(path: Path, name: str = "QRNG", policy: str = "error",
+                     partitions: int = 1):
+    REPLAY.clear()
+    REPLAY.update(path=Path(path), name=name, policy=policy, partitions=partitions)
+    # convert / hash the dump once here rather than in the first samples
+    replay_file(REPLAY["path"])
+
+
+# Online health monitors by source name (entropy_health.py); empty when
+# disabled. Forked workers monitor their own draws and send them back.
+HEALTH = {}
+
+
+def enable_health(source_names: list[str]):
+    HEALTH.clear()
+    HEALTH.update({name: HealthMonitor(name) for name in source_names})
+
+
+# Seeded sources are monitored in this mode only: baseline draws nothing,
+# and logit_perturb reads the most of each sample's stream.
+SEEDED_MONITOR_MODE = "logit_perturb"
+
+
+def monitor_draws(prompt_idx: int, mode_name: str, source_name: str) -> bool:
+    """Whether this condition's draws feed the source's health monitor.
+
+    Seeded sources (PRNG, replay) give sample i the same stream in every
+    prompt and mode, so they are only monitored in one condition (first
+    prompt, SEEDED_MONITOR_MODE); counting the repeats would inflate
+    seed_repeats and the histogram tests.
+    """
+    seeded = {"PRNG", REPLAY.get("name")}
+    once = prompt_idx == 0 and mode_name == SEEDED_MONITOR_MODE
+    return source_name in HEALTH and (once or source_name not in seeded)
+
+
+def make_source(source_name: str, sample_idx: int, monitored: bool = True):
+    """Fresh entropy source for one sample (PRNG is seeded per sample).
+
+    A replay source reads partition sample_idx of the recorded dump, so
+    like PRNG the same sample index sees the same bytes in every prompt
+    and mode, whichever worker runs it. Sources with an enabled health
+    monitor are wrapped so every draw is checked.
+    """
+    if source_name == "PRNG":
+        source = PRNGSource(seed=42 + sample_idx)
+    elif source_name == REPLAY.get("name"):
+        source = ReplaySource.partition(REPLAY["path"], sample_idx, REPLAY["partitions"],
+                                        policy=REPLAY["policy"], name=source_name)
+    else:
+        source = {"TRNG": TRNGSource, "HMIX": HMIXSource}[source_name]()
+    if monitored and source_name in HEALTH:
+        return MonitoredSource(source, HEALTH[source_name])
+    return source
+
+
+def run_condition(model, tokenizer, prompt_text: str, mode_name: str, source_name: str,
+                  num_samples: int, max_tokens: int, sampler: str = "topk",
+                  generation: str = "legacy", batch_size: int = 1,
+                  trace_writer: TokenTraceWriter | None = None,
+                  monitored: bool = False) -> dict:
+    """Generate and score all samples of one (prompt, mode, source) cell."""
+    key = f"{mode_name}__{source_name}"
+    injection_fn = INJECTION_MODES[mode_name]
+    samples = []
+
+    for start in range(0, num_samples, batch_size):
+        batch = range(start, min(start + batch_size, num_samples))
+        # Fresh source each sample
+        sources = [make_source(source_name, i, monitored) for i in batch]
+        traces = []
+        record = trace_writer is not None
+
+        try:
+            t0 = time.time()
+            step_times = []
+            if generation == "hf":
+                outputs = generate_batch_with_processor(
+                    model, tokenizer, prompt_text, sources,
+                    injection_fn, max_new_tokens=max_tokens,
+                    base_seed=42 + start, traces=traces, trace_distribution=record,
+                )
+            else:
+                trace = {}
+                outputs = [generate_with_injection(
+                    model, tokenizer, prompt_text, sources[0],
+                    injection_fn, max_new_tokens=max_tokens,
+                    base_seed=42 + start, sampler=sampler, timings=step_times,
+                    trace=trace, trace_distribution=record,
+                )]
+                traces.append(trace)
+            elapsed = (time.time() - t0) / len(batch)
+            sampling_ms = np.array(step_times) * 1e3
+
+            for j, (i, output) in enumerate(zip(batch, outputs)):
+                metrics = calculate_metrics(output)
+                src = sources[j]
+                samples.append({
+                    "output": output[:500],  # truncate for storage
+                    "metrics": metrics,
+                    **({"generator": src.describe()} if hasattr(src, "describe") else {}),
+                    "token_sha256": token_hash(traces[j]["token_ids"]),
+                    "token_ids": pack_token_ids(traces[j]["token_ids"]),
+                    "generation_time": round(elapsed, 3),
+                    "sampling_ms_per_step": {
+                        "mean": round(float(sampling_ms.mean()), 4),
+                        "p95": round(float(np.percentile(sampling_ms, 95)), 4),
+                        "steps": len(step_times),
+                    } if step_times else None,
+                })
+                if record:
+                    samples[-1]["trace"] = trace_writer.add(traces[j])
+                print(f"      {key}[{i+1}]: {metrics.get('length_words', 0)} words, "
+                      f"{elapsed:.1f}s"
+                      + (f", sampling {sampling_ms.mean():.3f}ms/step" if step_times else ""))
+        except Exception as e:
+            for i, src in zip(batch, sources):
+                samples.append({"error": str(e)[:200],
+                                **({"generator": src.describe()} if hasattr(src, "describe") else {})})
+                print(f"      {key}[{i+1}]: ERROR {str(e)[:80]}")
+
+    valid = [s for s in samples if "metrics" in s and s["metrics"]]
+    if valid:
+        agg = {}
+        for mkey in valid[0]["metrics"]:
+            vals = [s["metrics"][mkey] for s in valid if s["metrics"].get(mkey) is not None]
+            if vals:
+                agg[f"{mkey}_mean"] = round(sum(vals) / len(vals), 6)
+        return {"samples": samples, "aggregate": agg, "n_valid": len(valid)}
+    return {"samples": samples, "aggregate": None, "n_valid": 0}
+
+
+# Set in the parent before forking; workers read the model through
+# copy-on-write pages instead of loading their own copy.
+_WORKER_STATE = {}
+
+
+def _worker_init(threads: int):
+    torch.set_num_threads(threads)
+
+
+def _worker_run_condition(task: tuple) -> tuple:
+    prompt_idx, mode_name, source_name = task
+    st = _WORKER_STATE
+    writer = TokenTraceWriter() if st["trace"] else None
+    if HEALTH:
+        enable_health(list(HEALTH))
+    condition = run_condition(
+        st["model"], st["tokenizer"], PROMPTS[prompt_idx]["text"], mode_name, source_name,
+        st["num_samples"], st["max_tokens"], sampler=st["sampler"],
+        generation=st["generation"], batch_size=st["batch_size"], trace_writer=writer,
+        monitored=monitor_draws(prompt_idx, mode_name, source_name))
+    return prompt_idx, f"{mode_name}__{source_name}", condition, writer, HEALTH.get(source_name)
+
+
+def run_conditions_parallel(model, tokenizer, tasks: list[tuple], workers: int,
+                            threads_per_worker: int, trace_writer: TokenTraceWriter | None,
+                            **condition_kwargs) -> dict:
+    """Run (prompt_idx, mode, source) tasks on a pool of forked workers.
+
+    The model is loaded once in the parent and inherited by fork, so the
+    weights are shared copy-on-write rather than duplicated per worker.
+    This only works on CPU: a CUDA or MPS context does not survive fork.
+    The parent must not have run inference before forking: OpenMP thread
+    pools do not survive fork. Worker traces are appended to trace_writer
+    and their sample offsets rebased; worker health monitors are merged
+    into the parent's.
+    """
+    import multiprocessing as mp
+
+    device = next(model.parameters(), torch.empty(0)).device.type
+    if device != "cpu":
+        raise RuntimeError(f"forked workers need the model on CPU, not {device}")
+    _WORKER_STATE.update(model=model, tokenizer=tokenizer,
+                         trace=trace_writer is not None, **condition_kwargs)
+    done = {}
+    ctx = mp.get_context("fork")
+    with ctx.Pool(processes=workers, initializer=_worker_init,
+                  initargs=(threads_per_worker,)) as pool:
+        for prompt_idx, key, condition, writer, monitor in pool.imap_unordered(
+                _worker_run_condition, tasks):
+            if monitor is not None:
+                HEALTH[monitor.name].merge(monitor)
+            if writer is not None:
+                shift = trace_writer.extend(writer)
+                for sample in condition["samples"]:
+                    if "trace" in sample:
+                        sample["trace"]["offset"] += shift
+            done[(prompt_idx, key)] = condition
+            print(f"    done [{prompt_idx+1}] {key} ({len(done)}/{len(tasks)})")
+    _WORKER_STATE.clear()
+    return done
+
+
+def run_experiment(model_name: str, num_samples: int, max_tokens: int,
+                   sampler: str = "topk", trace_writer: TokenTraceWriter | None = None,
+                   generation: str = "legacy", batch_size: int = 1,
+                   cpu_backend: str = "eager", workers: int = 1,
+                   threads_per_worker: int | None = None, replay: dict | None = None,
+                   health: bool = True):
+    source_names = ["PRNG", "TRNG", "HMIX"]
+    if replay:
+        configure_replay(replay["path"], replay["name"], replay["policy"], num_samples)
+        source_names.append(replay["name"])
+    if health:
+        enable_health(source_names)
+
     print(f"\n{'='*70}")
     print(f" DIRECT INJECTION EXPERIMENT: {model_name}")
     print(f" Samples per condition: {num_samples}")
     print(f" Max tokens: {max_tokens}")
     print(f" Injection modes: {list(INJECTION_MODES.keys())}")
+    if generation == "hf":
+        print(f" Generation: model.generate (batch size {batch_size})")
+    else:
+        print(f" Generation: legacy loop, sampler {sampler}")
+    if workers > 1:
+        threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        print(f" Workers: {workers} x {threads_per_worker} threads")
     print(f"{'='*70}")
 
+    if generation != "hf":
+        batch_size = 1
+
     # Load model
     print(f"\nLoading {model_name}...")
-    device = "mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForCausalLM.from_pretrained(
-        model_name, dtype=torch.float32
-    ).to(device)
-    model.eval()
-
-    if tokenizer.pad_token is None:
-        tokenizer.pad_token = tokenizer.eos_token
+    # forked workers cannot inherit a CUDA/MPS context
+    model, tokenizer, device, cpu_backend, n_parameters = load_model(
+        model_name, cpu_backend, device="cpu" if workers > 1 else None)
 
-    print(f"  Device: {device}")
-    print(f"  Parameters: {sum(p.numel() for p in model.parameters()) / 1e6:.1f}M")
+    print(f"  Device: {device} (backend {cpu_backend}, {torch.get_num_threads()} threads)")
+    print(f"  Parameters: {n_parameters / 1e6:.1f}M")
 
     # Randomization
     order_rng = random.Random(12345)
@@ -292,24 +1031,48 @@ def run_experiment(model_name: str, num_samples: int, max_tokens: int):
     results = {
         "model": model_name,
         "device": device,
-        "parameters_m": round(sum(p.numel() for p in model.parameters()) / 1e6, 1),
+        "cpu_backend": backend_metadata(cpu_backend),
+        "parameters_m": round(n_parameters / 1e6, 1),
         "experiment_type": "direct_entropy_injection",
         "timestamp": datetime.now().isoformat(),
         "num_samples": num_samples,
         "max_tokens": max_tokens,
         "injection_modes": list(INJECTION_MODES.keys()),
-        "sources": ["PRNG", "TRNG", "HMIX"],
+        "generation": generation,
+        "sampler": sampler if generation == "legacy" else "hf_warpers",
+        "batch_size": batch_size,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker if workers > 1 else None,
+        "sources": source_names,
+        **({"replay": {"file": str(REPLAY["path"]), "name": REPLAY["name"],
+                       "policy": REPLAY["policy"], "partitions": num_samples}}
+           if replay else {}),
         "prompts": [],
     }
 
-    source_classes = {"PRNG": PRNGSource, "TRNG": TRNGSource, "HMIX": HMIXSource}
-    source_names = list(source_classes.keys())
     mode_names = list(INJECTION_MODES.keys())
+    condition_kwargs = dict(num_samples=num_samples, max_tokens=max_tokens, sampler=sampler,
+                            generation=generation, batch_size=batch_size)
+
+    # Shuffle order of conditions per prompt (same draws in both modes)
+    prompt_conditions = []
+    for prompt_idx in range(len(PROMPTS)):
+        conditions = [(mode, src) for mode in mode_names for src in source_names]
+        order_rng.shuffle(conditions)
+        prompt_conditions.append(conditions)
+
+    if workers > 1:
+        tasks = [(prompt_idx, mode, src)
+                 for prompt_idx, conditions in enumerate(prompt_conditions)
+                 for mode, src in conditions]
+        done = run_conditions_parallel(model, tokenizer, tasks, workers, threads_per_worker,
+                                       trace_writer, **condition_kwargs)
 
     for prompt_idx, prompt_info in enumerate(PROMPTS):
         prompt_text = prompt_info["text"]
         domain = prompt_info["domain"]
-        print(f"\n  [{prompt_idx+1}/{len(PROMPTS)}] [{domain}] {prompt_text[:50]}...")
+        if workers <= 1:
+            print(f"\n  [{prompt_idx+1}/{len(PROMPTS)}] [{domain}] {prompt_text[:50]}...")
 
         prompt_result = {
             "prompt": prompt_text,
@@ -317,60 +1080,180 @@ def run_experiment(model_name: str, num_samples: int, max_tokens: int):
             "conditions": {},
         }
 
-        # Shuffle order of conditions
-        conditions = [(mode, src) for mode in mode_names for src in source_names]
-        order_rng.shuffle(conditions)
-
-        for mode_name, source_name in conditions:
+        for mode_name, source_name in prompt_conditions[prompt_idx]:
             key = f"{mode_name}__{source_name}"
-            injection_fn = INJECTION_MODES[mode_name]
-            samples = []
-
-            for i in range(num_samples):
-                # Fresh source each sample
-                source = source_classes[source_name]() if source_name != "PRNG" else PRNGSource(seed=42 + i)
-
-                try:
-                    t0 = time.time()
-                    output = generate_with_injection(
-                        model, tokenizer, prompt_text, source,
-                        injection_fn, max_new_tokens=max_tokens,
-                        base_seed=42 + i,
-                    )
-                    elapsed = time.time() - t0
-
-                    metrics = calculate_metrics(output)
-                    samples.append({
-                        "output": output[:500],  # truncate for storage
-                        "metrics": metrics,
-                        "generation_time": round(elapsed, 3),
-                    })
-                    print(f"      {key}[{i+1}]: {metrics.get('length_words', 0)} words, "
-                          f"{elapsed:.1f}s")
-                except Exception as e:
-                    samples.append({"error": str(e)[:200]})
-                    print(f"      {key}[{i+1}]: ERROR {str(e)[:80]}")
-
-            valid = [s for s in samples if "metrics" in s and s["metrics"]]
-            if valid:
-                agg = {}
-                for mkey in valid[0]["metrics"]:
-                    vals = [s["metrics"][mkey] for s in valid if s["metrics"].get(mkey) is not None]
-                    if vals:
-                        agg[f"{mkey}_mean"] = round(sum(vals) / len(vals), 6)
-                prompt_result["conditions"][key] = {
-                    "samples": samples,
-                    "aggregate": agg,
-                    "n_valid": len(valid),
-                }
+            if workers > 1:
+                prompt_result["conditions"][key] = done[(prompt_idx, key)]
             else:
-                prompt_result["conditions"][key] = {"samples": samples, "aggregate": None, "n_valid": 0}
+                prompt_result["conditions"][key] = run_condition(
+                    model, tokenizer, prompt_text, mode_name, source_name,
+                    trace_writer=trace_writer,
+                    monitored=monitor_draws(prompt_idx, mode_name, source_name),
+                    **condition_kwargs)
 
         results["prompts"].append(prompt_result)
 
+    if HEALTH:
+        results["source_health"] = {name: m.report() for name, m in HEALTH.items()}
+        alarms = sum(m.n_alarms for m in HEALTH.values())
+        print(f"\n  Entropy health: {alarms} alarms over "
+              f"{sum(m.n_bytes for m in HEALTH.values()):,d} bytes")
+        HEALTH.clear()
     return results
 
 
+def check_generation_parity(model_name: str, n_prompts: int = 3, n_samples: int = 2,
+                            max_tokens: int = 50) -> dict:
+    """Compare token IDs from the legacy loop and the generate() path.
+
+    Only reproducible conditions are compared (PRNG source, every mode),
+    with batch size 1 so both paths consume the torch RNG identically.
+    Divergence can still come from KV-cache numerics flipping a
+    near-tied sampling decision; the first divergent step is reported.
+    """
+    model, tokenizer, device, _, _ = load_model(model_name)
+    cases = []
+    for prompt_info in PROMPTS[:n_prompts]:
+        for mode_name, injection_fn in INJECTION_MODES.items():
+            for i in range(n_samples):
+                legacy_trace, hf_traces = {}, []
+                generate_with_injection(
+                    model, tokenizer, prompt_info["text"], make_source("PRNG", i),
+                    injection_fn, max_new_tokens=max_tokens, base_seed=42 + i,
+                    sampler="full", trace=legacy_trace)
+                generate_batch_with_processor(
+                    model, tokenizer, prompt_info["text"], [make_source("PRNG", i)],
+                    injection_fn, max_new_tokens=max_tokens, base_seed=42 + i,
+                    traces=hf_traces)
+                a = legacy_trace["token_ids"]
+                b = hf_traces[0]["token_ids"]
+                n = min(len(a), len(b))
+                mismatch = np.nonzero(a[:n] != b[:n])[0]
+                first = int(mismatch[0]) if len(mismatch) else (None if len(a) == len(b) else n)
+                cases.append({
+                    "prompt": prompt_info["text"][:50],
+                    "mode": mode_name,
+                    "sample": i,
+                    "identical": first is None,
+                    "first_divergent_step": first,
+                    "tokens_legacy": len(a),
+                    "tokens_hf": len(b),
+                })
+    n_identical = sum(c["identical"] for c in cases)
+    return {
+        "model": model_name,
+        "device": device,
+        "max_tokens": max_tokens,
+        "n_cases": len(cases),
+        "n_identical": n_identical,
+        "cases": cases,
+    }
+
+
+def verify_determinism(result_path: Path, n_samples: int = 10, seed: int = 0,
+                       cpu_backend: str = "eager") -> dict:
+    """Regenerate a random subset of reproducible samples from a result file.
+
+    Reproducible samples are those whose tokens depend only on the torch
+    seed: every baseline condition, every PRNG condition, and replay-source
+    conditions when the recorded dump is still on disk. Tokens are
+    compared step by step against each sample's stored token IDs and
+    generation stops at the first divergence, reporting the step and the
+    logit gap between the regenerated and recorded token; when the run
+    was recorded with --trace, the largest logprob drift seen on the
+    matching prefix is reported too. Files from before token IDs were
+    stored fall back to token_sha256 (or the 500-character output).
+    """
+    with open(result_path) as f:
+        results = json.load(f)
+    if results.get("batch_size", 1) > 1:
+        return {"error": "batched hf runs share one torch seed per batch; "
+                         "per-sample regeneration is not possible"}
+
+    trace_info = results.get("token_trace")
+    recorded = load_token_trace(result_path.parent / trace_info["directory"]) if trace_info else None
+
+    replay = results.get("replay")
+    if replay and Path(replay["file"]).exists():
+        configure_replay(replay["file"], replay["name"], replay["policy"], replay["partitions"])
+    seeded = {"PRNG"} | ({REPLAY["name"]} if REPLAY else set())
+
+    eligible = []
+    for prompt_idx, prompt_data in enumerate(results["prompts"]):
+        for key, cond in prompt_data["conditions"].items():
+            mode_name, source_name = key.split("__")
+            if source_name not in seeded | {"TRNG", "HMIX"}:
+                continue
+            if not (mode_name == "baseline" or source_name in seeded):
+                continue
+            for sample_idx, sample in enumerate(cond["samples"]):
+                if sample.get("metrics"):
+                    eligible.append((prompt_idx, key, sample_idx))
+    picked = random.Random(seed).sample(eligible, min(n_samples, len(eligible)))
+
+    sampler = results.get("sampler", "full")
+    if sampler not in SAMPLERS:
+        sampler = "full"  # hf_warpers: same tokens as the full-vocab loop
+    model, tokenizer, device, cpu_backend, _ = load_model(results["model"], cpu_backend)
+
+    t_start = time.perf_counter()
+    cases = []
+    for prompt_idx, key, sample_idx in picked:
+        prompt_data = results["prompts"][prompt_idx]
+        mode_name, source_name = key.split("__")
+        sample = prompt_data["conditions"][key]["samples"][sample_idx]
+        reference = None
+        if recorded is not None and "trace" in sample:
+            off, length = sample["trace"]["offset"], sample["trace"]["length"]
+            reference = {"token_ids": np.asarray(recorded["token_ids"][off:off + length]),
+                         "logprobs": np.asarray(recorded["logprobs"][off:off + length])}
+        elif "token_ids" in sample:
+            reference = {"token_ids": unpack_token_ids(sample["token_ids"]), "logprobs": None}
+
+        t0 = time.perf_counter()
+        regen = {}
+        output = generate_with_injection(
+            model, tokenizer, prompt_data["prompt"], make_source(source_name, sample_idx),
+            INJECTION_MODES[mode_name], max_new_tokens=results["max_tokens"],
+            base_seed=42 + sample_idx, sampler=sampler,
+            trace=regen, trace_distribution=False, reference=reference)
+
+        case = {"prompt_idx": prompt_idx, "condition": key, "sample": sample_idx,
+                "seconds": round(time.perf_counter() - t0, 3)}
+        if reference is not None:
+            matched = reference.get("matched_steps", 0)
+            if "divergence" not in reference and matched < len(reference["token_ids"]):
+                reference["divergence"] = {"step": matched, "reason": "regeneration ended"}
+            case["status"] = "diverged" if "divergence" in reference else "identical"
+            case["steps_checked"] = matched
+            case["divergence"] = reference.get("divergence")
+            case["max_logprob_drift"] = (round(reference.get("max_logprob_drift", 0.0), 6)
+                                         if reference["logprobs"] is not None else None)
+        elif "token_sha256" in sample:
+            same = token_hash(regen["token_ids"]) == sample["token_sha256"]
+            case["status"] = "identical" if same else "hash_mismatch"
+        else:
+            case["status"] = "identical" if output[:500] == sample["output"] else "text_mismatch"
+        cases.append(case)
+
+    return {
+        "source_file": str(result_path),
+        "reference": {
+            "model": results["model"],
+            "cpu_backend": results.get("cpu_backend", {"backend": "eager"}),
+            "sampler": results.get("sampler", "full"),
+            "traced": recorded is not None,
+        },
+        "current": {"device": device, "sampler": sampler, **backend_metadata(cpu_backend)},
+        "timestamp": datetime.now().isoformat(),
+        "n_eligible": len(eligible),
+        "n_checked": len(cases),
+        "n_identical": sum(c["status"] == "identical" for c in cases),
+        "seconds": round(time.perf_counter() - t_start, 3),
+        "cases": cases,
+    }
+
+
 def analyze_results(results: dict) -> dict:
     """Quick inline analysis of injection experiment results."""
     from scipy import stats as sp_stats
@@ -492,10 +1375,121 @@ def main():
                         help="Samples per condition per prompt")
     parser.add_argument("--max-tokens", type=int, default=150,
                         help="Max tokens to generate")
+    parser.add_argument("--sampler", choices=list(SAMPLERS.keys()), default="topk",
+                        help="Sampling kernel: topk (top-k slice, same tokens as full), "
+                             "full (full-vocab sort), topk_local (top-k slice, own RNG draws)")
+    parser.add_argument("--generation", choices=["legacy", "hf"], default="legacy",
+                        help="legacy: hand-written decode loop; hf: model.generate() "
+                             "with injection as a LogitsProcessor (KV cache, batching)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Samples generated together with --generation hf "
+                             "(>1 replaces per-sample torch seeds with one per batch)")
+    parser.add_argument("--cpu-backend", choices=CPU_BACKENDS, default="eager",
+                        help="CPU acceleration: bf16 autocast, int8 dynamic quantization "
+                             "of linear layers, or torch.compile")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch intra-op threads (default: torch's choice)")
+    parser.add_argument("--interop-threads", type=int, default=None,
+                        help="torch inter-op threads (default: torch's choice)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Forked worker processes sharing the model copy-on-write "
+                             "(conditions are distributed across workers); more than 1 "
+                             "runs the model on CPU, since CUDA/MPS do not survive fork")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="torch threads per worker (default: cpu_count // workers)")
+    parser.add_argument("--benchmark-backends", action="store_true",
+                        help="Report tokens/sec per CPU backend for --benchmark-models and exit")
+    parser.add_argument("--benchmark-models", type=str, default="distilgpt2,gpt2,gpt2-medium",
+                        help="Comma-separated models for --benchmark-backends")
+    parser.add_argument("--parity-check", action="store_true",
+                        help="Compare legacy and hf generation token-by-token and exit")
+    parser.add_argument("--verify-determinism", type=str, default=None, metavar="RESULT_JSON",
+                        help="Regenerate a random subset of baseline/PRNG samples from a "
+                             "result file and report the first divergent step, then exit")
+    parser.add_argument("--verify-n", type=int, default=10,
+                        help="Samples to regenerate for --verify-determinism")
+    parser.add_argument("--verify-seed", type=int, default=0,
+                        help="Subset selection seed for --verify-determinism")
+    parser.add_argument("--replay", type=str, default=None, metavar="DUMP",
+                        help="Add a source replaying a recorded entropy dump (hex, integer "
+                             "text or raw bytes); sample i reads partition i of the file")
+    parser.add_argument("--replay-name", type=str, default="QRNG",
+                        help="Source name for --replay (default: QRNG)")
+    parser.add_argument("--replay-policy", choices=REPLAY_POLICIES, default="error",
+                        help="When a sample's partition runs out: error, wrap, or fall back "
+                             "to OS entropy (logit_perturb reads 4 bytes per vocab entry per step)")
+    parser.add_argument("--no-health", action="store_true",
+                        help="Disable online entropy health monitors (RCT/APT/monobit)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record token IDs, chosen-token logprobs and per-step entropy "
+                             "to .npy arrays next to the result JSON")
+    parser.add_argument("--benchmark-hmix", action="store_true",
+                        help="Report HMIX keystream throughput and exit")
 
     args = parser.parse_args()
 
-    results = run_experiment(args.model, args.samples, args.max_tokens)
+    if args.benchmark_hmix:
+        print("HMIX keystream throughput:")
+        for size, b in benchmark_hmix().items():
+            print(f"  {int(size):>10,d} B/call: {b['mb_per_sec']:>9.2f} MB/s, "
+                  f"{b['us_per_call']:>10.2f} us/call, "
+                  f"unique 32B blocks={b['unique_32b_blocks']:.4f}")
+        return
+
+    configure_threads(args.threads, args.interop_threads)
+
+    if args.benchmark_backends:
+        print(f"CPU backend benchmark ({args.generation} generation, "
+              f"{torch.get_num_threads()} intra-op threads):")
+        report = benchmark_backends(args.benchmark_models.split(","), CPU_BACKENDS,
+                                    generation=args.generation,
+                                    max_tokens=min(args.max_tokens, 64))
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        filepath = OUTPUT_DIR / f"backend_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(filepath, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {filepath}")
+        return
+
+    if args.verify_determinism:
+        src = Path(args.verify_determinism)
+        report = verify_determinism(src, args.verify_n, args.verify_seed, args.cpu_backend)
+        if "error" in report:
+            print(f"Cannot verify {src}: {report['error']}")
+            return
+        for c in report["cases"]:
+            detail = ""
+            if c.get("divergence"):
+                dv = c["divergence"]
+                detail = f" at step {dv['step']}" + (
+                    f" (logit delta {dv['logit_delta']:+.4f})" if "logit_delta" in dv else "")
+            print(f"  [{c['prompt_idx']+1}] {c['condition']:<22} s{c['sample']}: "
+                  f"{c['status']}{detail}")
+        print(f"\nDeterminism: {report['n_identical']}/{report['n_checked']} identical "
+              f"in {report['seconds']:.1f}s")
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        filepath = OUTPUT_DIR / f"determinism_{src.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(filepath, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved: {filepath}")
+        return
+
+    if args.parity_check:
+        parity = check_generation_parity(args.model, max_tokens=min(args.max_tokens, 50))
+        for c in parity["cases"]:
+            status = "identical" if c["identical"] else f"diverges at step {c['first_divergent_step']}"
+            print(f"  {c['mode']:<14} s{c['sample']} {c['prompt'][:30]:<30} {status}")
+        print(f"\nParity: {parity['n_identical']}/{parity['n_cases']} token-identical")
+        return
+
+    trace_writer = TokenTraceWriter() if args.trace else None
+    results = run_experiment(args.model, args.samples, args.max_tokens, args.sampler,
+                             trace_writer=trace_writer, generation=args.generation,
+                             batch_size=args.batch_size, cpu_backend=args.cpu_backend,
+                             workers=args.workers, threads_per_worker=args.threads_per_worker,
+                             replay=({"path": Path(args.replay), "name": args.replay_name,
+                                      "policy": args.replay_policy} if args.replay else None),
+                             health=not args.no_health)
 
     # Inline analysis
     print(f"\n{'='*70}")
@@ -534,6 +1528,12 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filepath = OUTPUT_DIR / f"injection_{model_safe}_{timestamp}.json"
 
+    if trace_writer is not None:
+        results["token_trace"] = trace_writer.write(
+            OUTPUT_DIR / f"injection_{model_safe}_{timestamp}_trace")
+        print(f"Token trace: {results['token_trace']['n_tokens']} tokens "
+              f"-> {results['token_trace']['directory']}/")
+
     with open(filepath, "w") as f:
         json.dump(results, f, indent=2, default=str)
     print(f"\nSaved: {filepath}")
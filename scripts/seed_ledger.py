@@ -0,0 +1,105 @@
+"""
+Binary seed ledger written next to v2 experiment results.
+
+A run's seeds are stored once as a flat uint64 array (<stem>.seeds.npy)
+in the order they were drawn, plus a small JSON index (<stem>.seeds.idx.json)
+of cells. Each cell is one (stream, block, prompt, source) run of
+consecutive samples; sample j of a cell is seeds[offset + j]. Analysis
+tools memory-map the array instead of parsing integer lists out of the
+result JSON.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+LEDGER_VERSION = 1
+CELL_COLUMNS = ["stream", "block", "prompt", "source", "offset", "count"]
+
+
+class SeedLedger:
+    """Append-only collector for the seeds of one experiment run."""
+    def __init__(self):
+        self._chunks = []
+        self.cells = []
+        self.n_seeds = 0
+
+    def record(self, stream: int, block: str, prompt: str, source: str, seeds: list[int]):
+        """Append one cell of consecutive sample seeds."""
+        self.cells.append([stream, block, prompt, source, self.n_seeds, len(seeds)])
+        self._chunks.append(np.asarray(seeds, dtype=np.uint64))
+        self.n_seeds += len(seeds)
+
+    def write(self, stem: Path) -> dict:
+        """Write <stem>.seeds.npy and <stem>.seeds.idx.json; return the JSON reference."""
+        stem = Path(stem)
+        seeds_path = stem.with_name(stem.name + ".seeds.npy")
+        index_path = stem.with_name(stem.name + ".seeds.idx.json")
+        seeds = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=np.uint64)
+        np.save(seeds_path, seeds)
+        with open(index_path, "w") as f:
+            json.dump({
+                "version": LEDGER_VERSION,
+                "dtype": "uint64",
+                "n_seeds": self.n_seeds,
+                "columns": CELL_COLUMNS,
+                "cells": self.cells,
+            }, f)
+        return {
+            "seeds": seeds_path.name,
+            "index": index_path.name,
+            "n_seeds": self.n_seeds,
+            "n_cells": len(self.cells),
+        }
+
+
+def load_seed_ledger(result_path: Path, reference: dict) -> tuple[np.ndarray, list[dict]]:
+    """Memory-map a ledger referenced from a result JSON; return (seeds, cells)."""
+    directory = Path(result_path).parent
+    seeds = np.load(directory / reference["seeds"], mmap_mode="r")
+    with open(directory / reference["index"]) as f:
+        index = json.load(f)
+    cells = [dict(zip(index["columns"], row)) for row in index["cells"]]
+    return seeds, cells
+
+
+def seeds_by_source(result_path: Path, reference: dict) -> dict[str, np.ndarray]:
+    """64-bit seeds per source, in the order of the old seed_distributions lists.
+
+    That order is stream by stream, and within a stream the order the
+    source drew its seeds (single-turn, then multi-turn).
+    """
+    seeds, cells = load_seed_ledger(result_path, reference)
+    ranges = {}
+    for cell in sorted(cells, key=lambda c: (c["stream"], c["offset"])):
+        ranges.setdefault(cell["source"], []).append(
+            np.arange(cell["offset"], cell["offset"] + cell["count"]))
+    return {source: seeds[np.concatenate(r)] for source, r in ranges.items()}
+
+
+def iter_seeds_by_source(result_path: Path, reference: dict, block: int = 1 << 20):
+    """Yield (source, uint64 block) in seeds_by_source order without loading it all.
+
+    Cells of one source are coalesced into blocks of up to `block` seeds
+    read from the memory-mapped ledger; each source is finished before the
+    next one starts.
+    """
+    seeds, cells = load_seed_ledger(result_path, reference)
+    ranges = {}
+    for cell in sorted(cells, key=lambda c: (c["stream"], c["offset"])):
+        ranges.setdefault(cell["source"], []).append((cell["offset"], cell["count"]))
+    for source, spans in ranges.items():
+        buf, size = [], 0
+        for offset, count in spans:
+            while count:
+                take = min(count, block - size)
+                buf.append(np.asarray(seeds[offset:offset + take]))
+                size += take
+                offset += take
+                count -= take
+                if size == block:
+                    yield source, np.concatenate(buf)
+                    buf, size = [], 0
+        if size:
+            yield source, np.concatenate(buf)
@@ -0,0 +1,286 @@
+"""
+FFT-based serial correlation analysis for seed and metric series.
+
+The autocovariance at every lag comes from one zero-padded FFT
+(Wiener-Khinchin), so the full lag range costs O(n log n) instead of
+O(n·L) for per-lag sums. On top of it:
+  - per-lag autocorrelation with z-scores (r_k·sqrt(n) ~ N(0, 1) under H0)
+  - Ljung-Box portmanteau Q(h) = n(n+2) Σ_{k≤h} r_k² / (n-k) ~ χ²(h)
+  - periodogram with Fisher's g test for a single dominant periodicity
+    (e.g. a clock-driven cycle or a stream-boundary effect)
+
+SerialAccumulator gives the same report for series fed in chunks, with
+the lag range capped at STREAM_MAX_LAG and a Welch-averaged periodogram.
+
+Used by analyze_seed_distributions.py for seed series and by
+statistical_analysis_v2.py for per-sample metric series.
+"""
+
+import math
+
+import numpy as np
+from scipy import stats
+
+LJUNG_BOX_LAGS = (10, 100, 1000)
+MAX_LAG_FRACTION = 4      # default max lag n // 4, where Q(h) is still usable
+TOP_LAGS = 10
+TOP_PEAKS = 5
+FISHER_EXACT_MAX = 50
+
+
+def autocovariance_fft(x, max_lag: int | None = None) -> np.ndarray:
+    """Sums c_k = Σ_t (x_t - x̄)(x_{t+k} - x̄) for k = 0..max_lag."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    max_lag = n - 1 if max_lag is None else min(max_lag, n - 1)
+    size = 1 << (2 * n - 1).bit_length()  # zero padding avoids circular wrap
+    f = np.fft.rfft(x - x.mean(), size)
+    return np.fft.irfft(f * np.conj(f), size)[:max_lag + 1]
+
+
+def autocorrelation(x, max_lag: int | None = None, unbiased: bool = False) -> np.ndarray:
+    """r_k for k = 0..max_lag.
+
+    unbiased=False divides c_k by n·var (the Ljung-Box / Box-Jenkins form);
+    unbiased=True divides by (n-k)·var, as the per-lag sums in
+    test_autocorrelation always did.
+    """
+    c = autocovariance_fft(x, max_lag)
+    n = len(x)
+    if c[0] <= 0:
+        return np.full(len(c), np.nan)
+    var = c[0] / n
+    denom = (n - np.arange(len(c))) if unbiased else n
+    return c / (denom * var)
+
+
+def ljung_box(r: np.ndarray, n: int, lags=LJUNG_BOX_LAGS) -> dict:
+    """Ljung-Box Q at each h in lags (those below len(r)); r is the biased ACF."""
+    k = np.arange(1, len(r))
+    q = n * (n + 2) * np.cumsum(r[1:] ** 2 / (n - k))
+    out = {}
+    for h in lags:
+        if h < len(r):
+            out[f"h_{h}"] = {
+                "Q": round(float(q[h - 1]), 4),
+                "p_value": round(float(stats.chi2.sf(q[h - 1], h)), 6),
+            }
+    return out
+
+
+def periodogram(x) -> tuple[np.ndarray, np.ndarray]:
+    """(frequencies, power) at Fourier frequencies j/n, j = 1..floor((n-1)/2)."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    m = (n - 1) // 2
+    power = np.abs(np.fft.rfft(x - x.mean())[1:m + 1]) ** 2 / n
+    return np.arange(1, m + 1) / n, power
+
+
+def fisher_g_pvalue(g: float, m: int) -> float:
+    """P(G > g) for Fisher's g over m periodogram ordinates.
+
+    The exact alternating series cancels catastrophically for large m, so
+    above FISHER_EXACT_MAX the extreme-value form 1 - (1 - e^{-mg})^m is used.
+    """
+    if m < 2 or g <= 0:
+        return 1.0
+    if m > FISHER_EXACT_MAX:
+        p = -math.expm1(m * math.log1p(-math.exp(-m * g)))
+    else:
+        p = 0.0
+        for j in range(1, min(m, int(1 / g)) + 1):
+            term = math.comb(m, j) * (1 - j * g) ** (m - 1)
+            p += term if j % 2 else -term
+    return float(min(max(p, 0.0), 1.0))
+
+
+def _acf_report(r: np.ndarray, n: int, alpha: float, lags, top_lags: int) -> dict:
+    max_lag = len(r) - 1
+    z = r[1:] * np.sqrt(n)
+    p = 2 * stats.norm.sf(np.abs(z))
+    significant = np.flatnonzero(p < alpha / max_lag) + 1  # Bonferroni over lags
+    order = np.argsort(-np.abs(r[1:]))[:top_lags]
+    return {
+        "n": n,
+        "max_lag": max_lag,
+        "lag_1": round(float(r[1]), 6),
+        "n_significant_lags": int(len(significant)),
+        "significant_lags": [int(k) for k in significant[:top_lags]],
+        "top_lags": [{"lag": int(k + 1), "autocorrelation": round(float(r[k + 1]), 6),
+                      "z_statistic": round(float(z[k]), 4)} for k in order],
+        "ljung_box": ljung_box(r, n, lags),
+    }
+
+
+def _peaks(freqs: np.ndarray, power: np.ndarray, top_peaks: int) -> list[dict]:
+    total = power.sum()
+    if total <= 0:
+        return []
+    return [{"period": round(float(1 / freqs[j]), 3),
+             "frequency": round(float(freqs[j]), 6),
+             "relative_power": round(float(power[j] / total), 6)}
+            for j in np.argsort(-power)[:top_peaks]]
+
+
+def serial_correlation_analysis(x, max_lag: int | None = None, alpha: float = 0.05,
+                                lags=LJUNG_BOX_LAGS, top_lags: int = TOP_LAGS,
+                                top_peaks: int = TOP_PEAKS) -> dict:
+    """Full-range ACF, Ljung-Box and periodogram summary for one series."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n < 8:
+        return {"n": n, "error": f"only {n} values"}
+    if max_lag is None:
+        max_lag = max(1, n // MAX_LAG_FRACTION)
+    max_lag = min(max_lag, n - 1)
+
+    r = autocorrelation(x, max_lag)
+    if np.isnan(r[0]):
+        return {"n": n, "error": "zero variance"}
+
+    freqs, power = periodogram(x)
+    m = len(power)
+    total = power.sum()
+    g = float(power.max() / total) if m and total > 0 else 0.0
+
+    return {
+        **_acf_report(r, n, alpha, lags, top_lags),
+        "periodogram": {
+            "n_frequencies": m,
+            "fisher_g": round(g, 6),
+            "fisher_g_p_value": round(fisher_g_pvalue(g, m), 6),
+            "top_peaks": _peaks(freqs, power, top_peaks),
+        },
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Streaming accumulator
+# ─────────────────────────────────────────────────────────────────────
+
+STREAM_MAX_LAG = 1000
+WELCH_SEGMENT = 1 << 16
+
+
+def _lag_sums(y: np.ndarray, max_lag: int) -> np.ndarray:
+    """Uncentred Σ_t y_t·y_{t+k} for k = 0..max_lag (zero beyond len(y) - 1)."""
+    out = np.zeros(max_lag + 1)
+    if not len(y):
+        return out
+    size = 1 << (len(y) + max_lag).bit_length()
+    f = np.fft.rfft(y, size)
+    s = np.fft.irfft(f * np.conj(f), size)[:min(max_lag, len(y) - 1) + 1]
+    out[:len(s)] = s
+    return out
+
+
+class SerialAccumulator:
+    """Mergeable serial-correlation state for series too long to hold in memory.
+
+    Keeps uncentred lag sums up to max_lag, the first and last max_lag
+    values (for boundary terms and centring), and a Welch periodogram
+    averaged over non-overlapping segments. Chunks must arrive in series
+    order; merge(other) appends other's series after this one. The ACF
+    and Ljung-Box are exact; at a merge boundary, the partial Welch segment
+    of the first series is dropped.
+
+    Values are shifted by `center` (e.g. 0.5 for U(0,1) data) before the
+    sums to keep them small; the report uses the sample mean.
+    """
+    def __init__(self, max_lag: int = STREAM_MAX_LAG, segment: int = WELCH_SEGMENT,
+                 center: float = 0.0):
+        self.max_lag = max_lag
+        self.segment = segment
+        self.center = center
+        self.n = 0
+        self.total = 0.0
+        self.sums = np.zeros(max_lag + 1)
+        self.head = np.empty(0)
+        self.tail = np.empty(0)
+        self.welch = np.zeros((segment - 1) // 2)
+        self.n_segments = 0
+        self._seg_buf = np.empty(0)
+
+    def update(self, x):
+        y = np.asarray(x, dtype=np.float64) - self.center
+        if not len(y):
+            return
+        L = self.max_lag
+        z = np.concatenate((self.tail, y))
+        self.sums += _lag_sums(z, L) - _lag_sums(self.tail, L)
+        if len(self.head) < L:
+            self.head = np.concatenate((self.head, y[:L - len(self.head)]))
+        self.tail = z[-L:]
+        self.total += float(y.sum())
+        self.n += len(y)
+
+        buf = np.concatenate((self._seg_buf, y))
+        k = len(buf) // self.segment
+        if k:
+            seg = buf[:k * self.segment].reshape(k, self.segment)
+            seg = seg - seg.mean(axis=1, keepdims=True)
+            f = np.fft.rfft(seg, axis=1)[:, 1:len(self.welch) + 1]
+            self.welch += (np.abs(f) ** 2).sum(axis=0) / self.segment
+            self.n_segments += k
+        self._seg_buf = buf[k * self.segment:]
+
+    def merge(self, other: "SerialAccumulator"):
+        """Append other's series after this one."""
+        L = self.max_lag
+        cross = (_lag_sums(np.concatenate((self.tail, other.head)), L)
+                 - _lag_sums(self.tail, L) - _lag_sums(other.head, L))
+        self.sums += other.sums + cross
+        if len(self.head) < L:
+            self.head = np.concatenate((self.head, other.head[:L - len(self.head)]))
+        self.tail = np.concatenate((self.tail, other.tail))[-L:]
+        self.total += other.total
+        self.n += other.n
+        self.welch += other.welch
+        self.n_segments += other.n_segments
+        self._seg_buf = other._seg_buf
+
+    def autocorrelation(self, max_lag: int | None = None, unbiased: bool = False) -> np.ndarray:
+        """r_k for k = 0..max_lag, as autocorrelation() on the whole series."""
+        n = self.n
+        max_lag = min(self.max_lag if max_lag is None else max_lag, self.max_lag, n - 1)
+        k = np.arange(max_lag + 1)
+        m = self.total / n
+        # Σ y_t over t < n-k and over t >= k, from the kept tail and head
+        last_k = np.concatenate(([0.0], np.cumsum(self.tail[::-1])))[k]
+        first_k = np.concatenate(([0.0], np.cumsum(self.head)))[k]
+        c = (self.sums[:max_lag + 1] - m * ((self.total - last_k) + (self.total - first_k))
+             + (n - k) * m * m)
+        if c[0] <= 0:
+            return np.full(len(c), np.nan)
+        denom = (n - k) if unbiased else n
+        return c / (denom * (c[0] / n))
+
+    def report(self, alpha: float = 0.05, lags=LJUNG_BOX_LAGS, top_lags: int = TOP_LAGS,
+               top_peaks: int = TOP_PEAKS) -> dict:
+        if self.n < 8:
+            return {"n": self.n, "error": f"only {self.n} values"}
+        r = self.autocorrelation()
+        if np.isnan(r[0]):
+            return {"n": self.n, "error": "zero variance"}
+        out = _acf_report(r, self.n, alpha, lags, top_lags)
+
+        m, K = len(self.welch), self.n_segments
+        if K:
+            power = self.welch / K
+            freqs = np.arange(1, m + 1) / self.segment
+            g = float(power.max() / power.sum())
+            # averaged ordinates / their mean ~ Gamma(K, 1/K) under H0
+            q = power.max() / power.mean()
+            p = -math.expm1(m * math.log1p(-stats.gamma.sf(q * K, K)))
+            out["periodogram"] = {
+                "n_frequencies": m,
+                "fisher_g": round(g, 6),
+                "fisher_g_p_value": round(float(min(max(p, 0.0), 1.0)), 6),
+                "top_peaks": _peaks(freqs, power, top_peaks),
+                "welch_segments": K,
+                "segment_length": self.segment,
+            }
+        else:
+            out["periodogram"] = {"error": f"fewer than {self.segment} values"}
+        return out
@@ -4,19 +4,27 @@ Statistical analysis v2 for entropy seeding experiments.
 Improvements over v1:
   - Benjamini-Hochberg FDR correction for multiple comparisons
   - Post-hoc power analysis (via simulation-based approach)
-  - Mixed-effects models using all samples (not just prompt means)
+  - Mixed-effects models using all samples (not just prompt means), with
+    REML random-intercept fits (mixed_models.py)
   - Length-corrected diversity metrics (MTLD, D2)
   - Seed distribution analysis
   - Proper reporting of corrected p-values
+  - Bootstrap BCa confidence intervals for effect sizes (bootstrap_ci.py)
+  - Exact / Monte Carlo sign-flip permutation tests (permutation_tests.py)
 
 Usage:
     python statistical_analysis_v2.py <input_v2.json> [output.json]
+    python statistical_analysis_v2.py --benchmark-power [--sizes 10,25,50,100,200]
+    python statistical_analysis_v2.py --build-power-table --sizes 10,20,30,40 --alphas 0.05
 
 Works with both v1 and v2 experiment JSON files.
 """
 
+import argparse
 import json
+import os
 import sys
+import time
 import warnings
 from pathlib import Path
 from typing import Any
@@ -24,6 +32,12 @@ from typing import Any
 import numpy as np
 from scipy import stats
 
+from bootstrap_ci import N_BOOT, bootstrap_effects
+from mixed_models import extract_long_samples, reml_random_intercepts
+from permutation_tests import EXACT_MAX_N, N_RESAMPLES, sign_flip_tests
+from seed_ledger import seeds_by_source
+from serial_correlation import autocorrelation, serial_correlation_analysis
+
 # ─────────────────────────────────────────────────────────────────────
 # Configuration
 # ─────────────────────────────────────────────────────────────────────
@@ -166,18 +180,84 @@ def benjamini_hochberg(p_values: list[float], alpha: float = 0.05) -> list[dict]
 # Post-hoc power analysis (simulation-based)
 # ─────────────────────────────────────────────────────────────────────
 
+POWER_SIMS = 5000
+WILCOXON_EXACT_MAX = 50    # stats.wilcoxon 'auto' uses the exact null up to this n
+POWER_CHUNK = 1 << 22      # simulated differences per vectorized block
+POWER_BENCHMARK_PATH = Path(__file__).parent.parent / "results" / "power_benchmark" / "power_benchmark.json"
+
+_WILCOXON_NULL = {}
+
+
+def wilcoxon_null(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """(P(W+ <= k), P(W+ >= k)) for k = 0..n(n+1)/2 under H0.
+
+    Counts of subsets of {1..n} with rank sum k, by the subset-sum DP.
+    """
+    if n not in _WILCOXON_NULL:
+        counts = np.zeros(n * (n + 1) // 2 + 1, dtype=np.int64)
+        counts[0] = 1
+        for j in range(1, n + 1):
+            counts[j:] = counts[j:] + counts[:-j]
+        pmf = counts / 2.0 ** n
+        _WILCOXON_NULL[n] = (np.cumsum(pmf), np.cumsum(pmf[::-1])[::-1])
+    return _WILCOXON_NULL[n]
+
+
+def signed_rank_pvalues(diffs: np.ndarray) -> np.ndarray:
+    """Two-sided Wilcoxon signed-rank p-value for each row of diffs.
+
+    Rows must be free of zeros and ties, as continuous draws are. Each
+    |d| is sorted as its float64 bit pattern with the lowest mantissa bit
+    replaced by the sign (a 1-ulp change that cannot reorder untied
+    values), so one in-place sort gives both the ranks and the signs. As
+    in stats.wilcoxon's 'auto' mode, p comes from the exact null up to
+    WILCOXON_EXACT_MAX pairs and from the normal approximation above.
+    """
+    n = diffs.shape[1]
+    bits = np.ascontiguousarray(diffs, dtype=np.float64).view(np.uint64)
+    keys = (bits & np.uint64(0x7FFFFFFFFFFFFFFE)) | (~bits >> np.uint64(63))
+    keys.sort(axis=1)
+    r_plus = (keys & np.uint64(1)).astype(np.float64) @ np.arange(1, n + 1, dtype=np.float64)
+    if n <= WILCOXON_EXACT_MAX:
+        cdf, sf = wilcoxon_null(n)
+        k = r_plus.astype(np.int64)
+        return np.clip(2 * np.minimum(sf[k], cdf[k]), 0, 1)
+    z = (r_plus - n * (n + 1) / 4) / np.sqrt(n * (n + 1) * (2 * n + 1) / 24)
+    return 2 * stats.norm.sf(np.abs(z))
+
+
 def power_wilcoxon_paired(d: float, n: int, alpha: float = 0.05,
-                          n_sims: int = 5000) -> float:
+                          n_sims: int = POWER_SIMS) -> float:
     """Estimate power of Wilcoxon signed-rank test via simulation.
 
     Simulates paired differences from N(d, 1) and counts how often
-    the test rejects H0.
+    the test rejects H0. All simulations are drawn as matrices and tested
+    row-wise with signed_rank_pvalues; the estimate agrees with the
+    per-simulation loop (_power_wilcoxon_paired_loop) within Monte Carlo
+    error.
     """
     if n < 3:
         return 0.0
     if abs(d) < 1e-10:
         return alpha  # power = alpha under H0
 
+    rng = np.random.default_rng(42)
+    rows = max(1, POWER_CHUNK // n)
+    rejections = 0
+    for lo in range(0, n_sims, rows):
+        diffs = rng.normal(loc=d, scale=1.0, size=(min(rows, n_sims - lo), n))
+        rejections += int(np.count_nonzero(signed_rank_pvalues(diffs) < alpha))
+    return rejections / n_sims
+
+
+def _power_wilcoxon_paired_loop(d: float, n: int, alpha: float = 0.05,
+                                n_sims: int = POWER_SIMS) -> float:
+    """Reference: one stats.wilcoxon call per simulation (for benchmarking)."""
+    if n < 3:
+        return 0.0
+    if abs(d) < 1e-10:
+        return alpha
+
     rng = np.random.RandomState(42)
     rejections = 0
     for _ in range(n_sims):
@@ -225,6 +305,127 @@ def minimum_detectable_effect(n: int, alpha: float = 0.05,
     return round((lo + hi) / 2, 3)
 
 
+# ─────────────────────────────────────────────────────────────────────
+# Persistent power / MDE table
+# ─────────────────────────────────────────────────────────────────────
+
+POWER_TABLE_PATH = Path(__file__).parent.parent / "results" / "power_tables" / "power_table.json"
+POWER_TABLE_VERSION = 1
+D_STEP = 0.01
+D_MAX = 5.0                # the MDE search range; larger d are computed directly
+POWER_TESTS = ("wilcoxon", "ttest")
+
+
+class PowerTable:
+    """On-disk power and MDE lookup for the paired Wilcoxon and t tests.
+
+    Power is tabulated per (test, alpha, n) on a grid of d in steps of
+    D_STEP over [0, D_MAX] and interpolated linearly in d; n is exact, as
+    power steps with n through the exact null. Missing cells are computed
+    on first use, and save() writes new cells back after merging in those
+    other runs saved meanwhile. An MDE cell holds the smallest d reaching
+    the target power, by bisection on the interpolated power.
+    """
+    def __init__(self, path: Path | None = POWER_TABLE_PATH, n_sims: int = POWER_SIMS):
+        self.path = Path(path) if path is not None else None
+        self.n_sims = n_sims
+        self.power_cells = {}   # (test, alpha, n, d index) -> power
+        self.mde_cells = {}     # (test, alpha, target, n) -> d
+        self.computed = 0
+        self.reused = 0
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            self._merge_file()
+
+    def _merge_file(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        if (data.get("version"), data.get("d_step"), data.get("n_sims")) != \
+                (POWER_TABLE_VERSION, D_STEP, self.n_sims):
+            print(f"  Power table {self.path} was built with other settings; not using it")
+            return
+        for test, alpha, n, i, p in data["power"]:
+            self.power_cells.setdefault((test, alpha, n, i), p)
+        for test, alpha, target, n, d in data["mde"]:
+            self.mde_cells.setdefault((test, alpha, target, n), d)
+
+    def _compute(self, test: str, d: float, n: int, alpha: float) -> float:
+        if test == "wilcoxon":
+            return power_wilcoxon_paired(d, n, alpha, self.n_sims)
+        return power_ttest_paired(d, n, alpha)
+
+    def _cell(self, test: str, alpha: float, n: int, i: int) -> float:
+        key = (test, alpha, n, i)
+        if key in self.power_cells:
+            self.reused += 1
+        else:
+            self.power_cells[key] = self._compute(test, i * D_STEP, n, alpha)
+            self.computed += 1
+            self._dirty = True
+        return self.power_cells[key]
+
+    def power(self, test: str, d: float, n: int, alpha: float = 0.05) -> float:
+        d = abs(d)
+        if n < 3 or d > D_MAX:
+            return self._compute(test, d, n, alpha)
+        x = d / D_STEP
+        i = min(int(x), round(D_MAX / D_STEP) - 1)
+        w = x - i
+        lo = self._cell(test, alpha, n, i)
+        if w < 1e-9:
+            return lo
+        return (1 - w) * lo + w * self._cell(test, alpha, n, i + 1)
+
+    def mde(self, test: str, n: int, alpha: float = 0.05, target: float = 0.80) -> float:
+        """As minimum_detectable_effect, for either test, from the table."""
+        if n < 3:
+            return float('inf')
+        key = (test, alpha, target, n)
+        if key not in self.mde_cells:
+            lo, hi = 0.0, D_MAX
+            for _ in range(50):
+                mid = (lo + hi) / 2
+                if self.power(test, mid, n, alpha) < target:
+                    lo = mid
+                else:
+                    hi = mid
+            self.mde_cells[key] = round((lo + hi) / 2, 3)
+            self._dirty = True
+        return self.mde_cells[key]
+
+    def fill(self, sizes: list[int], alphas=(0.05,), tests=POWER_TESTS, target: float = 0.80):
+        """Precompute every d cell and the MDE for each (test, alpha, n)."""
+        for test in tests:
+            for alpha in alphas:
+                for n in sizes:
+                    t0 = time.perf_counter()
+                    for i in range(round(D_MAX / D_STEP) + 1):
+                        self._cell(test, alpha, n, i)
+                    mde = self.mde(test, n, alpha, target)
+                    print(f"  {test:<8} alpha={alpha} n={n:<5} MDE={mde:.3f} "
+                          f"({time.perf_counter() - t0:.1f}s)")
+                self.save()
+
+    def save(self):
+        """Write new cells back, keeping any cells other runs added."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._merge_file()
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "version": POWER_TABLE_VERSION,
+                "d_step": D_STEP,
+                "n_sims": self.n_sims,
+                "power": [[*k, v] for k, v in sorted(self.power_cells.items())],
+                "mde": [[*k, v] for k, v in sorted(self.mde_cells.items())],
+            }, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
 # ─────────────────────────────────────────────────────────────────────
 # Mixed-effects model (approximate via summary statistics)
 # ─────────────────────────────────────────────────────────────────────
@@ -240,9 +441,9 @@ def mixed_effects_test(all_samples: dict, metric: str, source_a: str,
 
     Also runs a sample-level Welch t-test for comparison.
 
-    This is an approximation of lmer(metric ~ source + (1|prompt)).
-    The full mixed-effects model would require statsmodels or R, which
-    may not be available. This approach:
+    This is an approximation of lmer(metric ~ source + (1|prompt)); the
+    REML fit itself is reml_random_intercepts (mixed_models.py), reported
+    alongside. This approach:
     - Uses all samples (not just prompt means)
     - Properly accounts for prompt as a grouping variable
     - Is more powerful than pure prompt-mean analysis
@@ -426,15 +627,23 @@ def extract_paired_vectors(prompt_means: dict, metrics: list[str],
 # Seed distribution analysis
 # ─────────────────────────────────────────────────────────────────────
 
-def analyze_seed_distributions(data: dict) -> dict:
+def analyze_seed_distributions(data: dict, source_path: Path | None = None) -> dict:
     """Characterize seed distributions for each source.
 
     Tests uniformity, autocorrelation, and inter-source differences.
+    Seeds come from the run's binary seed ledger when the result references
+    one (source_path locates it), otherwise from the JSON lists.
     """
+    if "seed_ledger" in data and source_path is None:
+        # ledger runs keep no seeds in the JSON, so there is nothing to fall back to
+        return {"error": "seed ledger requires source_path"}
     version = detect_version(data)
     result = {}
 
-    if version == "v2":
+    if "seed_ledger" in data:
+        for source_name, seeds in seeds_by_source(source_path, data["seed_ledger"]).items():
+            result[source_name] = seeds % (2**32)
+    elif version == "v2":
         for stream in data.get("streams", []):
             sd = stream.get("seed_distributions", {})
             for source_name, info in sd.items():
@@ -477,11 +686,8 @@ def analyze_seed_distributions(data: dict) -> dict:
 
         # Lag-1 autocorrelation
         if n > 2:
-            mean_arr = np.mean(arr)
-            var_arr = np.var(arr, ddof=0)
-            if var_arr > 0:
-                autocorr = np.sum((arr[:-1] - mean_arr) * (arr[1:] - mean_arr)) / ((n - 1) * var_arr)
-            else:
+            autocorr = autocorrelation(arr, 1, unbiased=True)[1]
+            if np.isnan(autocorr):
                 autocorr = 0.0
         else:
             autocorr = float("nan")
@@ -504,6 +710,7 @@ def analyze_seed_distributions(data: dict) -> dict:
                 "uniform_at_005": bool(chi2_p > 0.05),
             },
             "lag1_autocorrelation": round(float(autocorr), 6),
+            "serial_correlation": serial_correlation_analysis(arr),
         }
 
     # Pairwise KS tests between sources
@@ -528,15 +735,22 @@ def analyze_seed_distributions(data: dict) -> dict:
 # Core paired tests (enhanced)
 # ─────────────────────────────────────────────────────────────────────
 
-def run_paired_tests(paired_vectors: dict, metrics: list[str],
-                     comparisons: list) -> tuple[dict, list[float]]:
+def run_paired_tests(paired_vectors: dict, metrics: list[str], comparisons: list,
+                     power_table: PowerTable | None = None, n_perm: int = N_RESAMPLES,
+                     perm_seed: int = 0, perm_exact_max: int = EXACT_MAX_N
+                     ) -> tuple[dict, list[float]]:
     """Run paired statistical tests, collecting all p-values for FDR.
 
+    Power and MDE come from power_table when given, else are computed.
+    The sign-flip permutation tests run once over every metric × comparison
+    (exact up to perm_exact_max pairs, else n_perm Monte Carlo flips;
+    n_perm=0 turns them off).
     Returns (results_dict, flat_p_values_list).
     """
     results = {}
     all_p_values = []
     p_value_keys = []  # track (metric, comparison_key, test_type)
+    perm_keys, perm_diffs = [], []
 
     for metric in metrics:
         results[metric] = {}
@@ -588,9 +802,14 @@ def run_paired_tests(paired_vectors: dict, metrics: list[str],
             d = cohens_d_paired(x_clean, y_clean)
 
             # Power analysis
-            power_w = power_wilcoxon_paired(abs(d), n)
-            power_t = power_ttest_paired(abs(d), n)
-            mde = minimum_detectable_effect(n)
+            if power_table is not None:
+                power_w = power_table.power("wilcoxon", d, n)
+                power_t = power_table.power("ttest", d, n)
+                mde = power_table.mde("ttest", n)
+            else:
+                power_w = power_wilcoxon_paired(abs(d), n)
+                power_t = power_ttest_paired(abs(d), n)
+                mde = minimum_detectable_effect(n)
 
             results[metric][key] = {
                 "n_pairs": n,
@@ -611,6 +830,17 @@ def run_paired_tests(paired_vectors: dict, metrics: list[str],
                     "note": f"At n={n}, 80% power requires d>={mde}",
                 },
             }
+            perm_keys.append((metric, key))
+            perm_diffs.append(x_clean - y_clean)
+
+    # Sign-flip permutation tests, all comparisons at once
+    if n_perm > 0 and perm_diffs:
+        perm = sign_flip_tests(perm_diffs, n_resamples=n_perm, seed=perm_seed,
+                               exact_max=perm_exact_max)
+        for (metric, key), res in zip(perm_keys, perm):
+            results[metric][key]["permutation_test"] = res
+            all_p_values.append(res["p_value"])
+            p_value_keys.append((metric, key, "permutation"))
 
     return results, all_p_values, p_value_keys
 
@@ -643,6 +873,9 @@ def apply_fdr_correction(test_results: dict, all_p_values: list[float],
             elif test_type == "ttest" and "paired_ttest" in entry:
                 entry["paired_ttest"]["p_value_bh_adjusted"] = round(bh["adjusted_p"], 6)
                 entry["paired_ttest"]["significant_bh_005"] = bh["significant_bh"]
+            elif test_type == "permutation" and "permutation_test" in entry:
+                entry["permutation_test"]["p_value_bh_adjusted"] = round(bh["adjusted_p"], 6)
+                entry["permutation_test"]["significant_bh_005"] = bh["significant_bh"]
 
     return test_results, fdr_summary
 
@@ -727,6 +960,7 @@ def count_significant_results(test_results: dict, metrics: list[str]) -> dict:
         "wilcoxon_p005_uncorrected": 0, "wilcoxon_p001_uncorrected": 0,
         "ttest_p005_uncorrected": 0, "ttest_p001_uncorrected": 0,
         "wilcoxon_p005_bh_corrected": 0, "ttest_p005_bh_corrected": 0,
+        "permutation_p005_uncorrected": 0, "permutation_p005_bh_corrected": 0,
         "total_tests": 0,
     }
     for metric in metrics:
@@ -736,6 +970,7 @@ def count_significant_results(test_results: dict, metrics: list[str]) -> dict:
             counts["total_tests"] += 1
             w = res.get("wilcoxon_signed_rank", {})
             t = res.get("paired_ttest", {})
+            perm = res.get("permutation_test", {})
             if w.get("p_value", 1) < 0.05:
                 counts["wilcoxon_p005_uncorrected"] += 1
             if w.get("p_value", 1) < 0.01:
@@ -748,9 +983,61 @@ def count_significant_results(test_results: dict, metrics: list[str]) -> dict:
                 counts["wilcoxon_p005_bh_corrected"] += 1
             if t.get("significant_bh_005", False):
                 counts["ttest_p005_bh_corrected"] += 1
+            if perm.get("p_value", 1) < 0.05:
+                counts["permutation_p005_uncorrected"] += 1
+            if perm.get("significant_bh_005", False):
+                counts["permutation_p005_bh_corrected"] += 1
     return counts
 
 
+# ─────────────────────────────────────────────────────────────────────
+# Serial correlation of per-sample metrics
+# ─────────────────────────────────────────────────────────────────────
+
+def extract_metric_series(data: dict, version: str, metrics: list[str],
+                          sources: list[str]) -> dict:
+    """Per-sample metric values in generation order, centred per prompt.
+
+    Order is stream, prompt, sample (the order the runner generates in).
+    Each value has its prompt's mean (pooled over sources and streams)
+    subtracted so prompt effects do not show up as long-range
+    autocorrelation. Pooling keeps the induced negative correlation small;
+    centring each 5-sample cell on its own mean would bias r_1 by ~ -1/4.
+    """
+    streams = data.get("streams", []) if version == "v2" else [data]
+    cells = []  # (source, metric, prompt, values) in generation order
+    pooled = {}
+    for stream in streams:
+        for prompt, source_data in stream.get("single_turn", {}).items():
+            for source in sources:
+                cell = source_data.get(source) if isinstance(source_data, dict) else None
+                if not isinstance(cell, dict):
+                    continue
+                samples = [smp.get("metrics") or {} for smp in cell.get("samples", [])]
+                for metric in metrics:
+                    vals = np.array([safe_float(m[metric]) for m in samples
+                                     if m.get(metric) is not None])
+                    vals = vals[np.isfinite(vals)]
+                    cells.append((source, metric, prompt, vals))
+                    pooled.setdefault((prompt, metric), []).append(vals)
+
+    prompt_means = {key: float(np.mean(np.concatenate(v))) if sum(map(len, v)) else 0.0
+                    for key, v in pooled.items()}
+    series = {source: {metric: [] for metric in metrics} for source in sources}
+    for source, metric, prompt, vals in cells:
+        series[source][metric].extend(vals - prompt_means[(prompt, metric)])
+    return series
+
+
+def analyze_metric_serial_correlation(data: dict, version: str, metrics: list[str],
+                                      sources: list[str]) -> dict:
+    """FFT autocorrelation, Ljung-Box and periodogram per source and metric."""
+    series = extract_metric_series(data, version, metrics, sources)
+    return {source: {metric: serial_correlation_analysis(series[source][metric])
+                     for metric in metrics}
+            for source in sources}
+
+
 # ─────────────────────────────────────────────────────────────────────
 # Single vs multi-turn comparison
 # ─────────────────────────────────────────────────────────────────────
@@ -885,7 +1172,11 @@ def analyze_by_domain(all_samples: dict, metrics: list[str], sources: list[str],
 # Main analysis pipeline
 # ─────────────────────────────────────────────────────────────────────
 
-def analyze(data: dict) -> dict:
+def analyze(data: dict, source_path: Path | None = None,
+            power_table: PowerTable | None = None, n_boot: int = N_BOOT,
+            boot_seed: int = 0, boot_within: bool = False, workers: int = 1,
+            n_perm: int = N_RESAMPLES, perm_seed: int = 0,
+            perm_exact_max: int = EXACT_MAX_N, reml_stream: bool = False) -> dict:
     version = detect_version(data)
     model_name = data.get("model", "unknown")
     metrics = get_metrics(version)
@@ -920,12 +1211,25 @@ def analyze(data: dict) -> dict:
 
     # ── Paired tests with power analysis ──
     test_results, all_p_values, p_value_keys = run_paired_tests(
-        paired_vectors, metrics, comparisons)
+        paired_vectors, metrics, comparisons, power_table, n_perm=n_perm,
+        perm_seed=perm_seed, perm_exact_max=perm_exact_max)
+    if power_table is not None:
+        power_table.save()
 
     # ── BH-FDR correction ──
     test_results, fdr_summary = apply_fdr_correction(
         test_results, all_p_values, p_value_keys, metrics)
 
+    # ── Bootstrap confidence intervals ──
+    boot_kwargs = dict(n_boot=n_boot, seed=boot_seed, within=boot_within, workers=workers)
+    bootstrap = None
+    if n_boot > 0:
+        bootstrap = bootstrap_effects(all_samples, metrics, sources, comparisons, **boot_kwargs)
+        for metric in metrics:
+            for key, res in test_results.get(metric, {}).items():
+                if "error" not in res and "error" not in bootstrap:
+                    res["bootstrap"] = bootstrap["effects"][metric][key]
+
     print(f"\n--- FDR Correction ---")
     print(f"  Total tests: {fdr_summary['total_tests']}")
     print(f"  Significant (uncorrected p<0.05): {fdr_summary['n_significant_uncorrected']}")
@@ -941,14 +1245,18 @@ def analyze(data: dict) -> dict:
                 continue
             w = res.get("wilcoxon_signed_rank", {})
             t = res.get("paired_ttest", {})
+            perm = res.get("permutation_test", {})
             d = res["cohens_d"]
             pct = res["percent_difference"]
             power = res.get("power_analysis", {})
-            sig_bh = " **[BH-sig]**" if w.get("significant_bh_005") or t.get("significant_bh_005") else ""
-            sig_raw = " *" if w.get("p_value", 1) < 0.05 or t.get("p_value", 1) < 0.05 else ""
+            sig_bh = " **[BH-sig]**" if any(r.get("significant_bh_005") for r in (w, t, perm)) else ""
+            sig_raw = " *" if any(r.get("p_value", 1) < 0.05 for r in (w, t, perm)) else ""
             powered = f" power={power.get('power_ttest', 0):.2f}" if power else ""
-            print(f"  {metric} | {key}: diff={pct:+.4f}% | d={d:.4f} "
-                  f"({res['effect_size_interpretation']}){powered}{sig_raw}{sig_bh}")
+            ci = res.get("bootstrap", {}).get("cohens_d", {}).get("ci_bca")
+            ci_str = f" [{ci[0]:+.3f}, {ci[1]:+.3f}]" if ci else ""
+            perm_str = f" p_perm={perm['p_value']:.4f}" if perm else ""
+            print(f"  {metric} | {key}: diff={pct:+.4f}% | d={d:.4f}{ci_str} "
+                  f"({res['effect_size_interpretation']}){powered}{perm_str}{sig_raw}{sig_bh}")
 
     # ── Mixed-effects analysis ──
     print("\n--- Mixed-Effects Analysis (all samples) ---")
@@ -1001,6 +1309,46 @@ def analyze(data: dict) -> dict:
         print(f"\n  Mixed-effects FDR: {me_fdr_summary['n_significant_bh']}/{me_fdr_summary['total_tests']} "
               f"significant after BH correction")
 
+    # ── REML random-intercept fits ──
+    print(f"\n--- REML Mixed Models ---")
+    long = extract_long_samples(data, version, metrics, sources)
+    reml = reml_random_intercepts(long, metrics, sources, comparisons,
+                                  stream_effect=reml_stream)
+    reml_p_values, reml_p_keys = [], []
+    if "error" in reml:
+        print(f"  {reml['error']}")
+    else:
+        print(f"  Model: {reml['model']} ({reml['seconds']}s)")
+        for metric in metrics:
+            fit = reml["fits"][metric]
+            if "error" in fit:
+                print(f"  {metric}: {fit['error']}")
+                continue
+            vc = ", ".join(f"{k}={v:.4g}" for k, v in fit["variance_components"].items())
+            print(f"  {metric}: {vc} (ICC={fit['icc_prompt']})")
+            for key, c in fit["contrasts"].items():
+                if "error" in c:
+                    continue
+                if key in mixed_results.get(metric, {}):
+                    mixed_results[metric][key]["reml"] = c
+                reml_p_values.append(c["p_value"])
+                reml_p_keys.append((metric, key))
+                print(f"    {key}: est={c['estimate']:+.6f} se={c['se']:.6f} "
+                      f"t({c['df']})={c['t_statistic']:.3f} p={c['p_value']:.4f}")
+    if reml_p_values:
+        reml_bh = benjamini_hochberg(reml_p_values)
+        for (metric, key), bh in zip(reml_p_keys, reml_bh):
+            c = reml["fits"][metric]["contrasts"][key]
+            c["p_value_bh_adjusted"] = round(bh["adjusted_p"], 6)
+            c["significant_bh_005"] = bh["significant_bh"]
+        reml["fdr"] = {
+            "total_tests": len(reml_p_values),
+            "n_significant_uncorrected": sum(1 for p in reml_p_values if p < 0.05),
+            "n_significant_bh": sum(1 for r in reml_bh if r["significant_bh"]),
+        }
+        print(f"  REML FDR: {reml['fdr']['n_significant_bh']}/{reml['fdr']['total_tests']} "
+              f"significant after BH correction")
+
     # ── CV analysis ──
     cv_per_prompt = compute_cross_source_cv(prompt_means, metrics, sources)
     mean_cv = {}
@@ -1011,13 +1359,15 @@ def analyze(data: dict) -> dict:
 
     print("\n--- Cross-Source CV% ---")
     for metric in metrics:
-        print(f"  {metric}: mean CV = {mean_cv[metric]:.4f}%")
+        ci = (bootstrap or {}).get("mean_cv_percent", {}).get(metric, {}).get("ci_bca")
+        ci_str = f" [{ci[0]:.4f}, {ci[1]:.4f}]" if ci else ""
+        print(f"  {metric}: mean CV = {mean_cv[metric]:.4f}%{ci_str}")
 
     # ── Single vs multi-turn ──
     st_vs_mt = compute_single_vs_multi_diversity(data, version)
 
     # ── Seed distribution analysis ──
-    seed_analysis = analyze_seed_distributions(data)
+    seed_analysis = analyze_seed_distributions(data, source_path)
     print("\n--- Seed Distribution Analysis ---")
     for source, info in seed_analysis.get("per_source", {}).items():
         if "error" in info:
@@ -1031,6 +1381,18 @@ def analyze(data: dict) -> dict:
         print(f"  {pair}: KS p={info['p_value']:.4f} "
               f"({'DIFFERENT' if info['distributions_differ_005'] else 'same'})")
 
+    # ── Serial correlation of per-sample metrics ──
+    metric_serial = analyze_metric_serial_correlation(data, version, metrics, sources)
+    print("\n--- Metric Serial Correlation (Ljung-Box, prompt-centred) ---")
+    for source in sources:
+        for metric, info in metric_serial[source].items():
+            if "error" in info:
+                continue
+            lb = info["ljung_box"].get("h_10")
+            lb_str = f"Q(10) p={lb['p_value']:.4f}" if lb else "Q(10) n/a"
+            print(f"  {source} | {metric}: n={info['n']}, r1={info['lag_1']:+.4f}, {lb_str}, "
+                  f"significant lags={info['n_significant_lags']}")
+
     # ── Domain analysis (v2 only) ──
     domain_analysis = None
     if version == "v2":
@@ -1041,6 +1403,12 @@ def analyze(data: dict) -> dict:
                     prompt_domains[prompt] = info["domain"]
         if prompt_domains:
             domain_analysis = analyze_by_domain(all_samples, metrics, sources, prompt_domains)
+            if n_boot > 0:
+                for domain, info in domain_analysis.items():
+                    prompts = [p for p, d in prompt_domains.items() if d == domain]
+                    info["bootstrap"] = bootstrap_effects(all_samples, metrics, sources,
+                                                          comparisons, prompts=prompts,
+                                                          **boot_kwargs)
 
     # ── Effect summary ──
     effect_summary = compute_effect_size_summary(test_results, metrics)
@@ -1053,6 +1421,9 @@ def analyze(data: dict) -> dict:
           f"t-test={sig_counts['ttest_p005_uncorrected']}")
     print(f"  Significant (BH-corrected): Wilcoxon={sig_counts['wilcoxon_p005_bh_corrected']}, "
           f"t-test={sig_counts['ttest_p005_bh_corrected']}")
+    if n_perm > 0:
+        print(f"  Significant (permutation): uncorrected={sig_counts['permutation_p005_uncorrected']}, "
+              f"BH-corrected={sig_counts['permutation_p005_bh_corrected']}")
 
     # ── Power summary ──
     n_pairs = None
@@ -1088,6 +1459,9 @@ def analyze(data: dict) -> dict:
     print(f"  Mean power at observed effects: {power_summary.get('mean_power_at_observed_d', '?')}")
     print(f"  Adequately powered: {power_summary.get('n_adequately_powered_tests', 0)}"
           f"/{power_summary.get('total_tests', 0)}")
+    if power_table is not None:
+        print(f"  Power table: {power_table.reused} cells reused, "
+              f"{power_table.computed} computed")
 
     # ── Assemble output ──
     output = {
@@ -1096,9 +1470,23 @@ def analyze(data: dict) -> dict:
         "analysis_version": "v2",
         "analysis_notes": {
             "fdr_correction": "Benjamini-Hochberg applied to all p-values",
-            "power_analysis": "Post-hoc power computed for all paired tests",
+            "power_analysis": "Post-hoc power computed for all paired tests" + (
+                f"; interpolated in d (step {D_STEP}) from the persistent power table"
+                if power_table is not None else ""),
             "mixed_effects": "Random-effects meta-analysis across prompts using all samples",
+            "mixed_effects_reml": ("NumPy REML fit of metric ~ source + (1|prompt)"
+                                   + (" + (1|stream)" if reml_stream else "")
+                                   + " on all samples; contrast t-tests with between-within df, "
+                                     "BH over the REML contrasts"),
             "seed_distributions": "KS and chi-squared uniformity tests on 32-bit seeds",
+            "metric_serial_correlation": "FFT autocorrelation, Ljung-Box and periodogram of prompt-centred per-sample metrics",
+            "bootstrap": (f"{n_boot} resamples of {'prompts and samples within prompts' if boot_within else 'prompts'} "
+                          f"(seed {boot_seed}); BCa 95% intervals for d_z, mean difference and mean CV%"
+                          if n_boot > 0 else "disabled"),
+            "permutation_tests": (f"Two-sided sign-flip tests of the summed prompt-mean differences; exact "
+                                  f"(meet-in-the-middle) up to {perm_exact_max} nonzero pairs, else "
+                                  f"{n_perm} Monte Carlo flips (seed {perm_seed}); included in the BH family"
+                                  if n_perm > 0 else "disabled"),
             "metrics": f"{'v2 extended (MTLD, D2, rep_ratio)' if version == 'v2' else 'v1 core (shannon, TTR)'}",
         },
         "design": {
@@ -1115,12 +1503,16 @@ def analyze(data: dict) -> dict:
         "power_analysis_summary": power_summary,
         "mixed_effects_analysis": mixed_results,
         "mixed_effects_fdr": me_fdr_summary,
+        "mixed_effects_reml": reml,
         "effect_size_summary": effect_summary,
         "significance_counts": sig_counts,
         "cross_source_cv_per_prompt": cv_per_prompt,
         "mean_cv_across_prompts": mean_cv,
+        "bootstrap": ({k: v for k, v in bootstrap.items() if k != "effects"}
+                      if bootstrap else None),
         "single_turn_vs_multi_turn": st_vs_mt,
         "seed_distribution_analysis": seed_analysis,
+        "metric_serial_correlation": metric_serial,
     }
 
     if domain_analysis:
@@ -1129,16 +1521,104 @@ def analyze(data: dict) -> dict:
     return output
 
 
+# ─────────────────────────────────────────────────────────────────────
+# Power engine benchmark
+# ─────────────────────────────────────────────────────────────────────
+
+def benchmark_power(sizes: list[int], effects=(0.2, 0.5), n_sims: int = POWER_SIMS) -> dict:
+    """Time power_wilcoxon_paired against the per-simulation stats.wilcoxon loop."""
+    runs = []
+    for n in sizes:
+        for d in effects:
+            t0 = time.perf_counter()
+            ref = _power_wilcoxon_paired_loop(d, n, n_sims=n_sims)
+            loop_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            vec = power_wilcoxon_paired(d, n, n_sims=n_sims)
+            vec_s = time.perf_counter() - t0
+            # SE of the difference of two independent n_sims-draw estimates
+            se = np.sqrt(2 * max(ref * (1 - ref), 1 / n_sims) / n_sims)
+            runs.append({
+                "n": n,
+                "d": d,
+                "power_loop": ref,
+                "power_vectorized": vec,
+                "difference_in_se": round(abs(vec - ref) / se, 3),
+                "loop_seconds": round(loop_s, 4),
+                "vectorized_seconds": round(vec_s, 4),
+                "speedup": round(loop_s / vec_s, 1),
+            })
+            print(f"  n={n:<5} d={d:<4} power loop={ref:.4f} vectorized={vec:.4f}  "
+                  f"loop {loop_s:7.3f}s  vectorized {vec_s:.4f}s  ({loop_s / vec_s:.0f}x)")
+    return {"benchmark": "wilcoxon_power", "n_sims": n_sims, "runs": runs}
+
+
 # ─────────────────────────────────────────────────────────────────────
 # CLI
 # ─────────────────────────────────────────────────────────────────────
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python statistical_analysis_v2.py <input.json> [output.json]")
-        sys.exit(1)
-
-    input_file = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Statistical analysis v2 for entropy seeding experiments")
+    parser.add_argument("input", nargs="?", default=None, help="v1 or v2 experiment JSON")
+    parser.add_argument("output", nargs="?", default=None,
+                        help="Output JSON (default: statistical_v2_<model>_<version>.json "
+                             "next to the input)")
+    parser.add_argument("--benchmark-power", action="store_true",
+                        help="Time the vectorized Wilcoxon power engine against the "
+                             "per-simulation loop (writes --output, default: "
+                             "results/power_benchmark/power_benchmark.json)")
+    parser.add_argument("--sizes", type=str, default="10,25,50,100,200",
+                        help="Pair counts for --benchmark-power and --build-power-table")
+    parser.add_argument("--power-table", type=str, default=str(POWER_TABLE_PATH),
+                        help="Persistent power/MDE lookup table (filled as needed)")
+    parser.add_argument("--no-power-table", action="store_true",
+                        help="Compute power and MDE directly instead of via the table")
+    parser.add_argument("--build-power-table", action="store_true",
+                        help="Precompute the power table for --sizes and --alphas")
+    parser.add_argument("--alphas", type=str, default="0.05",
+                        help="Significance levels for --build-power-table")
+    parser.add_argument("--bootstrap", type=int, default=N_BOOT,
+                        help=f"Bootstrap resamples for effect-size CIs (default: {N_BOOT}; 0 = off)")
+    parser.add_argument("--bootstrap-seed", type=int, default=0,
+                        help="Seed for the bootstrap resamples")
+    parser.add_argument("--bootstrap-within", action="store_true",
+                        help="Also resample samples within each prompt x source cell")
+    parser.add_argument("--permutations", type=int, default=N_RESAMPLES,
+                        help=f"Monte Carlo sign flips when a comparison has more than "
+                             f"--permutation-exact-max pairs (default: {N_RESAMPLES}; 0 = no "
+                             f"permutation tests)")
+    parser.add_argument("--permutation-exact-max", type=int, default=EXACT_MAX_N,
+                        help=f"Largest pair count tested by exact enumeration (default: {EXACT_MAX_N})")
+    parser.add_argument("--permutation-seed", type=int, default=0,
+                        help="Seed for the Monte Carlo sign flips")
+    parser.add_argument("--reml-stream", action="store_true",
+                        help="Add a PRNG-stream random intercept to the REML mixed models")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the bootstrap (default: 1)")
+    args = parser.parse_args()
+
+    power_table = None if args.no_power_table else PowerTable(Path(args.power_table))
+    if args.build_power_table:
+        if power_table is None:
+            parser.error("--build-power-table needs a table path")
+        power_table.fill([int(n) for n in args.sizes.split(",")],
+                         [float(a) for a in args.alphas.split(",")])
+        print(f"\nWrote: {power_table.path} ({len(power_table.power_cells)} power cells)")
+        return
+
+    if args.benchmark_power:
+        result = benchmark_power([int(n) for n in args.sizes.split(",")])
+        # never the positional input: that is an experiment file
+        output_file = Path(args.output) if args.output else POWER_BENCHMARK_PATH
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nWrote: {output_file}")
+        return
+
+    if args.input is None:
+        parser.error("give an experiment JSON or --benchmark-power")
+    input_file = Path(args.input)
     if not input_file.exists():
         print(f"Error: {input_file} not found")
         sys.exit(1)
@@ -1150,12 +1630,17 @@ def main():
     model_name = data.get("model", "unknown").replace(":", "_").replace("/", "_")
     version = detect_version(data)
 
-    if len(sys.argv) >= 3:
-        output_file = Path(sys.argv[2])
+    if args.output:
+        output_file = Path(args.output)
     else:
         output_file = input_file.parent / f"statistical_v2_{model_name}_{version}.json"
 
-    result = analyze(data)
+    result = analyze(data, input_file, power_table, n_boot=args.bootstrap,
+                     boot_seed=args.bootstrap_seed, boot_within=args.bootstrap_within,
+                     workers=args.workers, n_perm=args.permutations,
+                     perm_seed=args.permutation_seed,
+                     perm_exact_max=args.permutation_exact_max,
+                     reml_stream=args.reml_stream)
 
     output_str = json.dumps(result, indent=2, default=str)
     output_file.parent.mkdir(parents=True, exist_ok=True)